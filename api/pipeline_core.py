@@ -2,121 +2,301 @@
 pipeline_core.py
 ───────────────────────────────────────────────────────────────────
 1. Audio  ➜  VAD  ➜  Whisper ASR (local)/Deepgram ASR
-2. LLM prompt (with short context)
+2. LLM prompt (stable system prefix + token-budgeted context)
+   (a cached backchannel filler goes to `on_audio` if the LLM is slow)
 3. LLM JSON  ➜  intent / action
-4. Slot-filling & execute_action
+4. Slot-filling (dialogue/task_forms: follow-up turns of a task skip the
+   LLM) & actions (run in the background; a cached acknowledgement
+   is handed to `on_audio` when one takes longer than ACK_AFTER_S)
 5. Decide reply  ➜  Deepgram TTS
+
+Every stage takes its timeout from the turn's TurnBudget (utils/latency_budget);
+overruns fall back to cached phrases / shorter replies instead of stalling.
 """
 
 from __future__ import annotations
-import json
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Tuple
+import concurrent.futures
+import os
+import tempfile
 import time
 import logging
 
+LLM_UNAVAILABLE_REPLY = "Sorry, I'm having trouble thinking right now. Please try again in a moment."
+ASR_TIMEOUT_REPLY     = "Sorry, I didn't catch that. Could you say it again?"
+ACTION_PENDING_REPLY  = "That's taking a little longer than usual. I'll keep working on it."
+CLARIFY_REPLY         = "Could you please clarify?"
+NOT_CAUGHT_REPLY      = "Sorry, I didn't catch that."
+# spoken from the phrase cache (tts/phrase_cache) – no TTS round trip when late
+FALLBACK_PHRASES = (LLM_UNAVAILABLE_REPLY, ASR_TIMEOUT_REPLY, ACTION_PENDING_REPLY,
+                    CLARIFY_REPLY, NOT_CAUGHT_REPLY)
+ACK_AFTER_S = 0.3           # actions slower than this get a spoken "one moment"
+LATE_AUDIO_DIR    = os.path.join(tempfile.gettempdir(), "s2s_late_actions")
+LATE_AUDIO_KEEP_S = 600     # spoken late results are deleted after this long
+
+
+def _late_audio_path() -> str:
+    """A fresh file per late result (sessions never share one); old ones are swept."""
+    os.makedirs(LATE_AUDIO_DIR, exist_ok=True)
+    cutoff = time.time() - LATE_AUDIO_KEEP_S
+    for entry in os.scandir(LATE_AUDIO_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+    fd, path = tempfile.mkstemp(suffix=".mp3", prefix="action_result_", dir=LATE_AUDIO_DIR)
+    os.close(fd)
+    return path
+
+
+def _deliver_late(future: concurrent.futures.Future, on_late: Callable):
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"[Action] Background action failed: {e}")
+        return
+    try:
+        on_late(result)
+    except Exception as e:
+        print(f"[Action] Could not deliver late result: {e}")
+
+
+def run_action(action: dict, on_audio: Callable[[str], None] | None = None, budget=None,
+               on_late: Callable | None = None):
+    """
+    execute_action, but off the voice loop: if the handler hasn't finished
+    after ACK_AFTER_S, a cached acknowledgement is passed to `on_audio` to
+    play while we keep waiting for the result – up to the budget's action
+    timeout, after which the action carries on in the background, this
+    returns ACTION_PENDING_REPLY and `on_late(result)` gets the real result
+    (str or follow-up dict) once the handler finishes.
+    """
+    from s2s_pipeline.actions.action_router import acknowledgement, submit_action
+
+    action_start = time.perf_counter()
+    timeout = budget.timeout_for("action") if budget else None
+    future = submit_action(action)
+    try:
+        if on_audio is not None:
+            try:
+                return future.result(timeout=ACK_AFTER_S)
+            except concurrent.futures.TimeoutError:
+                from s2s_pipeline.tts.phrase_cache import cached_speech
+                ack_path = cached_speech(acknowledgement(action))
+                if ack_path:
+                    on_audio(ack_path)
+            if timeout is not None:                 # the ACK wait came out of the action's time
+                timeout = max(0.0, timeout - ACK_AFTER_S)
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        if budget:
+            budget.degrade("action_pending")
+        if on_late is not None:
+            future.add_done_callback(lambda f: _deliver_late(f, on_late))
+        return ACTION_PENDING_REPLY
+    finally:
+        took = time.perf_counter() - action_start
+        if budget:
+            budget.record("action", took)
+        print(f"[Action] {action.get('type')} took {took:.2f} sec")
+
+
 def run_s2s_once(
     audio_path: str | Path,
     dialogue_manager=None,
+    on_audio: Callable[[str], None] | None = None,
+    budget=None,
+    recorder=None,
+    late_sink: Callable[[dict], None] | None = None,
 ) -> Tuple[str, str | dict, str, "DialogueManager"]:
+    """
+    One voice turn.  `on_audio(path)`, if given, receives interim audio
+    (backchannel fillers, action acknowledgements) to play before the
+    returned reply.
+    `budget` is the turn's TurnBudget; a fresh TURN_BUDGET_S one by default.
+    `recorder` (utils/session_recorder) gets one structured record per turn.
+    `late_sink(record)` receives the outcome of an action that finishes after
+    the turn (default: applied to `dialogue_manager` in place); unspoken
+    results are said before the next reply.
+    """
+    from s2s_pipeline.utils.latency_budget import TurnBudget
+    from s2s_pipeline.utils.profiler import mark_stage
+
+    from s2s_pipeline.asr.session_vocabulary import track_task_turn
+
+    budget = budget or TurnBudget()
+    state_before = dialogue_manager.state if dialogue_manager is not None else {}
+    task_before = (state_before.get("last_action") or {}).get("type")
+    trace: dict = {}
+    try:
+        with mark_stage("turn"):
+            result = _run_turn(audio_path, dialogue_manager, on_audio, budget, trace, late_sink)
+        track_task_turn(result[3].state, task_before)
+        return result
+    finally:
+        total = budget.finish()
+        if recorder is not None:
+            recorder.record_turn(audio_path, trace, budget, total)
 
+
+def _run_turn(audio_path, dialogue_manager, on_audio, budget, trace, late_sink=None):
     # ── Lazy heavy imports ────────────────────────────────────────────
     from s2s_pipeline.audio.vad_speaker_id import vad_speaker_identification
-    from s2s_pipeline.asr.deepgram_asr import transcribe_audio
+    from s2s_pipeline.asr.asr_orchestrator import transcribe_audio   # Deepgram ⇄ local Whisper (ASR_POLICY)
+    #from s2s_pipeline.asr.deepgram_asr import transcribe_audio
     #from s2s_pipeline.asr.whisper_asr import transcribe_audio
+    #from s2s_pipeline.asr.long_audio import transcribe_audio    # voicemails / long dictation
+    from s2s_pipeline.asr.session_vocabulary import build_vocabulary, note_entity
+    from s2s_pipeline.actions.action_router import CONTACT_INDEX
     from s2s_pipeline.dialogue.dialogue_manager import DialogueManager
-    from s2s_pipeline.dialogue.prompt_engineer import enhance_prompt
+    from s2s_pipeline.dialogue.prompt_engineer import build_messages
     from s2s_pipeline.dialogue.conversation_classifier import needs_clarification
+    from s2s_pipeline.dialogue import task_forms
     #from s2s_pipeline.llm.openai_llm import call_llm
     #from s2s_pipeline.llm.llama_llm import call_llm
     from s2s_pipeline.llm.mistral_llm import call_llm
     from s2s_pipeline.llm.llm2t2c_adapter import format_llm_response
+    from s2s_pipeline.llm.response_cache import context_digest, response_cache
+    from s2s_pipeline.llm.llm_client import LLMUnavailableError
+    from s2s_pipeline.llm.structured_output import parse_llm_json, token_budget
     from s2s_pipeline.tts.deepgram_tts import text_to_speech
-    from s2s_pipeline.actions.action_router import execute_action
-    from s2s_pipeline.utils.confirm_matcher import (
-        is_affirmative, is_negative, is_cancel, looks_like_filler
-    )
+    from s2s_pipeline.tts.phrase_cache import cached_speech
+    from s2s_pipeline.audio.backchannel import Backchannel, BACKCHANNEL_AFTER_S
+    from s2s_pipeline.utils.token_counter import count_message_tokens, count_tokens
+    from s2s_pipeline.utils.phrase_matcher import match_phrases
     # ─────────────────────────────────────────────────────────────────
     start = time.perf_counter()
+
+    def speak(text: str, cached: bool = False):
+        """TTS within the budget; fixed phrases come from the phrase cache."""
+        with budget.stage("tts"):
+            timeout = budget.timeout_for("tts")
+            if cached:
+                path = cached_speech(text, timeout=timeout)
+                if path:
+                    return path
+            return text_to_speech(text, timeout=timeout)
+
     # 1️⃣ Dialogue manager
     if dialogue_manager is None:
         dialogue_manager = DialogueManager()
 
     # 2️⃣ ASR
     asr_start = time.perf_counter()
-    processed_audio = vad_speaker_identification(audio_path)
-    asr_result = transcribe_audio(processed_audio)
+    expect_short = task_forms.awaiting_confirmation(dialogue_manager.state.get("last_action"))
+    processed_audio = audio_path if budget.skip_optional("vad") else vad_speaker_identification(
+        audio_path, expect_short=expect_short)
+    if processed_audio is None:                 # no speech / not an enrolled speaker: no turn
+        trace["gated"] = True
+        return "", "", None, dialogue_manager
+    try:
+        with budget.stage("asr"):
+            vocabulary = build_vocabulary(dialogue_manager.state, CONTACT_INDEX.contacts)
+            asr_result = transcribe_audio(processed_audio, timeout=budget.timeout_for("asr"),
+                                          vocabulary=vocabulary)
+    except TimeoutError as e:
+        print(f"[ASR] {e}")
+        budget.degrade("asr_timeout")
+        trace["tts_text"] = ASR_TIMEOUT_REPLY
+        return "", ASR_TIMEOUT_REPLY, speak(ASR_TIMEOUT_REPLY, cached=True), dialogue_manager
     user_text = asr_result["transcript"]
+    trace.update(transcript=user_text, avg_logprob=asr_result.get("avg_logprob"),
+                 no_speech_prob=asr_result.get("no_speech_prob"))
     print(f"[ASR] Took {time.perf_counter() - asr_start:.2f} sec")
 
-    # 3️⃣ Quick slot-filling handlers BEFORE calling the LLM
+    # 3️⃣ Task in progress: the form engine takes the turn locally (no LLM call)
     last_action = dialogue_manager.state.get("last_action")
+    phrases = match_phrases(user_text)          # every yes/no/cancel/filler/music decision
 
-    # YES / NO confirmation for recipient
-    if (
-        last_action
-        and last_action.get("type") == "send_email"
-        and last_action.get("parameters", {}).get("step") == "awaiting_recipient_confirm"
-    ):
-        if is_affirmative(user_text):
-            last_action["parameters"]["confirm"] = True
-            exec_res = execute_action(last_action)
-            if isinstance(exec_res, dict):                      # need body
-                dialogue_manager.state["last_action"] = exec_res["action"]
-                return user_text, exec_res, text_to_speech(exec_res["response"]), dialogue_manager
-            speech = exec_res                                   # done
-            dialogue_manager.state.pop("last_action", None)
-            return user_text, exec_res, text_to_speech(speech), dialogue_manager
-
-        if is_negative(user_text):
-            speech = "Okay, please tell me the correct e-mail address."
-            return user_text, speech, text_to_speech(speech), dialogue_manager
-
-    # BODY capture
-    if (
-        last_action
-        and last_action.get("type") == "send_email"
-        and last_action.get("parameters", {}).get("step") == "awaiting_body"
-    ):
-        if is_cancel(user_text):
-            dialogue_manager.state.pop("last_action", None)
-            speech = "Okay, I’ve cancelled the e-mail."
-            return user_text, speech, text_to_speech(speech), dialogue_manager
-
-        if looks_like_filler(user_text):
-            speech = "Please tell me the message you want to send."
-            return user_text, speech, text_to_speech(speech), dialogue_manager
-
-        last_action["parameters"]["body"] = user_text
-        exec_res = execute_action(last_action)
-        if isinstance(exec_res, dict):                           # should not loop again
-            dialogue_manager.state["last_action"] = exec_res["action"]
-            return user_text, exec_res, text_to_speech(exec_res["response"]), dialogue_manager
-        speech = exec_res        # sent!
-        dialogue_manager.state.pop("last_action", None)
-        dialogue_manager.pop_last_turn()            # existing line
+    def late_result(action, fingerprint=None):
+        """on_late for run_action: say the outcome of an action that outlived the turn
+        (now if we can play audio, else before the next reply) and hand it to late_sink."""
+        def on_late(result):
+            record = {"type": action.get("type"), "fingerprint": None, "action": None, "spoken": False}
+            if isinstance(result, dict):                         # handler asked for more
+                record["action"] = result.get("action")
+                result = result.get("response", "")
+            else:
+                record["fingerprint"] = fingerprint
+            record["response"] = result
+            print(f"[Action] {action.get('type')} finished after its turn: {result}")
+            if on_audio is not None and result:
+                on_audio(text_to_speech(result, output_audio_path=_late_audio_path()))
+                record["spoken"] = True
+            (late_sink or dialogue_manager.apply_late_result)(record)
+        return on_late
 
-        # 🆕 add: record fingerprint so we never reopen same task
-        fp = f"{last_action['type']}::{last_action['parameters'].get('to','')}"
+    def apply_form_step(step):
+        """Keep / clear the in-progress task; run it once every slot is filled."""
+        dialogue_manager.state["last_action"] = step.action
+        if step.run is None:
+            return step.say, step.cached
+        # fingerprint so we never reopen the same task
+        fp = f"{step.run['type']}::{step.run['parameters'].get('to','')}"
+        exec_res = run_action(step.run, on_audio, budget, on_late=late_result(step.run, fp))
+        if exec_res is ACTION_PENDING_REPLY:                     # still running: on_late finishes it
+            return exec_res, True
+        if isinstance(exec_res, dict):                           # handler asked for more
+            exec_res = exec_res.get("response", "")
         dialogue_manager.state.setdefault("completed_actions", set()).add(fp)
-        return user_text, exec_res, text_to_speech(speech), dialogue_manager
+        return exec_res, False
 
-    # 4️⃣ Build prompt → call LLM
+    if task_forms.active(last_action):
+        step = task_forms.advance(last_action, user_text, phrases)
+        speech, cached = apply_form_step(step)
+        if step.run is not None:
+            dialogue_manager.pop_last_turn()        # the turn that opened the task
+        trace.update(form=True, intent=last_action["type"], action=step.run or step.action,
+                     tts_text=speech)
+        return user_text, speech, speak(speech, cached=cached), dialogue_manager
+
+    # 4️⃣ Build prompt → call LLM (or answer repeated small talk from cache)
     llm_start = time.perf_counter()
-    if last_action and last_action.get("parameters", {}).get("step"):
-        context = dialogue_manager.get_context_snippet(skip_last=True)
+    topic = getattr(dialogue_manager, "topic_seed", None)
+    skip_last = bool(last_action and last_action.get("parameters", {}).get("step"))
+    context_turns = dialogue_manager.get_context_turns(skip_last=skip_last)
+    # replies depend on this session's history: key them on it, never share across sessions
+    context = context_digest(context_turns, dialogue_manager.running_summary)
+    use_cache = not last_action                                  # no task in progress
+    llm_raw = response_cache.get(user_text, topic, context) if use_cache else None
+    cache_hit = llm_raw is not None
+    prompt_tokens = 0
+    if cache_hit:
+        print(f"[LLM] Cache hit (hit rate {response_cache.hit_rate():.0%})")
     else:
-        context = dialogue_manager.get_context_snippet()
-    
-    prompt = enhance_prompt({"user_input": user_text, "context": context})
-    llm_raw = call_llm(prompt)                                   # str or dict
+        messages = build_messages(user_text, context_turns, topic=topic,
+                                  summary=dialogue_manager.running_summary)
+        # expected reply shape: continuing task → short action JSON, else chat
+        intent_hint = (last_action or {}).get("type") or (
+            dialogue_manager.history[-1].intent if dialogue_manager.history else None
+        )
+        prompt_tokens = count_message_tokens(messages)
+        prefix_tokens = count_tokens(messages[0]["content"])
+        print(f"[LLM] Prompt ≈{prompt_tokens} tokens "
+              f"(static prefix {prefix_tokens}, dynamic {prompt_tokens - prefix_tokens})")
+        max_tokens = budget.llm_max_tokens(token_budget(intent_hint))
+        filler_delay = BACKCHANNEL_AFTER_S
+        if on_audio is not None and budget.behind("llm"):
+            budget.degrade("early_backchannel")      # already late: fill the silence now
+            filler_delay = 0.0
+        try:
+            with Backchannel(on_audio, intent_hint, user_text, delay=filler_delay), budget.stage("llm"):
+                llm_raw = call_llm(messages, max_tokens=max_tokens, timeout=budget.timeout_for("llm"))
+        except LLMUnavailableError as e:
+            print(f"[LLM] Unavailable: {e}")
+            budget.degrade("llm_fallback")
+            llm_raw = {"response": LLM_UNAVAILABLE_REPLY, "intent": "unknown"}
+        trace["prompt"] = messages
+    trace.update(llm_raw=llm_raw, llm_cache_hit=cache_hit)
     print(f"[LLM] Took {time.perf_counter() - llm_start:.2f} sec")
 
-    # 5️⃣ Parse structured response
-    try:
-        parsed = json.loads(llm_raw) if isinstance(llm_raw, str) else llm_raw
-    except json.JSONDecodeError:
-        parsed = {"response": llm_raw, "intent": "unknown"}
+    # 5️⃣ Parse structured response (repairs truncated / fenced JSON)
+    parsed = parse_llm_json(llm_raw)
+
+    if use_cache and not cache_hit:
+        response_cache.put(user_text, llm_raw, parsed, topic, context)
 
     intent  = parsed.get("intent", "unknown")
     action  = parsed.get("action")
@@ -128,9 +308,7 @@ def run_s2s_once(
         parsed["intent"] = "general_chat"
         action = None
     
-    music_kw = ("music", "song", "playlist", "listen", "podcast",
-            "spotify", "tune", "radio")
-    if any(k in user_text.lower() for k in music_kw):
+    if phrases["music"]:
         parsed.pop("action", None)
         parsed["intent"] = "general_chat"
         intent = "general_chat"
@@ -147,6 +325,8 @@ def run_s2s_once(
         if last_action and last_action.get("type") == action.get("type"):
             merged = {**last_action.get("parameters", {}), **action.get("parameters", {})}
             action["parameters"] = merged
+        if action["type"] == "send_email" and action["parameters"].get("to"):
+            note_entity(dialogue_manager.state, action["parameters"]["to"])   # next turn's ASR hints
         dialogue_manager.state["last_action"] = action
     else:
         dialogue_manager.state.pop("last_action", None)
@@ -157,10 +337,15 @@ def run_s2s_once(
         llm_response=llm_raw,
         confidence=asr_result.get("avg_logprob"),
         intent=intent,
+        prompt_tokens=prompt_tokens,
     )
+    print(f"[Dialogue] Session memory ≈{dialogue_manager.memory_bytes() / 1024:.1f} KB")
 
     # 7️⃣ Decide what to speak
-    if (
+    tts_cached = False
+    if isinstance(action, dict) and task_forms.handles(action.get("type")):
+        tts_text, tts_cached = apply_form_step(task_forms.begin(action))
+    elif (
         isinstance(action, dict)
         and action.get("type")
         and (
@@ -169,7 +354,7 @@ def run_s2s_once(
             or action["parameters"].get("to")                # ← NEW: just “to”
         )
     ):
-        exec_res = execute_action(action)
+        exec_res = run_action(action, on_audio, budget, on_late=late_result(action))
         if isinstance(exec_res, dict):                           # still slot-filling
             dialogue_manager.state["last_action"] = exec_res["action"]
             tts_text = exec_res["response"]
@@ -182,20 +367,45 @@ def run_s2s_once(
 
     if not tts_text:
         tts_text = (
-            "Could you please clarify?"
-            if needs_clarification(
+            CLARIFY_REPLY
+            if not budget.skip_optional("clarify") and needs_clarification(
                 llm_raw,
                 avg_logprob=asr_result.get("avg_logprob"),
                 no_speech_prob=asr_result.get("no_speech_prob"),
             )
-            else "Sorry, I didn't catch that."
+            else NOT_CAUGHT_REPLY
         )
 
-    # 8️⃣ TTS
+    late_replies = dialogue_manager.state.pop("late_replies", None)
+    if late_replies:                        # results of earlier actions nobody has heard yet
+        tts_text, tts_cached = " ".join([*late_replies, tts_text]), False
+
+    trace.update(intent=intent, action=dialogue_manager.state.get("last_action") or action,
+                 tts_text=tts_text)
+
+    # 8️⃣ TTS (fallback phrases are pre-synthesised)
     tts_start = time.perf_counter()
-    tts_path = text_to_speech(tts_text)
+    tts_path = speak(tts_text, cached=tts_cached or tts_text in FALLBACK_PHRASES)
     print(f"[TTS] Took {time.perf_counter() - tts_start:.2f} sec")
     print(f"[Pipeline] Total time: {time.perf_counter() - start:.2f} sec")
 
 
     return user_text, llm_raw, tts_path, dialogue_manager
+
+
+def run_s2s_session_turn(audio_path: str | Path, session_id: str, store=None, on_audio=None,
+                         budget=None, recorder=None):
+    """
+    Stateless-worker entry point: load the session's DialogueManager from the
+    session store, run one turn, save it back.  Any worker can take any turn.
+    Returns (transcript, llm_response, tts_path).
+    """
+    from s2s_pipeline.dialogue.session_store import get_session_store
+
+    store = store or get_session_store()
+    dialogue_manager = store.load_or_create(session_id)          # applies queued late results
+    user_text, llm_raw, tts_path, dialogue_manager = run_s2s_once(
+        audio_path, dialogue_manager, on_audio, budget, recorder,
+        late_sink=lambda record: store.queue_late(session_id, record))
+    store.save(session_id, dialogue_manager)
+    return user_text, llm_raw, tts_path
@@ -6,10 +6,15 @@ project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
 import gradio as gr
-from api.pipeline_core import run_s2s_once  # make sure this path is correct
+from api.pipeline_core import run_s2s_session_turn  # make sure this path is correct
+from s2s_pipeline.utils.profiler import profiled_turn, start_from_env
 
-def s2s_handler(audio_file):
-    transcript, response, audio_out_path = run_s2s_once(audio_file)
+start_from_env()        # S2S_PROFILE=1 → sampling profile every S2S_PROFILE_EVERY turns
+
+def s2s_handler(audio_file, request: gr.Request):
+    # dialogue state is kept per browser session in the session store (SESSION_STORE)
+    with profiled_turn():
+        transcript, response, audio_out_path = run_s2s_session_turn(audio_file, request.session_hash)
     return transcript, response, audio_out_path
 
 gr.Interface(
@@ -0,0 +1,109 @@
+"""
+gui/frame_pump.py
+─────────────────────────────────────────────────────────
+Microphone chunks → Tk, without touching Tk from the capture thread.
+
+• MicCapture reads the input stream on a daemon thread and only hands raw
+  int16 chunks to a FramePump – no drawing there, so reads never fall
+  behind and the device doesn't overflow
+• FramePump is a bounded queue (oldest chunks dropped when full) drained
+  on the Tk main loop by `widget.after`, at most `fps` times a second; the
+  widget's renderer gets every chunk that arrived since the last frame
+"""
+
+import queue
+import threading
+
+import numpy as np
+import pyaudio
+
+FPS = 30
+MAX_PENDING = 64            # chunks kept while the UI is busy (~2 s at 512/16 kHz)
+
+
+class FramePump:
+    def __init__(self, widget, on_frame, fps=FPS, maxsize=MAX_PENDING):
+        self.widget = widget
+        self.on_frame = on_frame
+        self.interval_ms = max(1, int(1000 / fps))
+        self.queue = queue.Queue(maxsize)
+        self._after_id = None
+
+    def put(self, item):
+        """Any thread. Never blocks: the oldest pending item makes room."""
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        items = []
+        try:
+            while True:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if items:
+            self.on_frame(items)
+        self._after_id = self.widget.after(self.interval_ms, self._tick)
+
+
+class MicCapture:
+    def __init__(self, pump, rate=16000, chunk=1024, audio=None):
+        self.pump = pump
+        self.rate = rate
+        self.chunk = chunk
+        self.audio = audio or pyaudio.PyAudio()
+        self.stream = None
+        self.running = False
+        self._thread = None
+
+    def start(self, device_index=None):
+        self.running = True
+        self.stream = self.audio.open(format=pyaudio.paInt16,
+                                      channels=1,
+                                      rate=self.rate,
+                                      input=True,
+                                      input_device_index=device_index,
+                                      frames_per_buffer=self.chunk)
+        self._thread = threading.Thread(target=self._read_loop, name="mic-capture", daemon=True)
+        self._thread.start()
+        self.pump.start()
+
+    def _read_loop(self):
+        while self.running:
+            try:
+                data = self.stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                print(f"[MicCapture] Error: {e}")
+                break
+            self.pump.put(np.frombuffer(data, dtype=np.int16))
+
+    def stop(self):
+        """Main thread. Lets the reader finish its chunk before closing the stream."""
+        self.running = False
+        self.pump.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.chunk / self.rate + 0.5)
+            self._thread = None
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+        self.stream = None
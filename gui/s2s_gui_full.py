@@ -7,14 +7,12 @@ import tkinter as tk
 from tkinter import scrolledtext, ttk
 import threading
 import time
-import os
-import datetime
 import pyaudio
 
 from s2s_pipeline.audio.audio_input import record_audio
 from s2s_pipeline.audio.vad_speaker_id import vad_speaker_identification
 from s2s_pipeline.asr.whisper_asr import transcribe_audio
-from s2s_pipeline.dialogue.prompt_engineer import enhance_prompt
+from s2s_pipeline.dialogue.prompt_engineer import build_messages
 from s2s_pipeline.dialogue.conversation_classifier import needs_clarification
 from s2s_pipeline.dialogue.dialogue_manager import DialogueManager
 from s2s_pipeline.llm.openai_llm import call_llm
@@ -22,9 +20,9 @@ from s2s_pipeline.llm.llm2t2c_adapter import format_llm_response
 from s2s_pipeline.tts.deepgram_tts import text_to_speech
 from s2s_pipeline.audio.output_audio import play_audio_interruptible_by_voice
 from s2s_pipeline.audio.microphone_finder import list_microphones
+from s2s_pipeline.utils.session_recorder import SESSION_RECORD, SessionRecorder
 
-TRANSCRIPT_DIR = "transcripts"
-os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+TRANSCRIPT_DIR = "transcripts"     # <dir>/<session>/session.jsonl (+ audio/ with SESSION_RECORD=1)
 
 def get_microphone_list():
     p = pyaudio.PyAudio()
@@ -45,7 +43,7 @@ class S2SGUI:
         self.running = False
         self.selected_mic_index = 3
         self.selected_voice = tk.StringVar(value="aura-asteria-en")
-        self.transcript_log_path = os.path.join(TRANSCRIPT_DIR, f"log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        self.recorder = SessionRecorder(directory=TRANSCRIPT_DIR, meta={"source": "gui"})
 
         self.build_ui()
 
@@ -90,8 +88,7 @@ class S2SGUI:
         self.status_label.config(text=f"Status: {status}")
         self.text_display.insert(tk.END, message + "\n")
         self.text_display.see(tk.END)
-        with open(self.transcript_log_path, "a", encoding="utf-8") as f:
-            f.write(f"[{status}] {message}\n")
+        self.recorder.event(status, message)      # buffered; written off the UI thread
 
     def pipeline_loop(self):
         self.running = True
@@ -103,8 +100,12 @@ class S2SGUI:
         play_audio_interruptible_by_voice(audio_out)
 
         self.update_ui("Listening", "Waiting for your initial request...")
-        audio_path = record_audio(device_index=self.selected_mic_index)
-        processed_audio = vad_speaker_identification(audio_path)
+        processed_audio = None
+        while self.running and processed_audio is None:   # gate skipped it: listen again
+            audio_path = record_audio(device_index=self.selected_mic_index)
+            processed_audio = vad_speaker_identification(audio_path)
+        if processed_audio is None:
+            return
         asr_result = transcribe_audio(processed_audio)
         transcript = asr_result['transcript']
         self.dialogue_manager.topic_seed = transcript
@@ -112,22 +113,35 @@ class S2SGUI:
 
         while self.running:
             self.update_ui("Listening", "Recording audio...")
-            audio_path = record_audio(device_index=self.selected_mic_index)
+            audio_path = record_audio(output_filename=self.recorder.audio_path() if SESSION_RECORD
+                                      else "input_audio.wav",
+                                      device_index=self.selected_mic_index)
+            turn_start = time.perf_counter()
+            timings = {}
 
             self.update_ui("Processing", "Running VAD and Speaker ID...")
             processed_audio = vad_speaker_identification(audio_path)
+            if processed_audio is None:
+                self.update_ui("Skipped", "No speech from an enrolled speaker – listening again")
+                continue
 
             self.update_ui("Transcribing", "Transcribing audio...")
+            stage_start = time.perf_counter()
             asr_result = transcribe_audio(processed_audio)
+            timings["asr"] = time.perf_counter() - stage_start
             transcript = asr_result['transcript']
             self.update_ui("Transcript", f"User: {transcript}")
 
-            context = self.dialogue_manager.get_context_snippet()
-            base_prompt = f"Conversation so far:\n{context}\nUser: {transcript}\nAssistant:"
-            llm_prompt = enhance_prompt(base_prompt, style="friendly", topic=getattr(self.dialogue_manager, "topic_seed", None))
-            print('llm prompt after enhance', llm_prompt)
+            llm_prompt = build_messages(
+                transcript,
+                self.dialogue_manager.get_context_turns(),
+                style="friendly",
+                topic=getattr(self.dialogue_manager, "topic_seed", None),
+            )
             self.update_ui("Thinking", "Calling LLM...")
+            stage_start = time.perf_counter()
             llm_response = call_llm(llm_prompt)
+            timings["llm"] = time.perf_counter() - stage_start
             self.update_ui("Response", f"Assistant: {llm_response}")
 
             self.dialogue_manager.update_state(transcript, llm_response)
@@ -144,7 +158,16 @@ class S2SGUI:
                 tts_text = format_llm_response(llm_response)
 
             self.update_ui("Speaking", f"TTS: {tts_text}")
+            stage_start = time.perf_counter()
             audio_out = text_to_speech(tts_text, model=self.selected_voice.get())
+            timings["tts"] = time.perf_counter() - stage_start
+            if SESSION_RECORD:                    # status lines are always logged; turns are opt-in
+                self.recorder.record_turn(audio_path, {
+                    "transcript": transcript, "avg_logprob": asr_result.get("avg_logprob"),
+                    "no_speech_prob": asr_result.get("no_speech_prob"), "prompt": llm_prompt,
+                    "llm_raw": llm_response, "tts_text": tts_text,
+                    "timings": {k: round(v, 4) for k, v in timings.items()},
+                }, total_s=time.perf_counter() - turn_start)
             interrupted = play_audio_interruptible_by_voice(audio_out, device_index=self.selected_mic_index)
 
             if interrupted:
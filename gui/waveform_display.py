@@ -1,62 +1,59 @@
 
-import pyaudio
 import numpy as np
-import threading
-import time
 import tkinter as tk
 from tkinter import Canvas
 
+from gui.frame_pump import FramePump, MicCapture
+
+WINDOW_S = 1.0              # seconds of audio across the canvas
+MIN_PEAK = 2000             # autoscale floor, so silence isn't blown up to full height
+
+
+def minmax_envelope(samples, columns):
+    """Per-column (min, max) of the last `columns * k` samples – one reshape, no Python loop."""
+    per_col = max(1, len(samples) // columns)
+    usable = samples[len(samples) - per_col * min(columns, len(samples) // per_col):]
+    bins = usable.reshape(-1, per_col)
+    return bins.min(axis=1), bins.max(axis=1)
+
+
 class WaveformDisplay(tk.Frame):
-    def __init__(self, parent, width=600, height=100, rate=16000, chunk=1024):
+    def __init__(self, parent, width=600, height=100, rate=16000, chunk=1024, window_s=WINDOW_S):
         super().__init__(parent)
         self.width = width
         self.height = height
         self.rate = rate
         self.chunk = chunk
-        self.canvas = Canvas(self, width=self.width, height=self.height, bg="black")
+        self.canvas = Canvas(self, width=self.width, height=self.height, bg="black", highlightthickness=0)
         self.canvas.pack()
-        self.running = False
-        self.stream = None
-        self.audio = pyaudio.PyAudio()
+        mid = self.height // 2
+        # one persistent polygon (upper envelope left→right, lower right→left); frames only move its points
+        self.shape = self.canvas.create_polygon(0, mid, self.width, mid, fill="lime", outline="lime")
+        self.buffer = np.zeros(max(int(rate * window_s), width), dtype=np.int16)
+        self.pump = FramePump(self, self._draw_waveform)
+        self.capture = MicCapture(self.pump, rate=rate, chunk=chunk)
+
+    @property
+    def running(self):
+        return self.capture.running
 
     def start(self, device_index=None):
-        self.running = True
-        self.stream = self.audio.open(format=pyaudio.paInt16,
-                                      channels=1,
-                                      rate=self.rate,
-                                      input=True,
-                                      input_device_index=device_index,
-                                      frames_per_buffer=self.chunk)
-        threading.Thread(target=self._update_waveform, daemon=True).start()
+        self.capture.start(device_index)
 
     def stop(self):
-        self.running = False
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        self.audio.terminate()
-
-    def _update_waveform(self):
-        while self.running:
-            try:
-                data = self.stream.read(self.chunk, exception_on_overflow=False)
-                samples = np.frombuffer(data, dtype=np.int16)
-                self._draw_waveform(samples)
-            except Exception as e:
-                print(f"[Waveform] Error: {e}")
-                break
-            time.sleep(0.03)
-
-    def _draw_waveform(self, samples):
-        self.canvas.delete("all")
-        mid = self.height // 2
-        scale = self.height / 2 / max(np.max(samples), 1)
-        step = max(1, len(samples) // self.width)
-        points = []
-        for x in range(0, self.width):
-            idx = x * step
-            if idx < len(samples):
-                y = int(mid - samples[idx] * scale)
-                points.append((x, y))
-        for x, y in points:
-            self.canvas.create_line(x, mid, x, y, fill="lime", width=1)
+        self.capture.stop()
+        self.capture.audio.terminate()
+
+    def _draw_waveform(self, chunks):
+        """Tk main loop only (FramePump): scroll the new chunks in, redraw the envelope."""
+        new = np.concatenate(chunks)[-len(self.buffer):]
+        self.buffer = np.roll(self.buffer, -len(new))
+        self.buffer[-len(new):] = new
+
+        lo, hi = minmax_envelope(self.buffer, self.width)
+        mid = self.height / 2
+        scale = mid / max(int(np.abs(self.buffer).max()), MIN_PEAK)
+        xs = np.linspace(0, self.width - 1, len(hi))
+        top = np.column_stack([xs, mid - hi * scale])
+        bottom = np.column_stack([xs[::-1], mid - lo[::-1] * scale])
+        self.canvas.coords(self.shape, np.concatenate([top, bottom]).ravel().tolist())
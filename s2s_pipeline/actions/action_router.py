@@ -1,38 +1,50 @@
 """
 actions/action_router.py
 ─────────────────────────────────────────────────────────────────────
-• Slot-filling state-machine for `send_email`
-• Fuzzy contact lookup using RapidFuzz
+• Action registry (`register_action`): sync or async handlers, started
+  off the voice loop with `submit_action`
+• `send_email` handler (its slots are filled by dialogue/task_forms)
+• Fuzzy contact lookup using RapidFuzz (indexed, hot-reloaded)
 • Returns either plain-text (speak immediately) OR a dict
   {response:str, action:{...}} when more info is needed.
 """
 
 from __future__ import annotations
-import os, json, re, smtplib
+import asyncio, inspect, os, json, re, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 from email.mime.text import MIMEText
-from difflib import get_close_matches
 from dotenv import load_dotenv
-from rapidfuzz import process, fuzz
+from s2s_pipeline.actions.contact_index import ContactIndex
+from s2s_pipeline.actions.email_outbox import get_outbox
+from s2s_pipeline.asr.session_vocabulary import record_resolution
+from s2s_pipeline.utils.contact_store import ContactStore, delta_path, normalize_name
 
 # ── credentials (.env) ───────────────────────────────────────────────
 load_dotenv()
 EMAIL        = os.getenv("EMAIL_ADDRESS")
-PASSWORD     = os.getenv("EMAIL_PASSWORD")
-SMTP_SERVER  = os.getenv("EMAIL_SMTP_SERVER", "smtp.gmail.com")
-SMTP_PORT    = int(os.getenv("EMAIL_SMTP_PORT", 465))
+# server / password / security are read by email_outbox.get_outbox()
 personal_files = r'../s2s_ai_pipeline/personaldata/'
 
 # ── contacts ----------------------------------------------------------
-def load_contacts(path=personal_files+"contacts.json") -> dict[str, str]:
+# either a JSON dict or a compiled store built by utils/contact_ingest (*.s2sc)
+CONTACTS_PATH = os.getenv("CONTACTS_PATH", personal_files + "contacts.json")
+
+def load_contacts(path=CONTACTS_PATH) -> dict[str, str]:
+    if path.endswith(".s2sc"):
+        # memory-mapped; keys are already normalised (lower-case)
+        return ContactStore.open(path)
     try:
         with open(path, encoding="utf-8") as f:
-            # store keys lower-cased
-            return {k.lower(): v for k, v in json.load(f).items()}
+            # keys in the same form as the compiled store / spoken lookups
+            return {normalize_name(k): v for k, v in json.load(f).items()}
     except FileNotFoundError:
         print('No Contact List Found. Provide the info for better detection of contact address')
         return {}
 
-CONTACTS: dict[str, str] = load_contacts()
+# Indexed once, re-indexed automatically when the file changes
+CONTACT_INDEX = ContactIndex(CONTACTS_PATH, load_contacts,
+                             watch=(delta_path(CONTACTS_PATH),))
 
 # ── helper functions --------------------------------------------------
 STOP_WORDS = {
@@ -41,12 +53,8 @@ STOP_WORDS = {
 }
 
 def _clean_token(raw: str) -> str:
-    """Lower-case, remove stop-words & punctuation."""
-    words = [
-        w for w in re.split(r"\W+", raw.lower())
-        if w and w not in STOP_WORDS
-    ]
-    return " ".join(words)
+    """Lower-case, remove stop-words & punctuation (contact keys use the same normaliser)."""
+    return " ".join(w for w in normalize_name(raw).split() if w not in STOP_WORDS)
 
 def normalise_email(txt: str) -> str:
     """Turn 'john at g mail dot com' → 'john@gmail.com'"""
@@ -59,7 +67,7 @@ def resolve_email(name_or_addr: str) -> tuple[str | None, bool]:
     """
     Returns (email, needs_confirmation)
     • Already an address  → (norm, False)
-    • Exact or fuzzy match in CONTACTS
+    • Exact or fuzzy match in the contact index
     • needs_confirmation=True when matched via fuzzy rule
     """
     token_raw = name_or_addr.strip()
@@ -70,45 +78,61 @@ def resolve_email(name_or_addr: str) -> tuple[str | None, bool]:
     if not token:
         return None, False
 
-    # 1) exact key
-    if token in CONTACTS:
-        return CONTACTS[token], False
-
-    # 2) fuzzy token_sort_ratio
-    match, score, _ = process.extractOne(
-        token, CONTACTS.keys(), scorer=fuzz.token_sort_ratio
-    ) or (None, 0, None)
-    if score >= 80:
-        return CONTACTS[match], True
-
-    # 3) fuzzy partial_ratio
-    match, score, _ = process.extractOne(
-        token, CONTACTS.keys(), scorer=fuzz.partial_ratio
-    ) or (None, 0, None)
-    if score >= 80:
-        return CONTACTS[match], True
-
-    # 4) try each component word separately
-    for w in token.split():
-        if w in CONTACTS:
-            return CONTACTS[w], True
-        match, score, _ = process.extractOne(
-            w, CONTACTS.keys(), scorer=fuzz.partial_ratio
-        ) or (None, 0, None)
-        if score >= 85:
-            return CONTACTS[match], True
-
-    return None, False
+    # exact → token_sort ≥80 → partial ≥80 → per-word ≥85  (see ContactIndex)
+    email, needs_conf, key = CONTACT_INDEX.lookup(token)
+    record_resolution(email is not None, needs_conf, key or token)   # matched spelling → next turn's ASR hints
+    return email, needs_conf
+
+# ── action registry ---------------------------------------------------
+# type → handler(**parameters); handlers may be plain or `async def`.
+# Return a str to speak, or a {"response", "action"} dict to keep slot-filling.
+ACTION_HANDLERS: dict[str, Callable] = {}
+
+# spoken while a slow action is still running (see pipeline_core)
+ACK_PHRASES = {
+    "send_email": "Okay, one moment.",
+}
+DEFAULT_ACK = "One moment."
+
+ACTION_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="action")
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def register_action(a_type: str, ack: str | None = None):
+    """Decorator: route actions of `a_type` to the function."""
+    def decorator(fn):
+        ACTION_HANDLERS[a_type] = fn
+        if ack:
+            ACK_PHRASES[a_type] = ack
+        return fn
+    return decorator
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Shared loop for async handlers, on its own daemon thread."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="action-loop", daemon=True).start()
+    return _loop
+
+
+def acknowledgement(action: dict | None) -> str:
+    return ACK_PHRASES.get((action or {}).get("type"), DEFAULT_ACK)
+
 
 # ── MAIN dispatcher ---------------------------------------------------
-def execute_action(action: dict | None):
+def submit_action(action: dict | None) -> Future:
     """
-    Return:
-      • str  – say directly
-      • dict – still slot-filling; pass back to LLM pipeline
+    Start an action without blocking the caller.
+    The future resolves to what `execute_action` returns.
     """
     if not isinstance(action, dict):
-        return "I didn't understand that request."
+        future = Future()
+        future.set_result("I didn't understand that request.")
+        return future
 
     a_type = action.get("type")
     params = action.get("parameters", {})
@@ -117,61 +141,44 @@ def execute_action(action: dict | None):
     if "recipient" in params and "to" not in params:
         params["to"] = params.pop("recipient")
 
-    if a_type == "send_email":
-        return send_email(**params)
+    handler = ACTION_HANDLERS.get(a_type)
+    if handler is None:
+        future = Future()
+        future.set_result(f"I’m not set up for the action “{a_type}”.")
+        return future
+    if inspect.iscoroutinefunction(handler):
+        return asyncio.run_coroutine_threadsafe(handler(**params), _event_loop())
+    return ACTION_EXECUTOR.submit(handler, **params)
 
-    return f"I’m not set up for the action “{a_type}”."
 
-# ── send_email slot-filling state-machine -----------------------------
-def send_email(to=None, body=None, subject=None, confirm=False, step=None, **_):
+def execute_action(action: dict | None):
     """
-    Steps:
-      0) resolve name → email
-      1) confirm matched address  (if fuzzy)
-      2) get message body
-      3) send
+    Return:
+      • str  – say directly
+      • dict – still slot-filling; pass back to LLM pipeline
     """
+    return submit_action(action).result()
+
+# ── send_email --------------------------------------------------------
+# Slots (recipient, confirmation, body) are collected by the send_email
+# form in dialogue/task_forms; by the time we get here both are filled.
+# A direct call with a contact name that needs a "Did you mean …?" (or
+# doesn't resolve) hands back to that form instead of sending.
+@register_action("send_email")
+def send_email(to=None, body=None, subject=None, **_):
     if subject is None:
         subject = "Voice assistant message"
 
-    # 0️⃣ resolve name (first turn)
-    if to and "@" not in to and step is None:
+    if to and "@" not in to:                # called directly with a contact name
         email, needs_conf = resolve_email(to)
-        if email:
-            if needs_conf:
-                return {
-                    "response": f"Did you mean {email}?",
-                    "action": { "type": "send_email",
-                                "parameters": { "to": email,
-                                                "step": "awaiting_recipient_confirm"} }
-                }
-            # straight to body
-            return {
-                "response": f"What message should I send to {email}?",
-                "action": { "type": "send_email",
-                            "parameters": { "to": email, "step": "awaiting_body"} }
-            }
-        return "I couldn’t find that contact. Please say or spell the address."
-
-    # 1️⃣ awaiting yes/no confirmation
-    if step == "awaiting_recipient_confirm":
-        if confirm and to:
-            return {
-                "response": f"What message should I send to {to}?",
-                "action": { "type": "send_email",
-                            "parameters": { "to": to, "step": "awaiting_body"} }
-            }
-        return "Okay, please give me the correct e-mail address."
-
-    # 2️⃣ ask for body (still missing)
-    if to and not body:
-        return {
-            "response": f"What message should I send to {to}?",
-            "action": { "type": "send_email",
-                        "parameters": { "to": to, "step": "awaiting_body"} }
-        }
-
-    # 3️⃣ send
+        if needs_conf or not email:         # nobody confirmed that guess: ask, via the form
+            from s2s_pipeline.dialogue import task_forms
+            step = task_forms.begin({"type": "send_email",
+                                     "parameters": {"to": to, "body": body, "subject": subject}})
+            return {"response": step.say, "action": step.action}
+        to = email
+
+    # send
     if to and body:
         try:
             to_norm = normalise_email(to)
@@ -183,13 +190,14 @@ def send_email(to=None, body=None, subject=None, confirm=False, step=None, **_):
             msg["From"]    = EMAIL
             msg["To"]      = to_norm
 
-            with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT) as srv:
-                srv.login(EMAIL, PASSWORD)
-                srv.send_message(msg)
+            # queued durably; delivery happens on the outbox worker
+            msg_id = get_outbox().enqueue(msg, EMAIL, to_norm)
+            print(f"[Outbox] queued message {msg_id} → {to_norm}")
 
-            return f"I’ve sent your message to {to_norm}."
+            return f"Okay, your message to {to_norm} is on its way."
         except Exception as e:
-            return f"Sorry, I couldn’t send the email. {e}"
+            print(f"[Outbox] ❌ could not queue message: {e}")
+            return "Sorry, I couldn’t queue that email. Please try again."
 
     # Fallback
     return "I’m missing some information to send that e-mail."
@@ -0,0 +1,221 @@
+"""
+actions/contact_index.py
+─────────────────────────────────────────────────────────────────────
+Address-book index for `resolve_email`, sized for 50k+ entry directories.
+
+• Built once, rebuilt when the contacts file's (or its delta log's) mtime
+  changes (hot reload); the mapping may be a dict or a memory-mapped
+  ContactStore, which is closed RETIRE_AFTER_S after it was replaced
+• Large directories serve lookups straight away: the character profiles
+  are built on a background thread and, until ready, candidates are every key
+• Pruning is exact: a key is skipped only when a character-count bound
+  proves its score is below the step's threshold (ratio ≥ p needs
+  2·LCS ≥ p·(len₁+len₂), partial_ratio ≥ p needs LCS ≥ p·min(len)/(2−p),
+  and LCS ≤ the shared character multiset), checked for all keys in one
+  NumPy pass; the per-word pass is one RapidFuzz `cdist` batch
+• So steps, thresholds, tie-breaking and `needs_confirmation` are those of
+  the original linear scans (exact → token_sort ≥80 → partial ≥80 →
+  per-word ≥85) for every query; directories below PRUNE_MIN_CONTACTS are
+  scored in full
+• `lookup` returns the matched key with the e-mail, so callers never scan
+  the directory to find which spelling was hit
+"""
+
+from __future__ import annotations
+import os, threading, time
+from typing import Callable, Mapping, NamedTuple
+import numpy as np
+from rapidfuzz import fuzz, process
+
+PRUNE_MIN_CONTACTS = 2000      # below this, scoring everything is already fast
+RELOAD_CHECK_S     = 2.0       # how often to stat() the contacts file
+RETIRE_AFTER_S     = 30.0      # lookups still holding a replaced mapping finish well within this
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+_BUCKET    = {c: i for i, c in enumerate(_ALPHABET)}
+_OTHER     = len(_ALPHABET)        # every other non-" " char shares one bucket (still an upper bound)
+_WIDTH     = _OTHER + 1
+
+
+class ContactMatch(NamedTuple):
+    email: str | None
+    needs_confirmation: bool
+    key: str | None                 # directory key that matched (None: no match)
+
+
+def _char_counts(texts: list[str]) -> np.ndarray:
+    """(len(texts), _WIDTH) counts of each char bucket, spaces excluded."""
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        for ch in text:
+            if ch != " ":
+                rows.append(i)
+                cols.append(_BUCKET.get(ch, _OTHER))
+    flat = np.bincount(np.asarray(rows, dtype=np.intp) * _WIDTH + np.asarray(cols, dtype=np.intp),
+                       minlength=len(texts) * _WIDTH)
+    return flat.reshape(len(texts), _WIDTH).astype(np.uint16)
+
+
+def _min_common(cutoff: float, len_a, len_b, partial: bool):
+    """Fewest shared characters (LCS upper bound) a pair needs to reach `cutoff`."""
+    p = cutoff / 100.0
+    if partial:                                 # best window t': 2L ≥ p(m+|t'|) ≥ p(m+L)
+        return p * np.minimum(len_a, len_b) / (2.0 - p) - 1e-6
+    return p * (len_a + len_b) / 2.0 - 1e-6
+
+
+class ContactIndex:
+    @classmethod
+    def from_contacts(cls, contacts: dict[str, str]) -> "ContactIndex":
+        """Static index over an in-memory mapping (no file, no reloads)."""
+        return cls(None, lambda _: contacts)
+
+    def __init__(self, path: str | None, loader: Callable[[str | None], Mapping[str, str]],
+                 watch: tuple[str, ...] = ()):
+        self.path = path
+        self.loader = loader
+        self.watch = ((path,) if path else ()) + tuple(watch)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self._snap = _Snapshot({}, [])
+        self.refresh(force=True)
+
+    # ── (re)building ─────────────────────────────────────────────────
+    def _signature(self) -> tuple:
+        sig = []
+        for p in self.watch:
+            try:
+                sig.append(os.stat(p).st_mtime_ns)
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if a watched file changed since the last build. Returns True on reload."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        self._next_check = now + RELOAD_CHECK_S
+        mtime = self._signature()
+        if not force and mtime == self._mtime:
+            return False
+        with self._lock:
+            contacts = self.loader(self.path)
+            snap = _Snapshot(contacts, list(contacts))
+            old, self._snap = self._snap, snap      # single attribute swap: lookups stay consistent
+            self._mtime = mtime
+        if callable(getattr(old.contacts, "close", None)):
+            timer = threading.Timer(RETIRE_AFTER_S, old.contacts.close)   # releases the mmap
+            timer.daemon = True
+            timer.start()
+        if len(snap.keys) >= PRUNE_MIN_CONTACTS:
+            threading.Thread(target=snap.build_profiles, name="contact-index", daemon=True).start()
+        else:
+            snap.ready.set()                        # small directories are scored in full anyway
+        print(f"[Contacts] Loaded {len(snap.keys)} contacts")
+        return True
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the current snapshot's character profiles are built."""
+        return self._snap.ready.wait(timeout)
+
+    @property
+    def contacts(self) -> Mapping[str, str]:
+        return self._snap.contacts
+
+    def __len__(self):
+        return len(self._snap.keys)
+
+    # ── scoring helpers ──────────────────────────────────────────────
+    @staticmethod
+    def _best(query: str, choices: list[str], scorer, cutoff: float) -> str | None:
+        """First best-scoring choice at or above `cutoff` (process.extractOne semantics)."""
+        hit = process.extractOne(query, choices, scorer=scorer, score_cutoff=cutoff) if choices else None
+        return hit[0] if hit else None
+
+    # ── lookup ───────────────────────────────────────────────────────
+    def lookup(self, token: str) -> ContactMatch:
+        """
+        `token` is already cleaned (lower-case, stop-words removed).
+        Returns (email, needs_confirmation, matched key).
+        """
+        self.refresh()
+        snap = self._snap
+        contacts = snap.contacts
+
+        # 1) exact key
+        if token in contacts:
+            return ContactMatch(contacts[token], False, token)
+
+        # 2) fuzzy token_sort_ratio
+        pool = snap.candidates(token, cutoff=80, partial=False)
+        match = self._best(token, pool, fuzz.token_sort_ratio, 80)
+        if match is not None:
+            return ContactMatch(contacts[match], True, match)
+
+        # 3) fuzzy partial_ratio
+        pool = snap.candidates(token, cutoff=80, partial=True)
+        match = self._best(token, pool, fuzz.partial_ratio, 80)
+        if match is not None:
+            return ContactMatch(contacts[match], True, match)
+
+        # 4) try each component word separately; every word is scored in one
+        #    cdist batch against the union of the words' candidates
+        words = token.split()
+        pool = snap.candidates(*words, cutoff=85, partial=True) if words else []
+        scores = (process.cdist(words, pool, scorer=fuzz.partial_ratio, dtype=np.float32,
+                                score_cutoff=85, workers=-1) if pool else None)
+        for row, w in enumerate(words):
+            if w in contacts:
+                return ContactMatch(contacts[w], True, w)
+            if scores is not None:
+                i = int(np.argmax(scores[row]))
+                if scores[row, i] >= 85:
+                    return ContactMatch(contacts[pool[i]], True, pool[i])
+
+        return ContactMatch(None, False, None)
+
+
+class _Snapshot:
+    __slots__ = ("contacts", "keys", "counts", "spaces", "lengths", "sorted_spaces", "sorted_lengths",
+                 "ready")
+
+    def __init__(self, contacts, keys):
+        self.contacts, self.keys = contacts, keys
+        self.counts = self.spaces = self.lengths = self.sorted_spaces = self.sorted_lengths = None
+        self.ready = threading.Event()
+
+    def build_profiles(self):
+        """Per key: char-bucket counts, plus space count / length as scored raw
+        (partial_ratio) and with sorted tokens (token_sort_ratio)."""
+        keys = self.keys
+        ntok = np.fromiter((len(k.split()) for k in keys), dtype=np.int32, count=len(keys))
+        self.spaces = np.fromiter((k.count(" ") for k in keys), dtype=np.int32, count=len(keys))
+        self.lengths = np.fromiter((len(k) for k in keys), dtype=np.int32, count=len(keys))
+        self.sorted_spaces = np.maximum(ntok - 1, 0)
+        self.sorted_lengths = np.fromiter((len(" ".join(k.split())) for k in keys), dtype=np.int32,
+                                          count=len(keys))
+        self.counts = _char_counts(keys)
+        self.ready.set()
+
+    def candidates(self, *queries: str, cutoff: float, partial: bool) -> list[str]:
+        """
+        Keys that may score ≥ `cutoff` against any of `queries` (partial_ratio
+        if `partial`, else token_sort_ratio), in file order so extractOne /
+        argmax tie-breaking is unchanged.  Every key while profiles build.
+        """
+        if len(self.keys) < PRUNE_MIN_CONTACTS or not self.ready.is_set():
+            return self.keys
+        keep = np.zeros(len(self.keys), dtype=bool)
+        for query, counts in zip(queries, _char_counts(list(queries))):
+            shared = np.minimum(self.counts, counts).sum(axis=1, dtype=np.int32)
+            if partial:
+                shared += np.minimum(self.spaces, query.count(" "))
+                keep |= shared >= _min_common(cutoff, self.lengths, len(query), partial=True)
+            else:
+                words = query.split()
+                shared += np.minimum(self.sorted_spaces, max(len(words) - 1, 0))
+                keep |= shared >= _min_common(cutoff, self.sorted_lengths, len(" ".join(words)),
+                                              partial=False)
+        return [self.keys[i] for i in np.flatnonzero(keep)]
@@ -0,0 +1,283 @@
+"""
+actions/email_outbox.py
+─────────────────────────────────────────────────────────────────────
+Durable, asynchronous e-mail delivery for `send_email`.
+
+• `enqueue()` writes the message to an SQLite queue and returns its id at
+  once – the voice turn never waits on TLS, auth or the SMTP dialogue
+• one background worker per process claims due messages in batches and
+  sends them over a pooled, authenticated connection (NOOP-checked after
+  idling, reopened on error)
+• transient failures retry with exponential backoff; permanent 5xx replies
+  or MAX_ATTEMPTS mark the message `failed`
+• connect / TLS / login failures (even 5xx such as 535) are not the
+  message's fault: the whole batch backs off and stays queued without
+  spending attempts
+• `status(id)` / `recent()` report delivery state later
+
+Rows claimed by a worker that died are re-queued after CLAIM_LEASE_S, so
+several processes can share one queue file.
+Config: EMAIL_SMTP_SECURITY=ssl|starttls|plain, OUTBOX_DB.
+Local testing:  python scripts/smtp_sink.py  +  EMAIL_SMTP_SERVER=localhost
+EMAIL_SMTP_PORT=1025 EMAIL_SMTP_SECURITY=plain
+"""
+
+from __future__ import annotations
+import os, smtplib, sqlite3, threading, time, uuid
+from typing import Callable
+
+BATCH_SIZE    = 20
+MAX_ATTEMPTS  = 6
+BACKOFF_S     = 2.0           # 2, 4, 8 … seconds between attempts
+MAX_BACKOFF_S = 300.0
+NOOP_AFTER_S  = 30.0          # check a pooled connection that has idled this long
+IDLE_CLOSE_S  = 120.0         # …and drop it after this long without mail
+CLAIM_LEASE_S = 300.0
+
+
+def smtp_connector(host: str, port: int, user: str | None, password: str | None,
+                   security: str = "ssl", timeout: float = 20.0) -> Callable[[], smtplib.SMTP]:
+    """Factory returning connected, logged-in SMTP clients."""
+    def connect() -> smtplib.SMTP:
+        if security == "ssl":
+            srv = smtplib.SMTP_SSL(host, port, timeout=timeout)
+        else:
+            srv = smtplib.SMTP(host, port, timeout=timeout)
+            if security == "starttls":
+                srv.starttls()
+        if user and password:
+            srv.login(user, password)
+        return srv
+    return connect
+
+
+def _is_permanent(exc: Exception) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+class EmailOutbox:
+    def __init__(self, path: str, connect: Callable[[], smtplib.SMTP],
+                 batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_s: float = BACKOFF_S):
+        self.path = path
+        self.connect = connect
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "connects": 0, "deferred": 0}
+        self._connect_failures = 0
+
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self._thread: threading.Thread | None = None
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " sender TEXT, recipient TEXT NOT NULL, message TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'queued',"     # queued | sending | sent | failed
+            " attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL,"
+            " claimed_by TEXT, claimed_at REAL, last_error TEXT,"
+            " created_at REAL NOT NULL, sent_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── producer side ────────────────────────────────────────────────
+    def enqueue(self, msg, sender: str | None = None, recipient: str | None = None) -> int:
+        """Persist an email.message.Message; returns its outbox id."""
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO outbox (sender, recipient, message, next_attempt, created_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (sender or msg["From"], recipient or msg["To"], msg.as_string(), now, now),
+        )
+        self.start()
+        self._wake.set()
+        return cur.lastrowid
+
+    def status(self, message_id: int) -> dict | None:
+        row = self._conn().execute(
+            "SELECT id, recipient, status, attempts, last_error, created_at, sent_at"
+            " FROM outbox WHERE id = ?", (message_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "to", "status", "attempts", "last_error", "created_at", "sent_at")
+        return dict(zip(keys, row))
+
+    def recent(self, limit: int = 10) -> list[dict]:
+        ids = self._conn().execute("SELECT id FROM outbox ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self.status(i) for (i,) in ids]
+
+    def pending(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM outbox WHERE status IN ('queued', 'sending')").fetchone()[0]
+
+    # ── worker ───────────────────────────────────────────────────────
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._drop_connection()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until nothing is queued or in flight (for scripts and shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() > deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.05)
+        return True
+
+    def _claim(self) -> list[tuple]:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(      # re-queue rows whose worker vanished mid-send
+                "UPDATE outbox SET status = 'queued' WHERE status = 'sending' AND claimed_at < ?",
+                (now - CLAIM_LEASE_S,))
+            rows = conn.execute(
+                "SELECT id, sender, recipient, message, attempts FROM outbox"
+                " WHERE status = 'queued' AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (now, self.batch_size)).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                [(self.worker_id, now, r[0]) for r in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _next_due(self) -> float | None:
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt) FROM outbox WHERE status = 'queued'").fetchone()
+        return row[0]
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > NOOP_AFTER_S:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP rejected")
+            except (smtplib.SMTPException, OSError):
+                self._drop_connection()
+        if self._smtp is None:
+            self._smtp = self.connect()
+            self.stats["connects"] += 1
+            self._connect_failures = 0
+        return self._smtp
+
+    def _drop_connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _defer(self, rows, exc: Exception):
+        """Connection-level failure: back off the rest of the batch, attempts unchanged."""
+        self._connect_failures += 1
+        delay = min(self.backoff_s * 2 ** (self._connect_failures - 1), MAX_BACKOFF_S)
+        self._conn().executemany(
+            "UPDATE outbox SET status = 'queued', last_error = ?, next_attempt = ? WHERE id = ?",
+            [(str(exc), time.time() + delay, r[0]) for r in rows])
+        self.stats["deferred"] += len(rows)
+        print(f"[Outbox] ⚠️ SMTP connection failed, {len(rows)} message(s) retry in {delay:.1f}s: {exc}")
+
+    def _send_batch(self, rows):
+        conn = self._conn()
+        for idx, (msg_id, sender, recipient, message, attempts) in enumerate(rows):
+            try:
+                smtp = self._connection()
+            except Exception as e:                      # connect / TLS / login
+                self._defer(rows[idx:], e)
+                return
+            try:
+                smtp.sendmail(sender, [recipient], message.encode("utf-8"))
+                self._last_used = time.monotonic()
+                conn.execute("UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?,"
+                             " last_error = NULL WHERE id = ?", (attempts + 1, time.time(), msg_id))
+                self.stats["sent"] += 1
+            except Exception as e:
+                attempts += 1
+                if _is_permanent(e) or attempts >= self.max_attempts:
+                    conn.execute("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?"
+                                 " WHERE id = ?", (attempts, str(e), msg_id))
+                    self.stats["failed"] += 1
+                    print(f"[Outbox] ❌ message {msg_id} to {recipient} failed: {e}")
+                else:
+                    delay = min(self.backoff_s * 2 ** (attempts - 1), MAX_BACKOFF_S)
+                    conn.execute("UPDATE outbox SET status = 'queued', attempts = ?, last_error = ?,"
+                                 " next_attempt = ? WHERE id = ?",
+                                 (attempts, str(e), time.time() + delay, msg_id))
+                    self.stats["retried"] += 1
+                    print(f"[Outbox] ⚠️ message {msg_id} retry in {delay:.1f}s: {e}")
+                if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                    self._drop_connection()                 # connection state is unknown
+                    if not _is_permanent(e):                # server trouble: retry the rest later
+                        conn.executemany("UPDATE outbox SET status = 'queued' WHERE id = ?",
+                                         [(r[0],) for r in rows[idx + 1:]])
+                        return
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                rows = self._claim()
+                if rows:
+                    self._send_batch(rows)
+                    continue
+                if self._smtp is not None and time.monotonic() - self._last_used > IDLE_CLOSE_S:
+                    self._drop_connection()
+                due = self._next_due()
+                wait = IDLE_CLOSE_S if due is None else max(0.0, due - time.time())
+            except sqlite3.Error as e:
+                print(f"[Outbox] ⚠️ queue error: {e}")
+                wait = 1.0
+            self._wake.wait(min(wait, NOOP_AFTER_S))
+            self._wake.clear()
+
+
+# ── factory ───────────────────────────────────────────────────────────
+_outbox: EmailOutbox | None = None
+
+
+def get_outbox() -> EmailOutbox:
+    """Process-wide outbox using the EMAIL_* settings from .env."""
+    global _outbox
+    if _outbox is None:
+        port = int(os.getenv("EMAIL_SMTP_PORT", 465))
+        connect = smtp_connector(
+            os.getenv("EMAIL_SMTP_SERVER", "smtp.gmail.com"), port,
+            os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD"),
+            os.getenv("EMAIL_SMTP_SECURITY", "ssl" if port == 465 else "starttls").lower(),
+        )
+        _outbox = EmailOutbox(os.getenv("OUTBOX_DB", "email_outbox.db"), connect)
+        _outbox.start()          # drain anything left from a previous run
+    return _outbox
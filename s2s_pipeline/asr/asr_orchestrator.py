@@ -0,0 +1,304 @@
+"""
+asr/asr_orchestrator.py
+─────────────────────────────────────────────────────────────────────
+One `transcribe_audio` in front of several ASR backends (Deepgram, local
+Whisper …), so a slow or dead uplink no longer stalls the turn.
+
+• ASR_POLICY
+    primary   – primary backend only (the old hard-wired behaviour)
+    fallback  – primary first; if it has not answered after its recent p95
+                latency (capped by ASR_FALLBACK_AFTER_S) or it errors, the
+                fallback starts too and the first acceptable result wins
+    race      – both start at once; first acceptable result wins
+• ASR_PRIMARY / ASR_FALLBACK name backends: deepgram, whisper,
+  faster-whisper, long-audio (defaults: deepgram → whisper)
+• "acceptable" = non-empty transcript that the model itself is not
+  unsure of (no_speech_prob / avg_logprob); if nothing acceptable arrives
+  the first non-error result is returned
+• losers are abandoned, not waited for: their result is discarded when it
+  lands.  Backends get the remaining turn deadline as their timeout, so a
+  remote call cannot outlive the turn; in-process Whisper inference cannot
+  be interrupted and finishes in the background
+• every backend has its own executor, so an abandoned local call never
+  queues the primary behind it; a local backend (one worker) that still
+  has a call in flight is skipped for the turn and counted as `busy`
+  instead of queueing another call behind it (unless nothing else can run)
+• `vocabulary` (session contact names, see session_vocabulary) is handed
+  to every backend as a hint
+• per-backend requests / wins / failures / timeouts / abandoned counts
+  and latency percentiles: `asr_stats()`
+• a backend that fails FAILURE_THRESHOLD times in a row is benched for
+  COOLDOWN_S; the other one takes over without waiting for the delay
+"""
+
+from __future__ import annotations
+import importlib, os, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ASR_POLICY          = os.getenv("ASR_POLICY", "fallback").lower()
+ASR_PRIMARY         = os.getenv("ASR_PRIMARY", "deepgram")
+ASR_FALLBACK        = os.getenv("ASR_FALLBACK", "whisper")
+FALLBACK_AFTER_S    = float(os.getenv("ASR_FALLBACK_AFTER_S", 1.5))
+MIN_FALLBACK_AFTER_S = 0.3
+DEFAULT_TIMEOUT_S   = 15.0
+FAILURE_THRESHOLD   = 3
+COOLDOWN_S          = 30.0
+LATENCY_WINDOW      = 200
+NO_SPEECH_MAX       = 0.8
+LOGPROB_MIN         = -1.2
+
+BACKEND_MODULES = {
+    "deepgram":       "s2s_pipeline.asr.deepgram_asr",
+    "whisper":        "s2s_pipeline.asr.whisper_asr",
+    "faster-whisper": "s2s_pipeline.asr.faster_whisper_asr",
+    "long-audio":     "s2s_pipeline.asr.long_audio",
+}
+LOCAL_BACKENDS = {"whisper", "faster-whisper", "long-audio"}
+REMOTE_WORKERS = 8          # concurrent requests per remote backend (local ones run one at a time)
+
+
+def acceptable(result: dict) -> bool:
+    if not result.get("transcript", "").strip():
+        return False
+    no_speech, logprob = result.get("no_speech_prob"), result.get("avg_logprob")
+    if no_speech is not None and no_speech > NO_SPEECH_MAX:
+        return False
+    return logprob is None or logprob >= LOGPROB_MIN
+
+
+class ASRBackend:
+    def __init__(self, name: str, fn):
+        self.name = name
+        self.fn = fn
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.local = name in LOCAL_BACKENDS
+        self.executor = ThreadPoolExecutor(max_workers=1 if self.local else REMOTE_WORKERS,
+                                           thread_name_prefix=f"asr-{name}")
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "wins": 0, "failures": 0, "timeouts": 0,
+                      "rejected": 0, "abandoned": 0, "busy": 0}
+
+    @classmethod
+    def load(cls, name: str) -> "ASRBackend | None":
+        """None if the backend's dependencies or credentials are missing."""
+        try:
+            module = importlib.import_module(BACKEND_MODULES[name])
+        except KeyError:
+            print(f"[ASR] Unknown backend {name!r} (choose from {', '.join(BACKEND_MODULES)})")
+            return None
+        except (ImportError, RuntimeError) as e:
+            print(f"[ASR] Backend {name!r} unavailable: {e}")
+            return None
+        return cls(name, module.transcribe_audio)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def busy(self) -> bool:
+        """A local backend still working on an earlier (possibly abandoned) call."""
+        return self.local and self.in_flight > 0
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            self.in_flight += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _):
+        with self._lock:
+            self.in_flight -= 1
+
+    def percentile(self, p: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def fallback_delay(self) -> float:
+        p95 = self.percentile(0.95) if len(self.latencies) >= 10 else None
+        return FALLBACK_AFTER_S if p95 is None else max(MIN_FALLBACK_AFTER_S, min(p95, FALLBACK_AFTER_S))
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+
+    def record_failure(self, now: float, timeout: bool = False):
+        self.stats["timeouts" if timeout else "failures"] += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.down_until = now + COOLDOWN_S
+            print(f"[ASR] Backend {self.name} benched for {COOLDOWN_S:.0f}s")
+
+    def __repr__(self):
+        return f"ASRBackend({self.name!r})"
+
+
+class ASROrchestrator:
+    def __init__(self, backends: list[ASRBackend], policy: str = ASR_POLICY):
+        if not backends:
+            raise RuntimeError("No ASR backend available (check DEEPGRAM_API_KEY / local Whisper install).")
+        if policy not in ("primary", "fallback", "race"):
+            raise ValueError(f"ASR_POLICY must be primary, fallback or race – got {policy!r}")
+        self.backends = backends
+        self.policy = policy if len(backends) > 1 else "primary"
+        self.stats = {"requests": 0, "fallbacks": 0, "unavailable": 0}
+
+    def _call(self, backend: ASRBackend, audio_path: str, timeout: float,
+              vocabulary: list[str] | None = None) -> tuple[dict, float]:
+        start = time.perf_counter()
+        result = backend.fn(audio_path, timeout=timeout, vocabulary=vocabulary)
+        return result, time.perf_counter() - start
+
+    def _order(self) -> list[ASRBackend]:
+        """Configured order, benched backends last."""
+        now = time.monotonic()
+        return sorted(self.backends, key=lambda b: not b.healthy(now))
+
+    def transcribe(self, audio_path: str, timeout: float | None = None,
+                   vocabulary: list[str] | None = None) -> dict:
+        timeout = DEFAULT_TIMEOUT_S if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self.stats["requests"] += 1
+        queue = self._order()
+        running: dict[Future, ASRBackend] = {}
+        fallback_result: tuple[dict, ASRBackend] | None = None
+        last_error = None
+
+        def launch() -> bool:
+            while queue:
+                backend = queue.pop(0)
+                if backend.busy() and (queue or running):        # would only wait behind itself
+                    backend.stats["busy"] += 1
+                    continue
+                backend.stats["requests"] += 1
+                remaining = max(0.05, deadline - time.monotonic())
+                running[backend.submit(self._call, backend, audio_path, remaining, vocabulary)] = backend
+                return True
+            return False
+
+        launch()
+        primary = next(iter(running.values()))
+        if self.policy == "race":
+            while launch():
+                pass
+        benched_primary = not primary.healthy(time.monotonic())     # everything is benched
+        try:
+            while running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait_for = remaining
+                if self.policy == "fallback" and queue and len(running) == 1:
+                    wait_for = 0 if benched_primary else min(remaining, primary.fallback_delay())
+
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                if not done:
+                    if self.policy == "fallback" and launch():
+                        self.stats["fallbacks"] += 1
+                        print(f"[ASR] {primary.name} slow – starting {list(running.values())[-1].name}")
+                    continue
+
+                for future in done:
+                    backend = running.pop(future)
+                    try:
+                        result, latency = future.result()
+                    except Exception as e:
+                        last_error = e
+                        backend.record_failure(time.monotonic(), timeout=isinstance(e, TimeoutError))
+                        print(f"[ASR] {backend.name} failed: {e!r}")
+                        if self.policy == "fallback" and launch():
+                            self.stats["fallbacks"] += 1
+                        continue
+                    backend.record_success(latency)
+                    if acceptable(result):
+                        backend.stats["wins"] += 1
+                        print(f"[ASR] {backend.name} won in {latency:.2f}s")
+                        return result
+                    backend.stats["rejected"] += 1
+                    fallback_result = fallback_result or (result, backend)
+                    if self.policy == "fallback" and launch():     # second opinion
+                        self.stats["fallbacks"] += 1
+        finally:
+            for future, backend in running.items():     # losers finish unobserved
+                future.cancel()
+                backend.stats["abandoned"] += 1
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        if fallback_result is not None:                 # silence / low-confidence: still an answer
+            result, backend = fallback_result
+            backend.stats["wins"] += 1
+            return result
+        self.stats["unavailable"] += 1
+        if last_error is not None and not isinstance(last_error, TimeoutError) and time.monotonic() < deadline:
+            raise last_error
+        raise TimeoutError(f"No ASR backend answered within {timeout:.2f}s")
+
+    def warm(self):
+        """Load local models in the background so the first fallback isn't a cold start."""
+        import tempfile
+        import numpy as np
+        from s2s_pipeline.audio.audio_normalize import wav_bytes
+        local = [b for b in self.backends if b.name in LOCAL_BACKENDS]
+        if not local:
+            return
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+            f.write(wav_bytes(np.zeros(16000, np.int16)).getvalue())
+        pending = [len(local)]
+        lock = threading.Lock()
+
+        def done(_):                                # last warm-up out removes the file
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                os.remove(f.name)
+            except OSError:
+                pass
+
+        for backend in local:
+            backend.submit(backend.fn, f.name).add_done_callback(done)
+
+    def summary(self) -> dict:
+        out = {"policy": self.policy, **self.stats}
+        for b in self.backends:
+            p50, p95 = b.percentile(0.5), b.percentile(0.95)
+            out[b.name] = {**b.stats,
+                           "win_rate": round(b.stats["wins"] / max(self.stats["requests"], 1), 3),
+                           "p50_s": round(p50, 3) if p50 is not None else None,
+                           "p95_s": round(p95, 3) if p95 is not None else None}
+        return out
+
+
+_default: ASROrchestrator | None = None
+_default_lock = threading.Lock()
+
+
+def get_asr() -> ASROrchestrator:
+    """Process-wide orchestrator built from ASR_POLICY / ASR_PRIMARY / ASR_FALLBACK."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            names = [ASR_PRIMARY] if ASR_POLICY == "primary" else [ASR_PRIMARY, ASR_FALLBACK]
+            backends = [b for b in map(ASRBackend.load, dict.fromkeys(names)) if b is not None]
+            _default = ASROrchestrator(backends)
+            print(f"[ASR] Policy {_default.policy}: {' → '.join(b.name for b in backends)}")
+    return _default
+
+
+def transcribe_audio(audio_path: str, timeout: float | None = None,
+                     vocabulary: list[str] | None = None) -> dict:
+    return get_asr().transcribe(audio_path, timeout=timeout, vocabulary=vocabulary)
+
+
+def asr_stats() -> dict:
+    return get_asr().summary() if _default is not None else {}
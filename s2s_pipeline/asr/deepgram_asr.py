@@ -13,10 +13,13 @@ Returns the same structure as the old Whisper wrapper:
 }
 """
 
+from __future__ import annotations
 import os, asyncio, warnings
 from typing import Any, Dict, List
 from deepgram import Deepgram
 from dotenv import load_dotenv
+from s2s_pipeline.audio.audio_normalize import normalize
+from s2s_pipeline.asr.session_vocabulary import deepgram_keywords
 
 load_dotenv()
 DG_KEY = os.getenv("DEEPGRAM_API_KEY")
@@ -26,8 +29,10 @@ if not DG_KEY:
 dg = Deepgram(DG_KEY)
 
 # ─────────────────────────────────────────────────────────────
-async def _dg_transcribe(path: str) -> Dict[str, Any]:
-    with open(path, "rb") as f:
+async def _dg_transcribe(path: str, keywords: List[str] | None = None) -> Dict[str, Any]:
+    # uploads may be 48 kHz stereo mp3/m4a – send 16 kHz mono WAV, which is
+    # what the mimetype says and a fraction of the bytes
+    with normalize(path) as f:
         source = {"buffer": f, "mimetype": "audio/wav"}
 
         options = {
@@ -36,19 +41,30 @@ async def _dg_transcribe(path: str) -> Dict[str, Any]:
             "paragraphs": False,
             "smart_format": True,
         }
+        if keywords:
+            options["keywords"] = keywords    # session vocabulary boosts ("Marta:2")
 
         resp: Dict = await dg.transcription.prerecorded(source, options)
         return resp
 
 # Public sync wrapper – same name/signature as before
-def transcribe_audio(audio_path: str) -> Dict[str, Any]:
+def transcribe_audio(audio_path: str, timeout: float | None = None,
+                     vocabulary: List[str] | None = None) -> Dict[str, Any]:
     """
     Deepgram → text + segments; keep return keys identical to Whisper version.
+    Raises TimeoutError if Deepgram hasn't answered within `timeout` seconds.
+    `vocabulary` (names to expect) is sent as keyword boosts.
     """
     warnings.filterwarnings("ignore", category=RuntimeWarning)
+    keywords = deepgram_keywords(vocabulary) if vocabulary else None
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
-    dg_json = loop.run_until_complete(_dg_transcribe(audio_path))
+    try:
+        dg_json = loop.run_until_complete(asyncio.wait_for(_dg_transcribe(audio_path, keywords), timeout))
+    except asyncio.TimeoutError as e:
+        raise TimeoutError(f"Deepgram ASR exceeded {timeout:.2f}s") from e
+    finally:
+        loop.close()
 
     # ── Extract primary fields ─────────────────────────────
     utterance = dg_json["results"]["channels"][0]["alternatives"][0]
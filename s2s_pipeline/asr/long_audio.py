@@ -0,0 +1,172 @@
+"""
+asr/long_audio.py
+─────────────────────────────────────────────────────────────────────
+Long recordings (dictated email bodies, uploaded voicemails) transcribed
+in parallel instead of one 30-s window after another on a single core.
+
+• the file is decoded once to 16 kHz mono and run through webrtcvad
+  (30 ms frames); chunks are cut at the longest pause between
+  CHUNK_MIN_S and CHUNK_MAX_S – never mid-word unless someone talks for
+  CHUNK_MAX_S without a breath – and chunks with no speech are dropped
+• chunks fan out over a process pool (LONG_AUDIO_WORKERS, default
+  cores // 2); each worker loads the local Whisper model once and gets
+  cores / workers intra-op threads so the pool does not oversubscribe
+• segments come back with their chunk offset added and are renumbered,
+  so the result has the usual {"transcript", "segments", "no_speech_prob",
+  "avg_logprob"} shape
+• clips shorter than LONG_AUDIO_MIN_S go straight to whisper_asr
+
+    from s2s_pipeline.asr.long_audio import transcribe_audio
+"""
+
+from __future__ import annotations
+import os, threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+import multiprocessing as mp
+
+import numpy as np
+
+SAMPLE_RATE      = 16000
+FRAME_MS         = 30
+CHUNK_MIN_S      = 10.0
+CHUNK_MAX_S      = 28.0          # stay inside one Whisper window
+MIN_PAUSE_S      = 0.3
+VAD_AGGRESSIVENESS = 2
+LONG_AUDIO_MIN_S = float(os.getenv("LONG_AUDIO_MIN_S", 30))
+LONG_AUDIO_WORKERS = int(os.getenv("LONG_AUDIO_WORKERS", 0)) or max(1, (os.cpu_count() or 2) // 2)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_worker_model = None
+
+
+# ── audio & VAD ───────────────────────────────────────────────────────
+def load_pcm(path: str) -> np.ndarray:
+    """float32 16 kHz mono (audio_normalize – no ffmpeg)."""
+    from s2s_pipeline.audio.audio_normalize import load_float32
+    return load_float32(str(path))
+
+
+def speech_frames(audio: np.ndarray, aggressiveness: int = VAD_AGGRESSIVENESS) -> np.ndarray:
+    """One bool per FRAME_MS frame."""
+    import webrtcvad
+    vad = webrtcvad.Vad(aggressiveness)
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    n = len(pcm) // frame
+    return np.fromiter((vad.is_speech(pcm[i * frame:(i + 1) * frame].tobytes(), SAMPLE_RATE)
+                        for i in range(n)), dtype=bool, count=n)
+
+
+def split_points(speech: np.ndarray, min_s: float = CHUNK_MIN_S, max_s: float = CHUNK_MAX_S,
+                 min_pause_s: float = MIN_PAUSE_S) -> list[tuple[int, int]]:
+    """
+    (start_frame, end_frame) chunks.  Each cut goes in the middle of the
+    longest pause whose centre falls between min_s and max_s after the
+    chunk start; with no such pause the chunk is cut hard at max_s.
+    """
+    per_s = 1000 // FRAME_MS
+    n = len(speech)
+    # pauses as (start, end) frame runs of non-speech
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], speech.view(np.int8), [1]))))
+    pauses = [(s, e) for s, e in zip(edges[::2], edges[1::2]) if e - s >= min_pause_s * per_s]
+    min_f, max_f = int(min_s * per_s), int(max_s * per_s)
+
+    chunks, start = [], 0
+    while n - start > max_f:
+        window = [(e - s, (s + e) // 2) for s, e in pauses if start + min_f <= (s + e) // 2 <= start + max_f]
+        cut = int(max(window)[1]) if window else start + max_f
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, n))
+    # drop chunks the VAD heard nothing in
+    return [(s, e) for s, e in chunks if speech[s:e].any()]
+
+
+# ── worker process ────────────────────────────────────────────────────
+def _init_worker(backend: str, threads: int):
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    if backend in ("faster-whisper", "ctranslate2"):
+        os.environ["FASTER_WHISPER_THREADS"] = str(threads)
+        from s2s_pipeline.asr.faster_whisper_asr import get_model
+        _worker_model = ("faster-whisper", get_model())
+    else:
+        import torch
+        torch.set_num_threads(threads)
+        from s2s_pipeline.asr.whisper_asr import _local_model
+        _worker_model = ("openai", _local_model())
+
+
+def _transcribe_chunk(samples: np.ndarray, prompt: str | None = None) -> list[dict]:
+    backend, model = _worker_model
+    if backend == "faster-whisper":
+        segments, _ = model.transcribe(samples, beam_size=1, initial_prompt=prompt)
+        return [{"start": s.start, "end": s.end, "text": s.text, "avg_logprob": s.avg_logprob,
+                 "no_speech_prob": s.no_speech_prob, "compression_ratio": s.compression_ratio}
+                for s in segments]
+    result = model.transcribe(samples, fp16=False, condition_on_previous_text=False, initial_prompt=prompt)
+    return result["segments"]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from s2s_pipeline.asr.whisper_asr import WHISPER_BACKEND
+            threads = max(1, (os.cpu_count() or 1) // LONG_AUDIO_WORKERS)
+            # spawn: the parent has threads (playback, profiler) that fork would copy mid-state
+            _pool = ProcessPoolExecutor(LONG_AUDIO_WORKERS, mp_context=mp.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(WHISPER_BACKEND, threads))
+            print(f"[LongASR] {LONG_AUDIO_WORKERS} workers × {threads} threads ({WHISPER_BACKEND})")
+    return _pool
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+# ── entry point ───────────────────────────────────────────────────────
+def merge(chunk_segments: list[tuple[float, list[dict]]]) -> dict:
+    segments = []
+    for offset, segs in chunk_segments:
+        for seg in segs:
+            seg = dict(seg, start=round(seg["start"] + offset, 2), end=round(seg["end"] + offset, 2))
+            seg["id"] = len(segments)
+            segments.append(seg)
+    first = segments[0] if segments else {}
+    return {
+        "transcript": " ".join(s["text"].strip() for s in segments if s["text"].strip()),
+        "segments": segments,
+        "no_speech_prob": first.get("no_speech_prob"),
+        "avg_logprob": first.get("avg_logprob"),
+    }
+
+
+def transcribe_audio(audio_path, timeout=None, vocabulary=None) -> dict:
+    audio = load_pcm(audio_path)
+    if len(audio) < LONG_AUDIO_MIN_S * SAMPLE_RATE:
+        from s2s_pipeline.asr.whisper_asr import transcribe_audio as short_transcribe
+        return short_transcribe(audio_path, timeout=timeout, vocabulary=vocabulary)
+
+    from s2s_pipeline.asr.session_vocabulary import whisper_prompt
+    prompt = whisper_prompt(vocabulary)
+
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    chunks = split_points(speech_frames(audio))
+    print(f"[LongASR] {audio_path}: {len(audio) / SAMPLE_RATE:.0f}s → {len(chunks)} chunks")
+    pool = get_pool()
+    futures = [pool.submit(_transcribe_chunk, audio[s * frame:e * frame], prompt) for s, e in chunks]
+    done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    if pending:
+        for f in pending:
+            f.cancel()
+        for f in done:
+            if f.exception() is not None:
+                raise f.exception()
+        raise TimeoutError(f"Long-audio ASR exceeded {timeout:.2f}s")
+    return merge([(s * FRAME_MS / 1000, f.result()) for (s, _), f in zip(chunks, futures)])
@@ -0,0 +1,134 @@
+"""
+asr/session_vocabulary.py
+─────────────────────────────────────────────────────────────────────
+Contact names the ASR should expect this turn, so "email Marta Novak"
+comes back spelt the way the address book spells it and `resolve_email`
+hits the exact path instead of a fuzzy one (+ a "Did you mean …?" turn).
+
+• sources, in priority order, up to ASR_VOCAB_MAX terms:
+    1. entities of this session – recipients named in the task in
+       progress and earlier turns (dialogue_manager.state["entities"])
+    2. contacts resolved recently on this worker (bounded LRU)
+    3. the whole directory, when it is small enough to fit
+• backends take it as  `transcribe_audio(..., vocabulary=[…])`:
+    Deepgram – `keywords` ("Marta:2"), one per name word
+    Whisper / faster-whisper – `initial_prompt` ("Contacts: Marta Novak, …")
+• VOCAB_METRICS: resolution outcomes (exact / fuzzy / missing) and turns
+  per finished e-mail task – compare with ASR_VOCAB_MAX=0 to see the effect
+"""
+
+from __future__ import annotations
+import os, re, threading
+from collections import OrderedDict
+from typing import Mapping
+
+ASR_VOCAB_MAX      = int(os.getenv("ASR_VOCAB_MAX", 50))
+KEYWORD_BOOST      = 2            # Deepgram keyword intensifier
+SESSION_ENTITIES   = 16
+RECENT_CONTACTS    = 256
+PROMPT_MAX_CHARS   = 600          # Whisper's prompt window is 224 tokens
+
+VOCAB_METRICS = {"resolutions": 0, "exact": 0, "fuzzy": 0, "missing": 0,
+                 "email_tasks": 0, "email_task_turns": 0}
+
+_recent: OrderedDict[str, None] = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def display_name(key: str) -> str:
+    """Contact keys are lower-case ("marta novak") – ASR hints read better capitalised."""
+    return " ".join(w.capitalize() for w in key.split())
+
+
+# ── feeding the vocabulary ────────────────────────────────────────────
+def note_contact(key: str):
+    with _recent_lock:
+        _recent[key] = None
+        _recent.move_to_end(key)
+        while len(_recent) > RECENT_CONTACTS:
+            _recent.popitem(last=False)
+
+
+def note_entity(state: dict, name: str):
+    """Remember a name the user said in this session (kept in the dialogue state)."""
+    name = name.strip()
+    if not name or "@" in name:
+        return
+    entities = [e for e in state.get("entities", []) if e != name] + [name]
+    state["entities"] = entities[-SESSION_ENTITIES:]
+
+
+def record_resolution(found: bool, needs_confirmation: bool, key: str | None = None):
+    """Outcome of one `resolve_email` name lookup; `key` is the contact it landed on."""
+    VOCAB_METRICS["resolutions"] += 1
+    if not found:
+        VOCAB_METRICS["missing"] += 1
+        return
+    VOCAB_METRICS["fuzzy" if needs_confirmation else "exact"] += 1
+    if key:
+        note_contact(key)
+
+
+def track_task_turn(state: dict, task_before: str | None):
+    """Call once per turn: counts turns of each slot-filling task until it ends."""
+    task_now = (state.get("last_action") or {}).get("type")
+    if not (task_before or task_now):
+        return
+    state["task_turns"] = state.get("task_turns", 0) + 1
+    if task_before and task_now != task_before:            # finished, cancelled or replaced
+        turns = state.pop("task_turns")
+        if task_now:
+            state["task_turns"] = 1
+        if task_before == "send_email":
+            VOCAB_METRICS["email_tasks"] += 1
+            VOCAB_METRICS["email_task_turns"] += turns - (1 if task_now else 0)
+            print(f"[Vocab] {vocabulary_report()}")
+
+
+def vocabulary_report() -> str:
+    m = VOCAB_METRICS
+    exact = m["exact"] / max(m["resolutions"], 1)
+    turns = m["email_task_turns"] / max(m["email_tasks"], 1)
+    return (f"contact exact-match {exact:.0%} of {m['resolutions']} "
+            f"(fuzzy {m['fuzzy']}, missing {m['missing']}), "
+            f"{turns:.2f} turns per e-mail task over {m['email_tasks']}")
+
+
+# ── building it ───────────────────────────────────────────────────────
+def build_vocabulary(state: dict | None, contacts: Mapping[str, str] | None = None,
+                     limit: int = ASR_VOCAB_MAX) -> list[str]:
+    if limit <= 0:
+        return []
+    terms: OrderedDict[str, None] = OrderedDict()
+
+    def add(name: str) -> bool:
+        terms.setdefault(display_name(name), None)
+        return len(terms) >= limit
+
+    for name in reversed((state or {}).get("entities", [])):
+        if add(name):
+            return list(terms)
+    with _recent_lock:
+        recent = list(reversed(_recent))
+    for key in recent:
+        if add(key):
+            return list(terms)
+    if contacts is not None and len(contacts) <= limit:
+        for key in contacts:
+            if add(key):
+                break
+    return list(terms)
+
+
+def deepgram_keywords(vocabulary: list[str]) -> list[str]:
+    words = dict.fromkeys(w for term in vocabulary for w in re.findall(r"[A-Za-z][\w'-]+", term))
+    return [f"{w}:{KEYWORD_BOOST}" for w in words if len(w) > 2]
+
+
+def whisper_prompt(vocabulary: list[str] | None) -> str | None:
+    if not vocabulary:
+        return None
+    prompt = "Contacts: " + ", ".join(vocabulary)
+    if len(prompt) > PROMPT_MAX_CHARS:
+        prompt = prompt[:PROMPT_MAX_CHARS].rsplit(",", 1)[0]
+    return prompt + "."
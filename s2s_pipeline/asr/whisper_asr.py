@@ -1,21 +1,87 @@
-import os
-import torch
-import whisper
+"""
+Local Whisper ASR
+────────────────────────────────────────────────────────────
+• WHISPER_SERVER unset      – model loaded in this process on first use
+• WHISPER_SERVER=host:port  – send audio to the shared batching server
+                              (asr/whisper_server.py); one model per host
+• WHISPER_SERVER=auto       – same, starting the server on 127.0.0.1:8765
+                              if none is running
+  (a lost server connection is dropped and re-opened on the next request)
+• WHISPER_BACKEND=faster-whisper – in-process int8 CTranslate2 model
+                              instead (asr/faster_whisper_asr.py); the
+                              faster choice on CPU-only nodes
+"""
 
-# Optional: make sure ffmpeg is on PATH
-os.environ["PATH"] += os.pathsep + "C:/ffmpeg/bin"
+import os
+import threading
 
 # Suppress warning if needed
 import warnings
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU")
 
-# Detect device
-device = "cuda" if torch.cuda.is_available() else "cpu"
-model = whisper.load_model("base", device=device)
+WHISPER_SERVER = os.getenv("WHISPER_SERVER", "")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "openai").lower()
+
+_model = None
+_client = None
+_lock = threading.Lock()
+
+
+def _local_model():
+    global _model
+    with _lock:
+        if _model is None:
+            import torch
+            import whisper
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            _model = whisper.load_model(WHISPER_MODEL, device=device)
+    return _model
+
 
-def transcribe_audio(audio_path):
+def _server_client():
+    global _client
+    with _lock:
+        if _client is None or _client.closed:
+            from s2s_pipeline.asr.whisper_server import DEFAULT_ADDRESS, connect
+            auto = WHISPER_SERVER.lower() == "auto"
+            _client = connect(DEFAULT_ADDRESS if auto else WHISPER_SERVER, autostart=auto)
+    return _client
+
+
+def _server_transcribe(audio_path, timeout, prompt):
+    """Via the shared server; reconnects once if it went away (restart / crash)."""
+    global _client
+    for attempt in (1, 2):
+        client = _server_client()
+        try:
+            return client.transcribe(audio_path, timeout=timeout, prompt=prompt)
+        except (ConnectionError, EOFError) as e:
+            with _lock:
+                if _client is client:
+                    _client = None
+            if attempt == 2:
+                raise
+            print(f"[Whisper] Lost the Whisper server ({e}); reconnecting")
+
+
+def transcribe_audio(audio_path, timeout=None, vocabulary=None):
+    """`vocabulary` (names to expect) becomes Whisper's initial prompt."""
+    if WHISPER_BACKEND in ("faster-whisper", "ctranslate2") and not WHISPER_SERVER:
+        from s2s_pipeline.asr.faster_whisper_asr import transcribe_audio as ct2_transcribe
+        return ct2_transcribe(audio_path, timeout=timeout, vocabulary=vocabulary)
+    from s2s_pipeline.asr.session_vocabulary import whisper_prompt
+    prompt = whisper_prompt(vocabulary)
     print(f"Transcribing audio: {audio_path}")
-    result = model.transcribe(audio_path)
+    if WHISPER_SERVER:
+        # the server enforces nothing itself; `timeout` bounds our wait for its reply
+        return _server_transcribe(audio_path, timeout, prompt)
+
+    # `timeout` is accepted for parity with the Deepgram backend; in-process
+    # inference can't be interrupted, so it is not enforced here
+    from s2s_pipeline.audio.audio_normalize import load_float32
+    # decoded in-process – Whisper would otherwise shell out to ffmpeg
+    result = _local_model().transcribe(load_float32(audio_path), initial_prompt=prompt)
 
     # Extract no_speech_prob from the first segment
     first_segment = result["segments"][0] if result["segments"] else {}
@@ -29,4 +95,4 @@ def transcribe_audio(audio_path):
         "segments": result["segments"],
         "no_speech_prob": no_speech_prob,
         "avg_logprob": avg_logprob
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,306 @@
+"""
+asr/whisper_server.py
+─────────────────────────────────────────────────────────────────────
+One Whisper model per host, shared by every pipeline worker.
+
+• the server process loads the model once and listens on a local
+  multiprocessing.connection address (WHISPER_SERVER, default
+  127.0.0.1:8765); WHISPER_SERVER_KEY is required – the server refuses to
+  start without it, and `connect(autostart=True)` generates a random one
+  for itself and the server it launches when none is set
+• only bytes cross the socket (never pickles): a JSON header, then the
+  clip as 16 kHz mono int16 PCM decoded by the client – the server reads
+  no files and unpickles nothing, and replies are JSON
+• each client connection gets a reader thread that converts its audio and
+  computes the log-mel on arrival, so batching only waits on inference
+• the batcher collects up to MAX_BATCH requests or MAX_WAIT_S (whichever
+  first), stacks the padded 30-s mels and runs a single `whisper.decode`
+• utterances over 30 s, or batch results that look degenerate (high
+  compression ratio / low log-prob – where `transcribe` would fall back to
+  other temperatures), are re-run through `model.transcribe` one by one
+• requests may carry a prompt (session vocabulary: contact names); the
+  batch is decoded in one group per distinct prompt
+• replies keep the local wrapper's shape:
+  {"transcript", "segments", "no_speech_prob", "avg_logprob"}
+
+    python -m s2s_pipeline.asr.whisper_server [--model base] [--max-batch 8] [--max-wait-ms 40]
+"""
+
+from __future__ import annotations
+import dataclasses, itertools, json, os, queue, secrets, subprocess, sys, threading, time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+_env_address    = os.getenv("WHISPER_SERVER", "")
+DEFAULT_ADDRESS = _env_address if _env_address not in ("", "auto") else "127.0.0.1:8765"
+KEY_ENV         = "WHISPER_SERVER_KEY"
+MAX_BATCH       = 8
+MAX_WAIT_S      = 0.04
+SAMPLE_RATE     = 16000
+CHUNK_S         = 30
+MAX_HEADER_BYTES = 64 * 1024
+MAX_AUDIO_BYTES  = SAMPLE_RATE * 2 * 600          # 10 min of int16 PCM per request
+# same thresholds `whisper.transcribe` uses to trigger a temperature fallback
+COMPRESSION_RATIO_MAX = 2.4
+LOGPROB_MIN           = -1.0
+NO_SPEECH_MIN         = 0.6
+
+
+def authkey() -> bytes | None:
+    key = os.getenv(KEY_ENV)
+    return key.encode() if key else None
+
+
+def _jsonable(obj):
+    return obj.item() if hasattr(obj, "item") else str(obj)      # numpy scalars in segments
+
+
+def parse_address(addr: str) -> tuple[str, int] | str:
+    host, sep, port = addr.rpartition(":")
+    return (host, int(port)) if sep and port.isdigit() else addr     # else a unix socket path
+
+
+def _result(text: str, avg_logprob, no_speech_prob, duration: float) -> dict:
+    segments = [{"id": 0, "start": 0.0, "end": round(duration, 2), "text": text,
+                 "avg_logprob": avg_logprob, "no_speech_prob": no_speech_prob}] if text else []
+    return {"transcript": text, "segments": segments,
+            "no_speech_prob": no_speech_prob, "avg_logprob": avg_logprob}
+
+
+def _from_transcribe(result: dict) -> dict:
+    first = result["segments"][0] if result["segments"] else {}
+    return {"transcript": result["text"], "segments": result["segments"],
+            "no_speech_prob": first.get("no_speech_prob"), "avg_logprob": first.get("avg_logprob")}
+
+
+# ── server ────────────────────────────────────────────────────────────
+class WhisperServer:
+    def __init__(self, model_name: str = "base", device: str | None = None,
+                 max_batch: int = MAX_BATCH, max_wait_s: float = MAX_WAIT_S):
+        self.model_name = model_name
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.model = None
+        self.pending: queue.Queue = queue.Queue()
+        self.stats = {"requests": 0, "batches": 0, "fallbacks": 0}
+
+    def load(self):
+        import torch, whisper
+        self.whisper = whisper
+        self.torch = torch
+        self.device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = whisper.load_model(self.model_name, device=self.device)
+        self.options = whisper.DecodingOptions(fp16=self.device == "cuda", without_timestamps=True)
+
+    def _prepare(self, pcm: bytes):
+        audio = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        duration = len(audio) / SAMPLE_RATE
+        mel = self.whisper.log_mel_spectrogram(self.whisper.pad_or_trim(audio),
+                                               n_mels=self.model.dims.n_mels)
+        return audio, mel, duration
+
+    def _handle_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def reply(req_id, payload):
+            data = json.dumps({"id": req_id, "payload": payload}, default=_jsonable).encode()
+            with send_lock:
+                conn.send_bytes(data)
+
+        try:
+            while True:
+                header = json.loads(conn.recv_bytes(MAX_HEADER_BYTES))
+                pcm = conn.recv_bytes(MAX_AUDIO_BYTES)
+                req_id, prompt = int(header["id"]), header.get("prompt")
+                if not isinstance(prompt, str):
+                    prompt = None
+                try:
+                    audio, mel, duration = self._prepare(pcm)
+                except Exception as e:
+                    reply(req_id, {"error": f"could not read audio: {e}"})
+                    continue
+                self.pending.put((req_id, audio, mel, duration, prompt, reply))
+        except (EOFError, OSError, ValueError, KeyError, TypeError) as e:
+            if not isinstance(e, EOFError):
+                print(f"[WhisperServer] dropping client: {e!r}")
+        finally:
+            conn.close()
+
+    def _collect(self) -> list:
+        batch = [self.pending.get()]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batch(self, batch):
+        long = [b for b in batch if b[3] > CHUNK_S]
+        groups: dict[str | None, list] = {}
+        for b in batch:
+            if b[3] <= CHUNK_S:
+                groups.setdefault(b[4], []).append(b)
+        for prompt, short in groups.items():
+            options = dataclasses.replace(self.options, prompt=prompt) if prompt else self.options
+            mels = self.torch.stack([b[2] for b in short]).to(self.device)
+            with self.torch.no_grad():
+                results = self.whisper.decode(self.model, mels, options)
+            for (req_id, audio, _, duration, _, reply), res in zip(short, results):
+                degenerate = (res.compression_ratio > COMPRESSION_RATIO_MAX or res.avg_logprob < LOGPROB_MIN) \
+                    and res.no_speech_prob < NO_SPEECH_MIN
+                if degenerate:
+                    long.append((req_id, audio, None, duration, prompt, reply))
+                else:
+                    reply(req_id, _result(res.text.strip(), res.avg_logprob, res.no_speech_prob, duration))
+        for req_id, audio, _, _, prompt, reply in long:      # full transcribe() path
+            self.stats["fallbacks"] += 1
+            reply(req_id, _from_transcribe(self.model.transcribe(audio, fp16=self.device == "cuda",
+                                                                 initial_prompt=prompt)))
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                self._run_batch(batch)
+            except Exception as e:                          # never leave callers hanging
+                for req_id, *_, reply in batch:
+                    try:
+                        reply(req_id, {"error": str(e)})
+                    except OSError:
+                        pass
+            print(f"[WhisperServer] batch of {len(batch)} in {time.perf_counter() - start:.2f}s "
+                  f"(avg batch {self.stats['requests'] / max(self.stats['batches'], 1):.1f})")
+
+    def serve_forever(self, address=DEFAULT_ADDRESS, key: bytes | None = None):
+        key = key or authkey()
+        if not key:
+            raise RuntimeError(f"{KEY_ENV} is not set; refusing to serve without authentication")
+        # bind before loading: a second server on the host fails fast, and
+        # clients that connect meanwhile simply wait for the first accept()
+        with Listener(parse_address(address), authkey=key) as listener:
+            self.load()
+            threading.Thread(target=self._batch_loop, name="whisper-batch", daemon=True).start()
+            print(f"[WhisperServer] {self.model_name} on {self.device} ready at {address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError) as e:   # failed handshake: keep serving
+                    print(f"[WhisperServer] connection rejected: {e}")
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+
+# ── client ────────────────────────────────────────────────────────────
+class WhisperClient:
+    """Thread-safe: many sessions in one worker share the connection."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, key: bytes | None = None):
+        key = key or authkey()
+        if not key:
+            raise RuntimeError(f"{KEY_ENV} is not set (the Whisper server requires it)")
+        self.conn = Client(parse_address(address), authkey=key)
+        self.closed = False
+        self._ids = itertools.count()
+        self._waiting: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._read_loop, name="whisper-client", daemon=True).start()
+
+    def _read_loop(self):
+        try:
+            while True:
+                msg = json.loads(self.conn.recv_bytes())
+                req_id, payload = msg["id"], msg["payload"]
+                with self._lock:
+                    future = self._waiting.pop(req_id, None)
+                if future is not None:
+                    if "error" in payload:
+                        future.set_exception(RuntimeError(payload["error"]))
+                    else:
+                        future.set_result(payload)
+        except (EOFError, OSError, ValueError, KeyError) as e:
+            with self._lock:
+                self.closed = True
+                waiting, self._waiting = self._waiting, {}
+            for future in waiting.values():
+                future.set_exception(ConnectionError(f"Whisper server went away: {e!r}"))
+
+    def transcribe(self, audio_path: str, timeout: float | None = None, prompt: str | None = None) -> dict:
+        """Decoded here (any format audio_normalize reads); the server only sees 16 kHz PCM."""
+        from s2s_pipeline.audio.audio_normalize import load_pcm16
+        pcm = load_pcm16(str(audio_path)).tobytes()
+        future: Future = Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Whisper server connection is closed")
+            req_id = next(self._ids)
+            self._waiting[req_id] = future
+            try:
+                self.conn.send_bytes(json.dumps({"id": req_id, "prompt": prompt}).encode())
+                self.conn.send_bytes(pcm)
+            except OSError as e:
+                self._waiting.pop(req_id, None)
+                self.closed = True
+                raise ConnectionError(f"Whisper server went away: {e!r}") from e
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._waiting.pop(req_id, None)
+            raise TimeoutError(f"Whisper server exceeded {timeout:.2f}s") from None
+
+
+def connect(address=DEFAULT_ADDRESS, autostart: bool = False, wait_s: float = 120.0) -> WhisperClient:
+    """
+    Client for the host's server.  With `autostart`, launch one in the
+    background if nobody is listening (racing workers: one binds, the rest
+    connect to it).  Without WHISPER_SERVER_KEY, autostart generates a key
+    for this process and the server it starts (workers that should share a
+    server must set the same key).
+    """
+    if autostart and not authkey():
+        os.environ[KEY_ENV] = secrets.token_urlsafe(32)      # inherited by the server we start
+    try:
+        return WhisperClient(address)
+    except (ConnectionRefusedError, FileNotFoundError):
+        if not autostart:
+            raise
+    subprocess.Popen([sys.executable, "-m", "s2s_pipeline.asr.whisper_server", "--address", address],
+                     start_new_session=True, env=os.environ.copy())
+    deadline = time.monotonic() + wait_s                     # model load can take a while
+    while True:
+        try:
+            return WhisperClient(address)
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Shared Whisper ASR server")
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "base"))
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--address", default=DEFAULT_ADDRESS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_S * 1e3)
+    args = parser.parse_args()
+    if not authkey():
+        sys.exit(f"[WhisperServer] not starting: set {KEY_ENV} (shared secret for clients)")
+    server = WhisperServer(args.model, args.device, args.max_batch, args.max_wait_ms / 1e3)
+    try:
+        server.serve_forever(args.address)
+    except OSError as e:                                     # another worker already started one
+        print(f"[WhisperServer] not starting: {e}")
@@ -0,0 +1,187 @@
+"""
+audio_normalize.py
+─────────────────────────────────────────────────────────
+Every input file → 16 kHz mono int16 without spawning ffmpeg.
+
+• decoders, first that can read the file wins:
+    soundfile (libsndfile: wav / flac / ogg / mp3 with libsndfile ≥ 1.1)
+    wave      (stdlib, PCM WAV – what audio_input records)
+    PyAV      (m4a / aac / webm browser uploads, mp3 on older libsndfile)
+    ffmpeg    (last resort via pydub's subprocess, as before – anything
+               the others can't read still decodes when ffmpeg is on PATH)
+• channels are averaged, then a polyphase FIR (Kaiser-windowed sinc,
+  phases precomputed per rate pair) resamples: outputs that share a filter
+  phase are one strided gather of input windows and one BLAS mat-vec, so
+  44.1 → 16 kHz is 160 mat-vecs and no zero-stuffed intermediate signal
+• 16 kHz mono PCM input passes straight through
+
+    load_float32(src)  → np.float32 in [-1, 1)      (Whisper models)
+    load_pcm16(src)    → np.int16                    (VAD / webrtc)
+    normalize(src)     → io.BytesIO holding a WAV    (Deepgram upload)
+    decode_segment(src)→ pydub AudioSegment at the file's own rate (playback)
+
+`src` is a path, bytes or a binary file object.
+Requires   numpy, soundfile, av;  optional pydub + ffmpeg (fallback)
+"""
+
+from __future__ import annotations
+import io, math, wave
+from functools import lru_cache
+
+import numpy as np
+
+TARGET_SR       = 16000
+ZERO_CROSSINGS  = 12            # filter half-length, in input-rate zero crossings
+KAISER_BETA     = 8.0
+ROLLOFF         = 0.95          # cut-off as a fraction of the lower Nyquist
+
+
+class AudioDecodeError(RuntimeError):
+    """No available decoder could read the input."""
+
+
+# ── decoding ──────────────────────────────────────────────────────────
+def _open(src):
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return io.BytesIO(src)
+    if hasattr(src, "read"):
+        src.seek(0)
+    return src
+
+
+def _decode_soundfile(src):
+    import soundfile as sf
+    data, sr = sf.read(_open(src), dtype="float32", always_2d=True)
+    return data, sr
+
+
+def _decode_wave(src):
+    with wave.open(_open(src), "rb") as w:
+        width, channels, sr = w.getsampwidth(), w.getnchannels(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 2:
+        data = np.frombuffer(raw, "<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        data = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648.0
+    elif width == 1:
+        data = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 3:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        data = ((b[:, 0] | b[:, 1] << 8 | b[:, 2] << 16) << 8 >> 8).astype(np.float32) / 8388608.0
+    else:
+        raise AudioDecodeError(f"unsupported WAV sample width {width}")
+    return data.reshape(-1, channels), sr
+
+
+def _decode_av(src):
+    import av
+    with av.open(_open(src)) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="fltp")        # planar float, native rate / layout
+        planes = [f.to_ndarray() for frame in container.decode(stream)
+                  for f in resampler.resample(frame)]
+        planes += [f.to_ndarray() for f in resampler.resample(None)]
+        sr = stream.rate
+    if not planes:
+        return np.zeros((0, 1), np.float32), sr
+    return np.concatenate(planes, axis=1).T.astype(np.float32, copy=False), sr
+
+
+def _decode_ffmpeg(src):
+    from pydub import AudioSegment
+    seg = AudioSegment.from_file(_open(src)).set_sample_width(2)
+    data = np.frombuffer(seg.raw_data, "<i2").astype(np.float32) / 32768.0
+    return data.reshape(-1, seg.channels), seg.frame_rate
+
+
+DECODERS = (_decode_soundfile, _decode_wave, _decode_av, _decode_ffmpeg)
+
+
+def decode(src) -> tuple[np.ndarray, int]:
+    """(float32 samples shaped (frames, channels), sample rate)."""
+    errors = []
+    for decoder in DECODERS:
+        try:
+            return decoder(src)
+        except ImportError:
+            continue
+        except Exception as e:                             # not this decoder's format
+            errors.append(f"{decoder.__name__[8:]}: {e}")
+    raise AudioDecodeError(f"could not decode {src if isinstance(src, str) else 'buffer'}"
+                           f" ({'; '.join(errors) or 'no decoder installed'})")
+
+
+# ── resampling ────────────────────────────────────────────────────────
+@lru_cache(maxsize=16)
+def _polyphase(up: int, down: int) -> np.ndarray:
+    """Filter phases, (up, taps) – row p holds h[p], h[p+up], … reversed for a dot with x[i-taps+1 … i]."""
+    max_rate = max(up, down)
+    half = ZERO_CROSSINGS * max_rate
+    n = np.arange(-half, half + 1)
+    cutoff = ROLLOFF / max_rate
+    h = up * cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), KAISER_BETA)
+    taps = math.ceil(len(h) / up)
+    h = np.pad(h, (0, taps * up - len(h)))
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+
+
+def resample(x: np.ndarray, sr_in: int, sr_out: int = TARGET_SR) -> np.ndarray:
+    """1-D float32 polyphase resample from sr_in to sr_out."""
+    if sr_in == sr_out or len(x) == 0:
+        return x.astype(np.float32, copy=False)
+    g = math.gcd(sr_in, sr_out)
+    up, down = sr_out // g, sr_in // g
+    phases = _polyphase(up, down)
+    taps = phases.shape[1]
+    half = ZERO_CROSSINGS * max(up, down)
+
+    n_out = math.ceil(len(x) * up / down)
+    # xp[i + taps - 1] = x[i]; enough right padding for the last centred window
+    xp = np.pad(x.astype(np.float32, copy=False), (taps - 1, half // up + 2))
+    windows = np.lib.stride_tricks.sliding_window_view(xp, taps)
+
+    out = np.empty(n_out, np.float32)
+    # output m uses phase (m·down + half) mod up, which repeats every `up` outputs
+    for r in range(min(up, n_out)):
+        m = np.arange(r, n_out, up, dtype=np.int64)
+        out[r::up] = windows[(m * down + half) // up] @ phases[(r * down + half) % up]
+    return out
+
+
+# ── public entry points ───────────────────────────────────────────────
+def load_float32(src, sr: int = TARGET_SR) -> np.ndarray:
+    data, sr_in = decode(src)
+    mono = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1, dtype=np.float32)
+    return resample(mono, sr_in, sr)
+
+
+def load_pcm16(src, sr: int = TARGET_SR) -> np.ndarray:
+    return to_pcm16(load_float32(src, sr))
+
+
+def to_pcm16(x: np.ndarray) -> np.ndarray:
+    return (np.clip(x, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+
+
+def wav_bytes(pcm16: np.ndarray, sr: int = TARGET_SR) -> io.BytesIO:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm16.tobytes())
+    buf.seek(0)
+    return buf
+
+
+def normalize(src, sr: int = TARGET_SR) -> io.BytesIO:
+    """16 kHz mono int16 WAV in memory."""
+    return wav_bytes(load_pcm16(src, sr), sr)
+
+
+def decode_segment(src):
+    """pydub AudioSegment decoded in-process (no resample – playback keeps full quality)."""
+    from pydub import AudioSegment
+    data, sr = decode(src)
+    return AudioSegment(data=to_pcm16(data).tobytes(), sample_width=2,
+                        frame_rate=sr, channels=data.shape[1])
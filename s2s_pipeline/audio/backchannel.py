@@ -0,0 +1,101 @@
+"""
+backchannel.py
+─────────────────────────────────────────────────────────
+Short spoken fillers ("Sure, let me check…") that cover LLM latency.
+
+• `Backchannel(on_audio, intent, user_text)` wraps the LLM call: if it is
+  still running after BACKCHANNEL_AFTER_S, one pre-synthesised phrase is
+  handed to `on_audio`; leaving the block cancels it, so fast replies get
+  no filler
+• phrases are picked by intent (task in progress) or context (question vs.
+  chit-chat) and rotated so the same one isn't heard twice in a row
+• only clips already in the phrase cache are played – a filler that needs a
+  TTS round trip would land after the answer; misses are warmed for next time
+• the answer is queued behind the filler (PlaybackQueue), so it starts as
+  soon as the filler ends and barge-in on the filler drops both
+"""
+
+from __future__ import annotations
+import itertools, os, threading
+from typing import Callable
+
+from s2s_pipeline.tts.phrase_cache import phrase_path, warm
+
+BACKCHANNEL_AFTER_S = float(os.getenv("BACKCHANNEL_AFTER_S", 0.7))
+
+BACKCHANNEL_PHRASES = {
+    "send_email":   ("Sure, let me set that up.", "Okay, one second."),
+    "create_event": ("Sure, let me check your calendar.", "Okay, one second."),
+    "send_sms":     ("Sure, one second.", "Okay, let me set that up."),
+    "question":     ("Let me check…", "Good question, one second."),
+    "general_chat": ("Hmm, let me think.", "Sure, one moment."),
+}
+QUESTION_WORDS = {"what", "when", "where", "who", "why", "how", "which", "is", "are",
+                  "can", "could", "do", "does", "will", "should", "would"}
+
+BACKCHANNEL_STATS = {"llm_calls": 0, "fired": 0, "uncached": 0}
+
+_rotations = {k: itertools.cycle(v) for k, v in BACKCHANNEL_PHRASES.items()}
+_rotation_lock = threading.Lock()
+
+
+def phrase_category(intent: str | None, user_text: str = "") -> str:
+    if intent in BACKCHANNEL_PHRASES and intent != "general_chat":
+        return intent
+    words = user_text.lower().split()
+    if user_text.rstrip().endswith("?") or (words and words[0] in QUESTION_WORDS):
+        return "question"
+    return "general_chat"
+
+
+def choose_phrase(intent: str | None, user_text: str = "") -> str:
+    with _rotation_lock:
+        return next(_rotations[phrase_category(intent, user_text)])
+
+
+def warm_backchannel() -> threading.Thread:
+    """Pre-synthesise every filler (call once at start-up)."""
+    return warm({p for phrases in BACKCHANNEL_PHRASES.values() for p in phrases})
+
+
+class Backchannel:
+    def __init__(self, on_audio: Callable[[str], None] | None, intent: str | None = None,
+                 user_text: str = "", delay: float = BACKCHANNEL_AFTER_S):
+        self.on_audio = on_audio
+        self.intent = intent
+        self.user_text = user_text
+        self.delay = delay
+        self.fired = False
+        self._done = False
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def __enter__(self):
+        BACKCHANNEL_STATS["llm_calls"] += 1
+        if self.on_audio is not None:
+            self._timer = threading.Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:                # a filler mid-hand-off still goes out first
+            self._done = True
+        if self._timer is not None:
+            self._timer.cancel()
+        return False
+
+    def _fire(self):
+        phrase = choose_phrase(self.intent, self.user_text)
+        path = phrase_path(phrase)
+        if not os.path.exists(path):
+            BACKCHANNEL_STATS["uncached"] += 1
+            warm([phrase])
+            return
+        with self._lock:
+            if self._done:
+                return
+            self.fired = True
+            BACKCHANNEL_STATS["fired"] += 1
+            print(f"[Backchannel] {phrase!r} after {self.delay:.1f}s")
+            self.on_audio(path)
@@ -7,12 +7,15 @@ import numpy as np
 import time
 import collections
 
+from s2s_pipeline.audio.audio_normalize import decode_segment
+
 def monitor_for_voice_interrupt(rate=16000, duration_ms=30, aggressiveness=2,
                                  frame_window=10, trigger_count=3,
-                                 energy_threshold=500, device_index=None):
+                                 energy_threshold=500, device_index=None, stop_event=None):
     """
     Real-time voice interrupt monitor using WebRTC VAD + basic noise filter.
-    Returns True if voice is detected consistently over trigger_count frames.
+    Returns True if voice is detected consistently over trigger_count frames,
+    False once `stop_event` is set (playback finished).
     """
     if duration_ms not in [10, 20, 30, 60]:
         raise ValueError("duration_ms must be 10, 20, or 30")
@@ -36,7 +39,7 @@ def monitor_for_voice_interrupt(rate=16000, duration_ms=30, aggressiveness=2,
         print(f"[Interrupt Monitor] Listening (trigger {trigger_count}/{frame_window})...")
         frame_history = collections.deque(maxlen=frame_window)
 
-        while True:
+        while stop_event is None or not stop_event.is_set():
             frame = stream.read(frame_size, exception_on_overflow=False)
             if len(frame) != byte_size:
                 continue
@@ -69,15 +72,18 @@ def monitor_for_voice_interrupt(rate=16000, duration_ms=30, aggressiveness=2,
     return False
 
 def play_audio_interruptible_by_voice(audio_file, device_index=None):
+    """`audio_file` is a path or an already decoded AudioSegment."""
     from threading import Event
     interrupt_event = Event()
+    done_event = Event()
 
-    audio = AudioSegment.from_file(audio_file)
+    audio = audio_file if isinstance(audio_file, AudioSegment) else decode_segment(audio_file)
     playback = None
 
     def monitor():
         if monitor_for_voice_interrupt(aggressiveness=3, frame_window=10,
-                                        trigger_count=3, device_index=device_index):
+                                        trigger_count=3, device_index=device_index,
+                                        stop_event=done_event):
             interrupt_event.set()
             if playback and playback.is_playing():
                 playback.stop()
@@ -91,5 +97,6 @@ def play_audio_interruptible_by_voice(audio_file, device_index=None):
 
     playback = _play_with_simpleaudio(audio)
     playback.wait_done()
+    done_event.set()                 # release the mic for the next clip's monitor
 
     return interrupt_event.is_set()
@@ -0,0 +1,71 @@
+"""
+playback_queue.py
+─────────────────────────────────────────────────────────
+Ordered playback of a turn's clips (backchannel / acknowledgement, then the
+answer) through `play_audio_interruptible_by_voice`.
+
+• clips are decoded on their own thread while the previous one plays, so
+  the answer follows a filler without a decode gap
+• barge-in on any clip sets `interrupted` and drops the rest of the turn,
+  including an answer that arrives later
+• `new_turn()` starts a fresh turn; `join()` waits until it has been heard
+"""
+
+from __future__ import annotations
+import queue, threading
+
+from s2s_pipeline.audio.audio_normalize import decode_segment
+from s2s_pipeline.audio.output_audio import play_audio_interruptible_by_voice
+
+
+class PlaybackQueue:
+    def __init__(self, device_index=None, player=play_audio_interruptible_by_voice,
+                 decoder=decode_segment):
+        self.device_index = device_index
+        self.player = player
+        self.decoder = decoder
+        self.interrupted = threading.Event()
+        self._turn = 0
+        self._decode_q: queue.Queue = queue.Queue()
+        self._play_q: queue.Queue = queue.Queue()
+        threading.Thread(target=self._decode_loop, name="playback-decode", daemon=True).start()
+        threading.Thread(target=self._play_loop, name="playback", daemon=True).start()
+
+    def new_turn(self):
+        self._turn += 1
+        self.interrupted.clear()
+
+    def put(self, path: str | None):
+        """Queue a clip for the current turn (usable as run_s2s_once's on_audio)."""
+        if path:
+            self._decode_q.put((self._turn, path))
+
+    def join(self):
+        self._decode_q.join()
+        self._play_q.join()
+
+    def _stale(self, turn: int) -> bool:
+        return turn != self._turn or self.interrupted.is_set()
+
+    def _decode_loop(self):
+        while True:
+            turn, path = self._decode_q.get()
+            try:
+                if not self._stale(turn):
+                    self._play_q.put((turn, self.decoder(path)))
+            except Exception as e:
+                print(f"[Playback] Could not decode {path}: {e}")
+            finally:
+                self._decode_q.task_done()
+
+    def _play_loop(self):
+        while True:
+            turn, audio = self._play_q.get()
+            try:
+                if not self._stale(turn) and self.player(audio, device_index=self.device_index):
+                    self.interrupted.set()
+                    print("[System] User interrupted - listening again…")
+            except Exception as e:
+                print(f"[Playback] Error: {e}")
+            finally:
+                self._play_q.task_done()
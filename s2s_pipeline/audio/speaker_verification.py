@@ -0,0 +1,256 @@
+"""
+speaker_verification.py
+─────────────────────────────────────────────────────────
+Is this utterance from someone we know?  Gate for vad_speaker_identification,
+so TV audio and bystanders don't start an ASR → LLM → TTS turn.
+
+• embedding per utterance, CPU only, speech frames only (webrtcvad):
+    resemblyzer  – 256-d d-vector (GE2E LSTM, ~10 ms per second of audio);
+                   used when installed
+    mfcc         – numpy fallback: mean / std of 19 MFCCs + std of their
+                   deltas (57-d); coarse – poor at telling similar voices
+                   apart, but separates a close-talking user from TV audio
+• enrolled users live in one matrix (SPEAKER_DB, default speakers.npz):
+  L2-normalised rows, so scoring an utterance against everyone is a single
+  mat-vec of cosine similarities
+• SPEAKER_GATE  off | flag | drop   (default flag: log only)
+  SPEAKER_THRESHOLD  cosine needed to accept (default per embedder –
+  calibrate with scripts/bench_speaker_verification.py)
+• with nobody enrolled the gate is open – no VAD, no length check
+• clips with less than MIN_SPEECH_S of voiced audio can't be verified;
+  only SPEAKER_GATE=drop skips them, so a short "yes" still gets through
+
+    python -m s2s_pipeline.audio.speaker_verification enroll alice a1.wav a2.wav a3.wav
+    python -m s2s_pipeline.audio.speaker_verification verify clip.wav
+    python -m s2s_pipeline.audio.speaker_verification list | remove alice
+"""
+
+from __future__ import annotations
+import os, tempfile, threading
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+SAMPLE_RATE      = 16000
+SPEAKER_DB       = os.getenv("SPEAKER_DB", "speakers.npz")
+SPEAKER_GATE     = os.getenv("SPEAKER_GATE", "flag").lower()
+SPEAKER_EMBEDDER = os.getenv("SPEAKER_EMBEDDER", "auto").lower()
+DEFAULT_THRESHOLDS = {"resemblyzer": 0.75, "mfcc": 0.92}
+MIN_SPEECH_S     = 0.4
+VAD_FRAME_MS     = 30
+
+SPEAKER_STATS = {"checked": 0, "accepted": 0, "flagged": 0, "dropped": 0, "no_speech": 0}
+
+
+# ── speech frames ─────────────────────────────────────────────────────
+def speech_only(pcm16: np.ndarray, aggressiveness: int = 2) -> np.ndarray:
+    """Concatenated voiced 30 ms frames (int16)."""
+    import webrtcvad
+    vad = webrtcvad.Vad(aggressiveness)
+    frame = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    frames = pcm16[:len(pcm16) // frame * frame].reshape(-1, frame)
+    voiced = [vad.is_speech(f.tobytes(), SAMPLE_RATE) for f in frames]
+    return frames[np.asarray(voiced, dtype=bool)].reshape(-1)
+
+
+# ── embedders ─────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def _mfcc_basis(n_fft: int = 512, n_mels: int = 40, n_ceps: int = 20):
+    hz_to_mel = lambda f: 2595 * np.log10(1 + f / 700)
+    mel_to_hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+    pts = mel_to_hz(np.linspace(hz_to_mel(20), hz_to_mel(7600), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1 / SAMPLE_RATE)
+    lo, mid, hi = pts[:-2, None], pts[1:-1, None], pts[2:, None]
+    fbank = np.maximum(0, np.minimum((bins - lo) / (mid - lo), (hi - bins) / (hi - mid)))
+    k, n = np.arange(n_ceps)[:, None], np.arange(n_mels)[None, :]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2 / n_mels)
+    return fbank.T.astype(np.float32), dct[1:].T.astype(np.float32)      # drop c0 (loudness)
+
+
+def mfcc_embedding(pcm16: np.ndarray) -> np.ndarray:
+    x = pcm16.astype(np.float32) / 32768.0
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])                           # pre-emphasis
+    frames = np.lib.stride_tricks.sliding_window_view(x, 400)[::160] * np.hamming(400).astype(np.float32)
+    fbank, dct = _mfcc_basis()
+    power = np.abs(np.fft.rfft(frames, 512)) ** 2
+    ceps = np.log(power @ fbank + 1e-8) @ dct
+    delta = np.gradient(ceps, axis=0)
+    return np.concatenate([ceps.mean(0), ceps.std(0), delta.std(0)]).astype(np.float32)
+
+
+class _Resemblyzer:
+    def __init__(self):
+        from resemblyzer import VoiceEncoder
+        self.encoder = VoiceEncoder("cpu", verbose=False)
+
+    def __call__(self, pcm16: np.ndarray) -> np.ndarray:
+        return self.encoder.embed_utterance(pcm16.astype(np.float32) / 32768.0)
+
+
+_embedders: dict = {}
+_embedders_lock = threading.Lock()
+
+
+def embedder_name(requested: str = SPEAKER_EMBEDDER) -> str:
+    if requested != "auto":
+        return requested
+    try:
+        import resemblyzer  # noqa: F401
+        return "resemblyzer"
+    except ImportError:
+        return "mfcc"
+
+
+def embed(pcm16: np.ndarray, name: str | None = None) -> np.ndarray:
+    """L2-normalised embedding of voiced int16 16 kHz audio."""
+    name = name or embedder_name()
+    with _embedders_lock:
+        if name not in _embedders:
+            _embedders[name] = _Resemblyzer() if name == "resemblyzer" else mfcc_embedding
+    vec = np.asarray(_embedders[name](pcm16), dtype=np.float32)
+    return vec / (np.linalg.norm(vec) + 1e-9)
+
+
+# ── enrolled speakers ─────────────────────────────────────────────────
+class SpeakerMatch(NamedTuple):
+    name: str | None        # best enrolled speaker (None if nobody enrolled)
+    score: float            # cosine similarity to them
+    accepted: bool
+
+
+class SpeakerStore:
+    def __init__(self, embedder: str, names=(), matrix=None, counts=None):
+        self.embedder = embedder
+        self.names: list[str] = list(names)
+        self.matrix = np.zeros((0, 0), np.float32) if matrix is None else np.asarray(matrix, np.float32)
+        self.counts = np.zeros(len(self.names), np.int32) if counts is None else np.asarray(counts, np.int32)
+
+    @classmethod
+    def load(cls, path: str = SPEAKER_DB) -> "SpeakerStore":
+        if not os.path.exists(path):
+            return cls(embedder_name())
+        with np.load(path, allow_pickle=False) as data:
+            return cls(str(data["embedder"]), data["names"].tolist(), data["matrix"], data["counts"])
+
+    def save(self, path: str = SPEAKER_DB):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, embedder=np.array(self.embedder), names=np.array(self.names, dtype=str),
+                     matrix=self.matrix, counts=self.counts)
+        os.replace(tmp, path)
+
+    def enroll(self, name: str, embeddings: list[np.ndarray]):
+        """Add samples for `name` (running mean of their embeddings)."""
+        new = np.mean(embeddings, axis=0)
+        if name in self.names:
+            i = self.names.index(name)
+            n = self.counts[i]
+            merged = (self.matrix[i] * n + new * len(embeddings)) / (n + len(embeddings))
+            self.matrix[i] = merged / np.linalg.norm(merged)
+            self.counts[i] += len(embeddings)
+            return
+        row = (new / np.linalg.norm(new))[None, :].astype(np.float32)
+        self.matrix = row if self.matrix.size == 0 else np.vstack([self.matrix, row])
+        self.names.append(name)
+        self.counts = np.append(self.counts, len(embeddings)).astype(np.int32)
+
+    def remove(self, name: str) -> bool:
+        if name not in self.names:
+            return False
+        i = self.names.index(name)
+        self.names.pop(i)
+        self.matrix = np.delete(self.matrix, i, axis=0)
+        self.counts = np.delete(self.counts, i)
+        return True
+
+    def match(self, embedding: np.ndarray, threshold: float) -> SpeakerMatch:
+        if not self.names:
+            return SpeakerMatch(None, 0.0, True)
+        scores = self.matrix @ embedding                # cosine vs. every enrolled user at once
+        best = int(np.argmax(scores))
+        return SpeakerMatch(self.names[best], float(scores[best]), bool(scores[best] >= threshold))
+
+
+_store: SpeakerStore | None = None
+_store_mtime = 0.0
+_store_lock = threading.Lock()
+
+
+def get_store(path: str = SPEAKER_DB) -> SpeakerStore:
+    """Process-wide store; reloaded when the file changes (enrolment from the CLI)."""
+    global _store, _store_mtime
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+    with _store_lock:
+        if _store is None or mtime != _store_mtime:
+            _store, _store_mtime = SpeakerStore.load(path), mtime
+    return _store
+
+
+def threshold_for(embedder: str) -> float:
+    value = os.getenv("SPEAKER_THRESHOLD")
+    return float(value) if value else DEFAULT_THRESHOLDS.get(embedder, 0.75)
+
+
+def verify(audio_path: str, store: SpeakerStore | None = None) -> SpeakerMatch | None:
+    """None if someone is enrolled and the clip holds less than MIN_SPEECH_S of speech."""
+    from s2s_pipeline.audio.audio_normalize import load_pcm16
+    store = store or get_store()
+    if not store.names:                                 # open gate: nothing to measure
+        return SpeakerMatch(None, 0.0, True)
+    voiced = speech_only(load_pcm16(audio_path))
+    if len(voiced) < MIN_SPEECH_S * SAMPLE_RATE:
+        return None
+    return store.match(embed(voiced, store.embedder), threshold_for(store.embedder))
+
+
+def enroll_files(name: str, paths: list[str], path: str = SPEAKER_DB) -> SpeakerStore:
+    """ValueError if a clip holds less than MIN_SPEECH_S of speech (nothing to learn from)."""
+    from s2s_pipeline.audio.audio_normalize import load_pcm16
+    store = SpeakerStore.load(path)
+    embeddings = []
+    for p in paths:
+        voiced = speech_only(load_pcm16(p))
+        if len(voiced) < MIN_SPEECH_S * SAMPLE_RATE:
+            raise ValueError(f"{p}: only {len(voiced) / SAMPLE_RATE:.2f}s of speech "
+                             f"(need {MIN_SPEECH_S}s) – record a longer clip")
+        embeddings.append(embed(voiced, store.embedder))
+    store.enroll(name, embeddings)
+    store.save(path)
+    return store
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Speaker enrolment for the voice gate")
+    parser.add_argument("--db", default=SPEAKER_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_enroll = sub.add_parser("enroll")
+    p_enroll.add_argument("name")
+    p_enroll.add_argument("audio", nargs="+")
+    sub.add_parser("list")
+    p_remove = sub.add_parser("remove")
+    p_remove.add_argument("name")
+    p_verify = sub.add_parser("verify")
+    p_verify.add_argument("audio")
+    args = parser.parse_args()
+
+    if args.cmd == "enroll":
+        try:
+            store = enroll_files(args.name, args.audio, args.db)
+        except ValueError as e:
+            parser.exit(1, f"[Speaker] Not enrolled: {e}\n")
+        print(f"[Speaker] Enrolled {args.name} ({len(args.audio)} clips, {store.embedder}) → {args.db}")
+    elif args.cmd == "list":
+        store = SpeakerStore.load(args.db)
+        print(f"[Speaker] {store.embedder}: " + (", ".join(f"{n} ({c})" for n, c in zip(store.names, store.counts))
+                                                or "nobody enrolled"))
+    elif args.cmd == "remove":
+        store = SpeakerStore.load(args.db)
+        removed = store.remove(args.name)
+        if removed:
+            store.save(args.db)
+        print(f"[Speaker] {args.name} " + ("removed" if removed else "is not enrolled"))
+    else:
+        print(verify(args.audio, SpeakerStore.load(args.db)))
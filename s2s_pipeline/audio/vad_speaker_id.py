@@ -1,5 +1,49 @@
-# VAD placeholder
-def vad_speaker_identification(audio_path):
-    # Placeholder: Replace with actual VAD and Speaker ID implementation
-    print(f"Performing VAD and Speaker ID on {audio_path}")
-    return audio_path  # Direct pass-through for now
+"""
+vad_speaker_id.py
+─────────────────────────────────────────────────────────
+Pre-ASR gate: is there speech, and is it someone we know?
+
+• the speaker is checked against the enrolled users
+  (speaker_verification.py); SPEAKER_GATE decides what happens to
+  strangers:  off – not checked,  flag – logged and passed on,
+  drop – turn skipped before ASR
+• clips too short to verify (< MIN_SPEECH_S voiced, someone enrolled)
+  are skipped only with drop; flag passes them on, and so does drop while
+  `expect_short` (a task is waiting for a yes / no – api/pipeline_core)
+• returns the path to transcribe, or None to skip the turn
+"""
+
+from __future__ import annotations
+
+from s2s_pipeline.audio.speaker_verification import SPEAKER_GATE, SPEAKER_STATS, verify
+
+
+def vad_speaker_identification(audio_path, gate: str = SPEAKER_GATE, expect_short: bool = False):
+    if gate == "off":
+        return audio_path
+    SPEAKER_STATS["checked"] += 1
+    try:
+        match = verify(audio_path)
+    except Exception as e:                  # never lose a turn to the gate itself
+        print(f"[Speaker] Check failed, passing through: {e}")
+        return audio_path
+
+    if match is None:
+        SPEAKER_STATS["no_speech"] += 1
+        if gate != "drop" or expect_short:
+            print(f"[Speaker] Too little speech to verify {audio_path} – passed on")
+            return audio_path
+        print(f"[Speaker] Too little speech to verify {audio_path} – skipping turn")
+        return None
+    if match.accepted:
+        SPEAKER_STATS["accepted"] += 1
+        if match.name:
+            print(f"[Speaker] {match.name} ({match.score:.2f})")
+        return audio_path
+    if gate == "drop":
+        SPEAKER_STATS["dropped"] += 1
+        print(f"[Speaker] Not enrolled (closest {match.name} {match.score:.2f}) – skipping turn")
+        return None
+    SPEAKER_STATS["flagged"] += 1
+    print(f"[Speaker] Not enrolled (closest {match.name} {match.score:.2f}) – flagged")
+    return audio_path
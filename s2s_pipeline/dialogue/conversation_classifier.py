@@ -1,4 +1,6 @@
 # Conversation classifier placeholder
+from s2s_pipeline.utils.phrase_matcher import default_matcher
+
 def needs_clarification(llm_response, avg_logprob=None, no_speech_prob=None):
     # Case 1: Whisper thinks there's no speech
     if no_speech_prob is not None and no_speech_prob > 0.7:
@@ -8,13 +10,8 @@ def needs_clarification(llm_response, avg_logprob=None, no_speech_prob=None):
     if avg_logprob is not None and avg_logprob < -1.2:
         return True
 
-    unclear_phrases = [
-        "i'm not sure", "can you repeat", "i didn’t understand",
-        "could you clarify", "i don't understand", "what do you mean", "can you rephrase"
-    ]
-
-    llm_response_lower = llm_response.lower()
-    if any(phrase in llm_response_lower for phrase in unclear_phrases):
+    # Case 3: the LLM itself asks for a repeat (compiled CLARIFICATION_PHRASES)
+    if default_matcher.contains(str(llm_response), "clarification"):
         return True
 
     return False
@@ -1,22 +1,265 @@
 # Dialogue manager placeholder
+"""
+Per-session dialogue memory, bounded so long-lived sessions stay small:
+
+• history            – fixed-capacity ring buffer of compact `Turn` records
+• completed_actions  – bounded, insertion-ordered set of task fingerprints
+• running_summary    – turns evicted from the ring are folded into a short
+                       summary (optionally on a background thread; snapshots
+                       wait for it so it is never lost)
+• late_replies       – results of actions that finished after their turn
+                       and weren't spoken yet; said before the next reply
+• context snippets are memoised and only rebuilt after the history changes
+"""
+import json
+import marshal
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from s2s_pipeline.utils.token_counter import count_tokens
+
+# Token budget for the dynamic context that follows the static system prefix.
+CONTEXT_TOKEN_BUDGET = 256
+CONTEXT_MAX_TURNS = 3
+HISTORY_CAPACITY = 8
+COMPLETED_ACTIONS_CAPACITY = 64
+SUMMARY_TOKEN_BUDGET = 64
+
+# Snapshot = magic/format-version header + marshal of plain tuples/lists/dicts.
+# marshal is the fastest stdlib codec for builtin types; it only ever sees data
+# written by `to_bytes`, never untrusted input.
+_SNAPSHOT_MAGIC = b"S2SD\x02"
+_SNAPSHOT_MAGIC_V1 = b"S2SD\x01"           # before late_replies; still readable
+_MARSHAL_VERSION = 4
+
+# One shared worker for all sessions; summarisation is cheap and ordered.
+_SUMMARY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dialogue-summary")
+
+
+def summarise_reply(llm_response):
+    """
+    Compact, speakable summary of an LLM reply for the context window:
+    the "response" text plus a short action tag, never the raw JSON.
+    """
+    parsed = llm_response
+    if isinstance(llm_response, str):
+        try:
+            parsed = json.loads(llm_response)
+        except json.JSONDecodeError:
+            return llm_response.strip()
+    if not isinstance(parsed, dict):
+        return str(parsed)
+
+    summary = str(parsed.get("response") or "").strip()
+    action = parsed.get("action")
+    if isinstance(action, dict) and action.get("type"):
+        to = (action.get("parameters") or {}).get("to")
+        tag = f"[{action['type']}{' to ' + to if to else ''}]"
+        summary = f"{summary} {tag}".strip()
+    return summary
+
+
+class Turn:
+    __slots__ = ("user", "assistant", "intent", "confidence", "tokens", "prompt_tokens")
+
+    def __init__(self, user, assistant, intent=None, confidence=None, prompt_tokens=None):
+        self.user = user
+        self.assistant = assistant
+        self.intent = intent
+        self.confidence = confidence
+        self.tokens = count_tokens(user) + count_tokens(assistant)
+        self.prompt_tokens = prompt_tokens
+
+    def __repr__(self):
+        return f"Turn({self.user!r}, {self.assistant!r}, intent={self.intent!r})"
+
+
+class BoundedSet:
+    """Set that forgets its oldest members beyond `maxlen`."""
+
+    def __init__(self, items=(), maxlen=COMPLETED_ACTIONS_CAPACITY):
+        self.maxlen = maxlen
+        self._items = OrderedDict()
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        self._items[item] = None
+        self._items.move_to_end(item)
+        while len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def extractive_summary(previous, evicted):
+    """
+    Default summariser (no LLM call): keep one short clause per evicted turn,
+    newest last, trimmed to SUMMARY_TOKEN_BUDGET.
+    """
+    clauses = [c for c in previous.split("; ") if c] if previous else []
+    for turn in evicted:
+        if turn.intent and turn.intent not in ("general_chat", "unknown"):
+            clauses.append(f"{turn.intent}: {turn.assistant[:60]}")
+        else:
+            clauses.append(f"user said '{turn.user[:60]}'")
+    while clauses and count_tokens("; ".join(clauses)) > SUMMARY_TOKEN_BUDGET:
+        clauses.pop(0)
+    return "; ".join(clauses)
+
+
 class DialogueManager:
-    def __init__(self):
-        self.history = []
+    def __init__(self, capacity=HISTORY_CAPACITY, summarizer=extractive_summary,
+                 background_summary=True):
+        self.history = deque(maxlen=capacity)
         self.state = {}
-        self.state = {"last_action": None, "completed_actions": set()}
-    
-    def update_state(self, user_input, llm_response, confidence=None,intent=None):
-        self.history.append({
-            "user": user_input,
-            "assistant": llm_response,
-            "confidence": confidence,
-            "intent": intent
-        })
-    
-    def get_context_snippet(self):
-        return "\n".join([f"User: {h['user']} | Assistant: {h['assistant']}" for h in self.history[-3:]])
-    
+        self.state = {"last_action": None, "completed_actions": BoundedSet()}
+        self.topic_seed = None
+        self.running_summary = ""
+        self.summarizer = summarizer
+        self.background_summary = background_summary
+        self._summary_lock = threading.Lock()
+        self._pending_summary = None            # newest background fold (executor is FIFO)
+        self._context_cache = {}
+
+    def update_state(self, user_input, llm_response, confidence=None,intent=None, prompt_tokens=None):
+        if len(self.history) == self.history.maxlen:
+            self._summarise_evicted(self.history[0])
+        self.history.append(Turn(user_input, summarise_reply(llm_response), intent, confidence, prompt_tokens))
+        self._context_cache.clear()
+
+    # ── summary of turns that fell out of the ring ─────────────────────
+    def _summarise_evicted(self, turn):
+        if self.summarizer is None:
+            return
+        if self.background_summary:
+            self._pending_summary = _SUMMARY_EXECUTOR.submit(self._fold_into_summary, turn)
+        else:
+            self._fold_into_summary(turn)
+
+    def _fold_into_summary(self, turn):
+        with self._summary_lock:
+            try:
+                self.running_summary = self.summarizer(self.running_summary, [turn])
+                self._context_cache.clear()
+            except Exception as e:
+                print(f"[Dialogue] Summariser failed: {e}")
+
+    def flush_summary(self, timeout=None):
+        """Wait until every evicted turn has been folded into `running_summary`."""
+        pending, self._pending_summary = self._pending_summary, None
+        if pending is not None:
+            pending.result(timeout)
+
+    # ── context for the next prompt ───────────────────────────────────
+    def get_context_turns(self, skip_last=False, max_tokens=CONTEXT_TOKEN_BUDGET, max_turns=CONTEXT_MAX_TURNS):
+        """Newest turns that fit in `max_tokens`, returned oldest first as (user, assistant)."""
+        key = ("turns", skip_last, max_tokens, max_turns)
+        cached = self._context_cache.get(key)
+        if cached is not None:
+            return cached
+
+        turns = list(self.history)[:-1] if skip_last else self.history
+        selected, used = [], 0
+        for turn in reversed(list(turns)[-max_turns:]):
+            if used + turn.tokens > max_tokens:
+                break
+            selected.append(turn)
+            used += turn.tokens
+        selected.reverse()
+        result = [(t.user, t.assistant) for t in selected]
+        self._context_cache[key] = result
+        return result
+
+    def get_context_snippet(self, skip_last=False, max_tokens=CONTEXT_TOKEN_BUDGET):
+        key = ("snippet", skip_last, max_tokens)
+        cached = self._context_cache.get(key)
+        if cached is None:
+            lines = [f"Earlier: {self.running_summary}"] if self.running_summary else []
+            lines += [f"User: {user} | Assistant: {assistant}"
+                      for user, assistant in self.get_context_turns(skip_last, max_tokens)]
+            cached = self._context_cache[key] = "\n".join(lines)
+        return cached
+
     def pop_last_turn(self):
         """Remove the most recent turn from history (used after a task finishes)."""
         if self.history:
             self.history.pop()
+            self._context_cache.clear()
+
+    def apply_late_result(self, record):
+        """
+        Outcome of an action that outlived its turn (api/pipeline_core):
+        {"fingerprint", "action" (follow-up task), "response", "spoken"}.
+        """
+        if record.get("action"):
+            self.state["last_action"] = record["action"]
+        elif record.get("fingerprint"):
+            self.state.setdefault("completed_actions", BoundedSet()).add(record["fingerprint"])
+        if record.get("response") and not record.get("spoken"):
+            self.state.setdefault("late_replies", []).append(record["response"])
+
+    # ── footprint ─────────────────────────────────────────────────────
+    def memory_bytes(self):
+        """Approximate resident size of this session's dialogue memory."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.history) + sys.getsizeof(self.state)
+        for turn in self.history:
+            size += sys.getsizeof(turn) + sum(sys.getsizeof(getattr(turn, s)) for s in Turn.__slots__)
+        completed = self.state.get("completed_actions") or ()
+        size += sys.getsizeof(getattr(completed, "_items", completed)) + sum(sys.getsizeof(fp) for fp in completed)
+        size += sys.getsizeof(self.running_summary)
+        size += sum(sys.getsizeof(v) for v in self._context_cache.values())
+        return size
+
+    # ── serialisation (session stores) ────────────────────────────────
+    def to_bytes(self):
+        """Compact binary snapshot: history, last_action, completed_actions, topic seed, summary,
+        unspoken late replies."""
+        self.flush_summary()        # the evicted turn is only in the summary once its fold ran
+        completed = self.state.get("completed_actions") or ()
+        payload = (
+            self.history.maxlen,
+            self.topic_seed,
+            self.running_summary,
+            [(t.user, t.assistant, t.intent, t.confidence, t.tokens, t.prompt_tokens) for t in self.history],
+            self.state.get("last_action"),
+            list(completed),
+            getattr(completed, "maxlen", COMPLETED_ACTIONS_CAPACITY),
+            list(self.state.get("late_replies") or ()),
+        )
+        return _SNAPSHOT_MAGIC + marshal.dumps(payload, _MARSHAL_VERSION)
+
+    @classmethod
+    def from_bytes(cls, data, **kwargs):
+        magic = data[:len(_SNAPSHOT_MAGIC)]
+        if magic not in (_SNAPSHOT_MAGIC, _SNAPSHOT_MAGIC_V1):
+            raise ValueError("Not a DialogueManager snapshot (or unsupported format version).")
+        payload = marshal.loads(data[len(_SNAPSHOT_MAGIC):])
+        if magic == _SNAPSHOT_MAGIC_V1:
+            payload += ([],)
+        capacity, topic_seed, summary, turns, last_action, completed, completed_max, late_replies = payload
+        dm = cls(capacity=capacity, **kwargs)
+        dm.topic_seed = topic_seed
+        dm.running_summary = summary
+        for user, assistant, intent, confidence, tokens, prompt_tokens in turns:
+            turn = Turn.__new__(Turn)
+            turn.user, turn.assistant, turn.intent = user, assistant, intent
+            turn.confidence, turn.tokens, turn.prompt_tokens = confidence, tokens, prompt_tokens
+            dm.history.append(turn)
+        dm.state["last_action"] = last_action
+        dm.state["completed_actions"] = BoundedSet(completed, maxlen=completed_max)
+        if late_replies:
+            dm.state["late_replies"] = late_replies
+        return dm
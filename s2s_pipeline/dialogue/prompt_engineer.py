@@ -1,53 +1,107 @@
 # Prompt engineer placeholder
-def enhance_prompt(base_prompt, style="friendly", topic=None):
-    """
-    Builds a complete prompt for the LLM to act as a spoken voice assistant capable of performing actions.
-    Includes an explicit `intent` field for structured classification.
-    """
+"""
+The static instructions are emitted once as a system prefix and never change
+between turns, so servers with prefix caching (vLLM, TGI, …) can reuse the
+KV-cache for them.  Everything dynamic (past turns, the new utterance) is
+appended *after* that prefix.
+"""
+from functools import lru_cache
 
-    tool_instruction = (
-        "You are a voice agent that can both answer questions and perform real-world tasks "
-        "like sending emails, SMS, or creating calendar events.\n\n"
-         "**If the user says anything that clearly means _send an e-mail_ "
+TOOL_INSTRUCTION = (
+    "You are a voice agent that can both answer questions and perform real-world tasks "
+    "like sending emails, SMS, or creating calendar events.\n\n"
+    "**If the user says anything that clearly means _send an e-mail_ "
     "(keywords: email, e-mail, mail, message, write to, send to), "
     "then the intent MUST be \"send_email\" – never \"general_chat\".**\n\n"
 
-        "Your response must always be a JSON object with these fields:\n"
-        '  "response" : What to say aloud to the user\n'
-        '  "intent"   : One of ["send_email", "create_event", "send_sms", "general_chat"]\n'
-        '  "action"   : Optional – only if an action is required, with fields:\n'
-        '       "type": the type of task (same as intent)\n'
-        '       "parameters": dictionary of required fields\n\n'
+    "Your response must always be a JSON object with these fields:\n"
+    '  "response" : What to say aloud to the user\n'
+    '  "intent"   : One of ["send_email", "create_event", "send_sms", "general_chat"]\n'
+    '  "action"   : Optional – only if an action is required, with fields:\n'
+    '       "type": the type of task (same as intent)\n'
+    '       "parameters": dictionary of required fields\n\n'
 
-        "→ If no real-world action is needed, set intent to 'general_chat' and omit the action.\n"
-        "→ If responding with an action (e.g. send_email), DO NOT guess email addresses.\n"
-        "   Put the person’s *name* only in the 'to' field (e.g., 'Marta Jones'), not an email address.\n\n"
+    "→ If no real-world action is needed, set intent to 'general_chat' and omit the action.\n"
+    "→ If responding with an action (e.g. send_email), DO NOT guess email addresses.\n"
+    "   Put the person’s *name* only in the 'to' field (e.g., 'Marta Jones'), not an email address.\n\n"
 
-        "Respond only in **valid JSON**. No free text before or after. \n"
-"Once an e-mail has been confirmed as sent, you **MUST NOT** ask about that same e-mail again, and you must not produce another send_email action unless the user explicitly requests a new e-mail."
-    )
+    "Respond only in **valid JSON**. No free text before or after. \n"
+    "Once an e-mail has been confirmed as sent, you **MUST NOT** ask about that same e-mail again, "
+    "and you must not produce another send_email action unless the user explicitly requests a new e-mail."
+)
 
-    output_guidance = (
-        "Speak as if you're directly talking to the user.\n"
-        "Avoid tables, bullet points, markdown, or visual references.\n"
-        "Do not mention that you're an AI or assistant.\n"
-        "Rephrase information so it flows naturally when spoken aloud.\n"
-        "Avoid special characters or emojis. Keep the tone concise and natural.\n"
-    )
+OUTPUT_GUIDANCE = (
+    "Speak as if you're directly talking to the user.\n"
+    "Avoid tables, bullet points, markdown, or visual references.\n"
+    "Do not mention that you're an AI or assistant.\n"
+    "Rephrase information so it flows naturally when spoken aloud.\n"
+    "Avoid special characters or emojis. Keep the tone concise and natural.\n"
+)
 
-    s2s_agent_context = (
-        "You are part of a speech-to-speech (S2S) voice assistant.\n"
-        "Your text output will be immediately converted to speech by a text-to-codec model.\n"
-    )
-    
+S2S_AGENT_CONTEXT = (
+    "You are part of a speech-to-speech (S2S) voice assistant.\n"
+    "Your text output will be immediately converted to speech by a text-to-codec model.\n"
+)
 
-    topic_instruction = f"You are helping the user on the topic: {topic}.\n" if topic else ""
 
+@lru_cache(maxsize=32)
+def system_prefix(style="friendly", topic=None):
+    """
+    Static instruction block, built once per (style, topic) and reused verbatim
+    so the token prefix is byte-identical on every turn.
+    """
+    topic_instruction = f"You are helping the user on the topic: {topic}.\n" if topic else ""
     return (
-        f"{tool_instruction}"
-        f"{s2s_agent_context}"
-        f"{output_guidance}"
+        f"{TOOL_INSTRUCTION}"
+        f"{S2S_AGENT_CONTEXT}"
+        f"{OUTPUT_GUIDANCE}"
         f"{topic_instruction}"
-        f"Respond in a {style} manner.\n\n"
-        f"{base_prompt}"
+        f"Respond in a {style} manner.\n"
     )
+
+
+def build_messages(user_input, context_turns=(), style="friendly", topic=None, summary=None):
+    """
+    Chat messages for one turn:
+        [system prefix] + [past (user, assistant) turns, oldest first] + [user_input]
+    `context_turns` should hold compact summaries (see DialogueManager), not raw JSON.
+    `summary` (older, evicted turns) is prepended to the first dynamic user message.
+    """
+    messages = [{"role": "system", "content": system_prefix(style, topic)}]
+    for user, assistant in context_turns:
+        messages.append({"role": "user", "content": user})
+        messages.append({"role": "assistant", "content": assistant})
+    messages.append({"role": "user", "content": user_input})
+    if summary:
+        messages[1] = {"role": "user", "content": f"(Earlier: {summary})\n{messages[1]['content']}"}
+    return messages
+
+
+def as_messages(prompt):
+    """Accept either a plain prompt string or an already built message list."""
+    if isinstance(prompt, list):
+        return prompt
+    return [{"role": "user", "content": prompt}]
+
+
+def fold_system_prompt(messages):
+    """
+    For chat templates without a system role (e.g. Mistral-Instruct): prepend the
+    system prefix to the first user message.  The prefix still comes first in the
+    rendered prompt, so prefix caching keeps working.
+    """
+    if not messages or messages[0]["role"] != "system":
+        return messages
+    system, rest = messages[0]["content"], messages[1:]
+    if rest and rest[0]["role"] == "user":
+        return [{"role": "user", "content": f"{system}\n{rest[0]['content']}"}] + rest[1:]
+    return [{"role": "user", "content": system}] + rest
+
+
+def enhance_prompt(base_prompt, style="friendly", topic=None):
+    """
+    Builds a complete prompt for the LLM to act as a spoken voice assistant capable of performing actions.
+    Includes an explicit `intent` field for structured classification.
+    Single-string variant of `build_messages`; the static prefix comes first.
+    """
+    return f"{system_prefix(style, topic)}\n{base_prompt}"
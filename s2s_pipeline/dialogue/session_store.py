@@ -0,0 +1,285 @@
+"""
+dialogue/session_store.py
+─────────────────────────────────────────────────────────────────────
+Where DialogueManager state lives between turns, so any worker process
+can serve any turn of a session.
+
+• InMemorySessionStore  – per-process LRU (single worker / tests)
+• SQLiteSessionStore    – durable, shared by all workers on a host or volume
+• SharedMemorySessionStore – one POSIX shared-memory segment per session,
+                             for multi-process servers on one host; idle
+                             segments expire after `ttl_s` like SQLite rows
+
+All backends store `DialogueManager.to_bytes()` snapshots (tens of µs to
+encode/decode).  Pick one with  SESSION_STORE=memory|sqlite|shm.
+
+Results of actions that finish after their turn's snapshot was saved are
+queued under "<session>#late" (`queue_late`) and applied by the next
+`load_or_create`, so they are never overwritten by that snapshot.
+"""
+
+from __future__ import annotations
+import hashlib, json, os, sqlite3, struct, threading, time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from s2s_pipeline.dialogue.dialogue_manager import DialogueManager
+
+LATE_SUFFIX = "#late"
+
+
+class SessionStore(ABC):
+    _late_lock = threading.Lock()
+
+    @abstractmethod
+    def load_bytes(self, session_id: str) -> bytes | None: ...
+
+    @abstractmethod
+    def save_bytes(self, session_id: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None: ...
+
+    def load(self, session_id: str) -> DialogueManager | None:
+        data = self.load_bytes(session_id)
+        return DialogueManager.from_bytes(data) if data else None
+
+    def load_or_create(self, session_id: str) -> DialogueManager:
+        dialogue_manager = self.load(session_id) or DialogueManager()
+        for record in self.take_late(session_id):
+            dialogue_manager.apply_late_result(record)
+        return dialogue_manager
+
+    def queue_late(self, session_id: str, record: dict) -> None:
+        """Keep a late action result (JSON-able dict) for the session's next load."""
+        with self._late_lock:
+            data = self.load_bytes(session_id + LATE_SUFFIX)
+            records = json.loads(data) if data else []
+            records.append(record)
+            self.save_bytes(session_id + LATE_SUFFIX, json.dumps(records).encode())
+
+    def take_late(self, session_id: str) -> list[dict]:
+        with self._late_lock:
+            data = self.load_bytes(session_id + LATE_SUFFIX)
+            if not data:
+                return []
+            self.delete(session_id + LATE_SUFFIX)
+            return json.loads(data)
+
+    def save(self, session_id: str, dialogue_manager: DialogueManager) -> None:
+        self.save_bytes(session_id, dialogue_manager.to_bytes())
+
+
+# ── in-process LRU ────────────────────────────────────────────────────
+class InMemorySessionStore(SessionStore):
+    def __init__(self, max_sessions: int = 10_000):
+        self.max_sessions = max_sessions
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load_bytes(self, session_id):
+        with self._lock:
+            data = self._data.get(session_id)
+            if data is not None:
+                self._data.move_to_end(session_id)
+            return data
+
+    def save_bytes(self, session_id, data):
+        with self._lock:
+            self._data[session_id] = data
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+# ── SQLite ────────────────────────────────────────────────────────────
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str = "sessions.db", ttl_s: float | None = 24 * 3600):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")      # WAL keeps this crash-safe
+            self._local.conn = conn
+        return conn
+
+    def load_bytes(self, session_id):
+        row = self._conn().execute(
+            "SELECT data, updated_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self.ttl_s is not None and row[1] < time.time() - self.ttl_s:
+            self.delete(session_id)
+            return None
+        return row[0]
+
+    def save_bytes(self, session_id, data):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+            (session_id, sqlite3.Binary(data), time.time()),
+        )
+        conn.commit()
+
+    def delete(self, session_id):
+        conn = self._conn()
+        conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        conn.commit()
+
+    def purge_expired(self) -> int:
+        if self.ttl_s is None:
+            return 0
+        conn = self._conn()
+        cur = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_s,))
+        conn.commit()
+        return cur.rowcount
+
+
+# ── shared memory ─────────────────────────────────────────────────────
+class SharedMemorySessionStore(SessionStore):
+    """
+    Segment layout:  [u32 length][f64 updated_at][snapshot bytes … padding]
+    Segments are sized in 4 KiB pages and recreated when a snapshot outgrows
+    them.  Turns of one session are expected to be serialised by the router
+    (one turn in flight per session), so no cross-process lock is taken.
+
+    Segments outlive the processes that wrote them, so expired ones are
+    unlinked when read and swept from /dev/shm (Linux) at most every
+    `purge_every_s` by `save_bytes`.
+    """
+    _HEADER = struct.Struct("<Id")
+    _PAGE = 4096
+    _SHM_DIR = "/dev/shm"
+
+    def __init__(self, prefix: str = "s2s_", ttl_s: float | None = 24 * 3600,
+                 purge_every_s: float = 300.0):
+        self.prefix = prefix
+        self.ttl_s = ttl_s
+        self.purge_every_s = purge_every_s
+        self._next_purge = 0.0
+
+    def _name(self, session_id: str) -> str:
+        return self.prefix + hashlib.sha1(session_id.encode()).hexdigest()[:20]
+
+    @staticmethod
+    def _open(name: str, create: bool = False, size: int = 0):
+        from multiprocessing import shared_memory, resource_tracker
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+        except TypeError:                                   # Python < 3.13: no `track`
+            shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+            # otherwise the tracker unlinks the segment when *this* process exits
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    @staticmethod
+    def _unlink(shm):
+        from multiprocessing import resource_tracker
+        if getattr(shm, "_track", True):        # < 3.13: unlink() unregisters, so re-register first
+            resource_tracker.register(shm._name, "shared_memory")
+        shm.unlink()
+
+    def load_bytes(self, session_id):
+        try:
+            shm = self._open(self._name(session_id))
+        except FileNotFoundError:
+            return None
+        try:
+            length, updated_at = self._HEADER.unpack_from(shm.buf, 0)
+            expired = self.ttl_s is not None and updated_at < time.time() - self.ttl_s
+            if not expired:
+                return bytes(shm.buf[self._HEADER.size:self._HEADER.size + length]) if length else None
+        finally:
+            shm.close()
+        try:
+            self._unlink(shm)
+        except FileNotFoundError:               # another worker expired it first
+            pass
+        return None
+
+    def save_bytes(self, session_id, data):
+        if self.ttl_s is not None and time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + self.purge_every_s
+            self.purge_expired()
+        name = self._name(session_id)
+        needed = self._HEADER.size + len(data)
+        try:
+            shm = self._open(name)
+            if shm.size < needed:
+                shm.close()
+                self._unlink(shm)
+                raise FileNotFoundError
+        except FileNotFoundError:
+            size = -(-needed // self._PAGE) * self._PAGE
+            shm = self._open(name, create=True, size=size)
+        try:
+            shm.buf[self._HEADER.size:needed] = data
+            self._HEADER.pack_into(shm.buf, 0, len(data), time.time())
+        finally:
+            shm.close()
+
+    def delete(self, session_id):
+        try:
+            shm = self._open(self._name(session_id))
+        except FileNotFoundError:
+            return
+        shm.close()
+        self._unlink(shm)
+
+    def purge_expired(self) -> int:
+        """Unlink this store's segments not written for `ttl_s` (sessions nobody deleted)."""
+        if self.ttl_s is None or not os.path.isdir(self._SHM_DIR):
+            return 0
+        cutoff, purged = time.time() - self.ttl_s, 0
+        for name in os.listdir(self._SHM_DIR):
+            if not name.startswith(self.prefix):
+                continue
+            try:
+                shm = self._open(name)
+            except (FileNotFoundError, PermissionError):
+                continue
+            try:
+                stale = shm.size >= self._HEADER.size and self._HEADER.unpack_from(shm.buf, 0)[1] < cutoff
+            finally:
+                shm.close()
+            if stale:
+                try:
+                    self._unlink(shm)
+                    purged += 1
+                except FileNotFoundError:
+                    pass
+        return purged
+
+
+# ── factory ───────────────────────────────────────────────────────────
+_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide store chosen by SESSION_STORE (memory | sqlite | shm)."""
+    global _store
+    if _store is None:
+        kind = os.getenv("SESSION_STORE", "memory").lower()
+        if kind == "sqlite":
+            _store = SQLiteSessionStore(os.getenv("SESSION_DB", "sessions.db"))
+        elif kind == "shm":
+            _store = SharedMemorySessionStore()
+        else:
+            _store = InMemorySessionStore()
+    return _store
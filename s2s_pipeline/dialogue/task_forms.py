@@ -0,0 +1,371 @@
+"""
+dialogue/task_forms.py
+─────────────────────────────────────────────────────────────────────
+Declarative slot filling for multi-turn tasks (send_email, send_sms,
+create_event …).  The LLM is asked once – to recognise the intent and
+pull out whatever parameters the first utterance already holds; every
+follow-up turn of the task is handled here, locally.
+
+• a TaskForm lists its slots in the order they are asked for; a Slot has
+    prompt    – asked while the slot is empty ("{to}" etc. are filled in)
+    parse     – utterance → SlotResult: the value, a "Did you mean …?"
+                question to confirm it with, or an error to re-ask with
+    retry     – asked after the user rejects a proposed value
+• optional `confirm` read-back before the action runs
+• `event_time` turns "tomorrow at 3 pm" / "March 14th 10:30" / "in two
+  hours" / ISO into one canonical "Friday 14 March 2026 at 15:00" (read
+  back as is); anything without a date or time, or already past, is re-asked
+• "cancel" / "never mind" ends the task at any point
+• form state lives inside the dialogue's `last_action` dict (key "form"),
+  so it survives the session store like any in-progress action
+• FORM_METRICS: tasks completed / cancelled, LLM calls made and avoided
+  (every locally handled turn is one LLM call avoided)
+
+    step = begin(action)                      # after the LLM named a task
+    step = advance(last_action, user_text)    # every later turn, no LLM
+    if step.run: run_action(step.run) …
+"""
+
+from __future__ import annotations
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, NamedTuple
+
+FILLER_MAX_WORDS = 2
+
+FORM_METRICS = {"started": 0, "completed": 0, "cancelled": 0,
+                "llm_calls": 0, "local_turns": 0}
+
+
+class SlotResult(NamedTuple):
+    value: str | None               # None → not usable, re-ask with `error`
+    confirm: str | None = None      # yes/no question to ask before accepting `value`
+    error: str | None = None
+
+
+class Slot(NamedTuple):
+    name: str
+    prompt: str
+    parse: Callable[[str], SlotResult]
+    retry: str | None = None        # after "no" to a proposed value (default: prompt)
+    aliases: tuple[str, ...] = ()   # other parameter names the LLM uses for it
+
+
+class TaskForm(NamedTuple):
+    intent: str
+    slots: tuple[Slot, ...]
+    confirm: str | None = None      # final read-back, e.g. "Shall I add {title} on {when}?"
+    cancelled: str = "Okay, I’ve cancelled that."
+
+
+class FormStep(NamedTuple):
+    say: str | None                 # reply for this turn (None when `run` speaks for itself)
+    action: dict | None             # task still in progress → keep as last_action
+    run: dict | None = None         # complete action to execute now
+    cached: bool = False            # `say` is a fixed phrase (phrase cache)
+
+
+FORMS: dict[str, TaskForm] = {}
+
+
+def register_form(form: TaskForm) -> TaskForm:
+    FORMS[form.intent] = form
+    return form
+
+
+# ── slot parsers ──────────────────────────────────────────────────────
+def free_text(error: str) -> Callable[[str], SlotResult]:
+    """Any utterance that is more than a bare "okay" / "yes"."""
+    from s2s_pipeline.utils.phrase_matcher import match_phrases
+
+    def parse(text: str) -> SlotResult:
+        text = text.strip()
+        if not text or (len(text.split()) <= FILLER_MAX_WORDS and match_phrases(text)["filler"]):
+            return SlotResult(None, error=error)
+        return SlotResult(text)
+    return parse
+
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_MONTHS = ("january", "february", "march", "april", "may", "june", "july", "august",
+           "september", "october", "november", "december")
+_MONTH_NAMES = {**{m: i for i, m in enumerate(_MONTHS, 1)},
+                **{m[:3]: i for i, m in enumerate(_MONTHS, 1) if m != "may"}, "sept": 9}
+_NUMBER_WORDS = {w: i for i, w in enumerate(("a", "one", "two", "three", "four", "five", "six", "seven",
+                                             "eight", "nine", "ten", "eleven", "twelve"))}
+_NUMBER_WORDS["a"] = _NUMBER_WORDS["an"] = 1
+_MONTH = r"(" + "|".join(sorted(_MONTH_NAMES, key=len, reverse=True)) + r")\b"
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+_NUM = r"(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+_UNITS = {"minute": "minutes", "hour": "hours", "day": "days", "week": "weeks"}
+_WHEN_ERROR = "Please tell me the date and time, like “tomorrow at 3 pm”."
+
+
+def _event_date(text: str, today: date) -> date | None:
+    """Calendar date named in `text`; ValueError for impossible dates."""
+    if m := re.search(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b", text):
+        return date(int(m[1]), int(m[2]), int(m[3]))
+    m = re.search(_DAY + r"(?: of)? " + _MONTH, text)
+    day, month = (m[1], m[2]) if m else (None, None)
+    if m is None and (m := re.search(r"\b" + _MONTH + r" " + _DAY, text)):
+        day, month = m[2], m[1]
+    if m:
+        year = re.match(r",? (\d{4})\b", text[m.end():])
+        d = date(int(year[1]) if year else today.year, _MONTH_NAMES[month], int(day))
+        return d if year or d >= today else d.replace(year=d.year + 1)
+    if "day after tomorrow" in text:
+        return today + timedelta(days=2)
+    if "tomorrow" in text:
+        return today + timedelta(days=1)
+    if re.search(r"\b(today|tonight)\b", text):
+        return today
+    if m := re.search(r"\b(next |this )?(" + "|".join(_WEEKDAYS) + r")\b", text):
+        ahead = (_WEEKDAYS.index(m[2]) - today.weekday()) % 7
+        return today + timedelta(days=ahead or (7 if m[1] == "next " else 0))
+    return None
+
+
+def _event_clock(text: str) -> tuple[int, int] | None:
+    """(hour, minute) named in `text`; ValueError for impossible times."""
+    if re.search(r"\b(noon|midday)\b", text):
+        return 12, 0
+    if re.search(r"\bmidnight\b", text):
+        return 0, 0
+    hours = r"(\d{1,2}|" + "|".join(w for w in _NUMBER_WORDS if w not in ("a", "an")) + r")"
+    if m := re.search(r"\b" + hours + r"(?::(\d{2}))?\s*([ap])\.?\s?m\b\.?", text):
+        hour, minute = _NUMBER_WORDS.get(m[1]) or int(m[1]), int(m[2] or 0)
+        if not 1 <= hour <= 12:
+            raise ValueError(f"hour {hour}{m[3]}m")
+        hour = hour % 12 + (12 if m[3] == "p" else 0)
+    else:
+        if m := re.search(r"\b(\d{1,2}):(\d{2})\b", text):
+            hour, minute = int(m[1]), int(m[2])
+        elif m := re.search(r"\bat " + hours + r"(?: o'?clock)?\b", text):
+            hour, minute = _NUMBER_WORDS.get(m[1]) or int(m[1]), 0
+            if 1 <= hour <= 7:
+                hour += 12                              # "at 3" – afternoon, not 3 in the morning
+        else:
+            return None
+        if "tonight" in text and 1 <= hour < 12:
+            hour += 12
+    if hour > 23 or minute > 59:
+        raise ValueError(f"{hour}:{minute:02d}")
+    return hour, minute
+
+
+def event_time(text: str, now: datetime | None = None) -> SlotResult:
+    """Spoken date / time → canonical "Friday 14 March 2026 at 15:00" (or date only)."""
+    now = now or datetime.now()
+    text = re.sub(r"(\d)t(\d)", r"\1 \2", text.lower()).replace("’", "'")
+    text = re.sub(r"\s+", " ", re.sub(r"[^\w\s:'.,-]", " ", text))
+    try:
+        if m := re.search(r"\bin " + _NUM + r" (minute|hour|day|week)s?\b", text):
+            n = int(m[1]) if m[1].isdigit() else _NUMBER_WORDS[m[1]]
+            when = now + timedelta(**{_UNITS[m[2]]: n})
+            day, clock = when.date(), (when.hour, when.minute) if m[2] in ("minute", "hour") else None
+        elif re.search(r"\bin half an hour\b", text):
+            when = now + timedelta(minutes=30)
+            day, clock = when.date(), (when.hour, when.minute)
+        else:
+            day, clock = _event_date(text, now.date()), _event_clock(text)
+    except (ValueError, OverflowError):
+        return SlotResult(None, error=_WHEN_ERROR)
+    if day is None and clock is None:
+        return SlotResult(None, error=_WHEN_ERROR)
+    if day is None:                                     # time only: the next one
+        day = now.date() if clock >= (now.hour, now.minute) else now.date() + timedelta(days=1)
+    if day < now.date() or day == now.date() and clock and clock < (now.hour, now.minute):
+        return SlotResult(None, error="That time has already passed. When should it be?")
+    spoken = f"{_WEEKDAYS[day.weekday()].title()} {day.day} {_MONTHS[day.month - 1].title()} {day.year}"
+    return SlotResult(f"{spoken} at {clock[0]:02d}:{clock[1]:02d}" if clock else spoken)
+
+
+def email_recipient(text: str) -> SlotResult:
+    """Contact name or spoken address → e-mail; fuzzy contact matches need a yes."""
+    from s2s_pipeline.actions.action_router import normalise_email, resolve_email
+    if re.search(r"\bat\b.*\bdot\b", text.lower()):          # "john at gmail dot com"
+        text = normalise_email(text)
+    email, needs_conf = resolve_email(text)
+    if not email:
+        return SlotResult(None, error="I couldn’t find that contact. Please say or spell the address.")
+    return SlotResult(email, confirm=f"Did you mean {email}?" if needs_conf else None)
+
+
+def phone_recipient(text: str) -> SlotResult:
+    digits = re.sub(r"[^\d+]", "", text)
+    if len(digits) >= 7:
+        return SlotResult(digits)
+    return free_text("Who should I text?")(text)
+
+
+register_form(TaskForm(
+    intent="send_email",
+    slots=(
+        Slot("to", "Who should I e-mail?", email_recipient,
+             retry="Okay, please tell me the correct e-mail address.", aliases=("recipient",)),
+        Slot("body", "What message should I send to {to}?",
+             free_text("Please tell me the message you want to send."), aliases=("message",)),
+    ),
+    cancelled="Okay, I’ve cancelled the e-mail.",
+))
+
+register_form(TaskForm(
+    intent="send_sms",
+    slots=(
+        Slot("to", "Who should I text?", phone_recipient, aliases=("recipient", "phone")),
+        Slot("body", "What should the message to {to} say?",
+             free_text("Please tell me the message you want to send."), aliases=("message", "text")),
+    ),
+    confirm="Text {to}: “{body}”. Shall I send it?",
+    cancelled="Okay, I won’t send the message.",
+))
+
+register_form(TaskForm(
+    intent="create_event",
+    slots=(
+        Slot("title", "What should I call the event?", free_text("What is the event about?"),
+             aliases=("summary", "subject", "name")),
+        Slot("when", "When is {title}?", event_time, aliases=("datetime", "date", "time", "start")),
+    ),
+    confirm="Shall I add “{title}” on {when}?",
+    cancelled="Okay, I won’t add the event.",
+))
+
+
+# ── engine ────────────────────────────────────────────────────────────
+def handles(intent: str | None) -> bool:
+    return intent in FORMS
+
+
+def active(action: dict | None) -> bool:
+    """True if `action` is a task this engine is filling."""
+    return isinstance(action, dict) and "form" in action and action.get("type") in FORMS
+
+
+def awaiting_confirmation(action: dict | None) -> bool:
+    """True while the next turn is expected to be a bare yes / no."""
+    return active(action) and bool(action["form"].get("confirming"))
+
+
+def _ask(text: str, action: dict) -> FormStep:
+    return FormStep(text.format(**action["parameters"]), action, cached="{" not in text)
+
+
+def _next(form: TaskForm, action: dict) -> FormStep:
+    """Ask for the first empty slot, read back, or hand over the finished action."""
+    params, state = action["parameters"], action["form"]
+    for slot in form.slots:
+        if params.get(slot.name):
+            continue
+        given = state.get("given", {}).pop(slot.name, None)
+        if given is not None:                               # extracted by the LLM, not yet parsed
+            step = _fill(action, slot, given)
+            if step is None:
+                continue
+            return step
+        state["pending"] = slot.name
+        return _ask(slot.prompt, action)
+    state["pending"] = None
+    if form.confirm and not state.get("confirmed"):
+        state["confirming"] = "*"
+        return _ask(form.confirm, action)
+    return _finish(form, action)
+
+
+def _finish(form: TaskForm, action: dict) -> FormStep:
+    state = action["form"]
+    FORM_METRICS["completed"] += 1
+    FORM_METRICS["llm_calls"] += state["llm_calls"]
+    FORM_METRICS["local_turns"] += state["local_turns"]
+    print(f"[Forms] {form.intent} complete: {state['llm_calls']} LLM call(s), "
+          f"{state['local_turns']} local turn(s) – {form_report()}")
+    return FormStep(None, None, run={"type": action["type"], "parameters": dict(action["parameters"])})
+
+
+def _cancel(form: TaskForm, action: dict) -> FormStep:
+    state = action["form"]
+    FORM_METRICS["cancelled"] += 1
+    FORM_METRICS["llm_calls"] += state["llm_calls"]
+    FORM_METRICS["local_turns"] += state["local_turns"]
+    return FormStep(form.cancelled, None, cached=True)
+
+
+def _fill(action: dict, slot: Slot, text: str) -> FormStep | None:
+    """None once the slot holds a value; otherwise the question to ask."""
+    action["form"]["pending"] = slot.name
+    result = slot.parse(text)
+    if result.value is None:
+        return FormStep(result.error or slot.prompt, action, cached=True)
+    if result.confirm:
+        action["form"].update(confirming=slot.name, candidate=result.value)
+        return FormStep(result.confirm, action)
+    action["parameters"][slot.name] = result.value
+    return None
+
+
+def begin(action: dict) -> FormStep:
+    """
+    Start filling `action` (just produced by the LLM).  Parameters it already
+    carries are validated like spoken answers, in slot order; values behind
+    one that needs a question are kept ("given") and parsed once it's settled.
+    """
+    form = FORMS[action["type"]]
+    params = {k: v for k, v in (action.get("parameters") or {}).items() if k not in ("step", "confirm")}
+    action = {"type": form.intent, "parameters": {},
+              "form": {"pending": None, "confirming": None, "candidate": None, "given": {},
+                       "llm_calls": 1, "local_turns": 0}}
+    FORM_METRICS["started"] += 1
+    slot_names = {name for s in form.slots for name in (s.name, *s.aliases)}
+    action["parameters"].update((k, v) for k, v in params.items() if k not in slot_names)
+    for slot in form.slots:
+        value = next((params[n] for n in (slot.name, *slot.aliases) if params.get(n)), None)
+        if isinstance(value, str) and value.strip():
+            action["form"]["given"][slot.name] = value
+    return _next(form, action)
+
+
+def advance(action: dict, user_text: str, phrases: dict | None = None) -> FormStep:
+    """One follow-up turn of an active form – no LLM involved."""
+    from s2s_pipeline.utils.phrase_matcher import match_phrases
+    form, state = FORMS[action["type"]], action["form"]
+    phrases = phrases if phrases is not None else match_phrases(user_text)
+    state["local_turns"] += 1
+
+    if phrases["cancel"]:
+        return _cancel(form, action)
+    # "no that's not right" also matches "right": a no always wins over a yes
+    negative = phrases["negative"]
+    affirmative = phrases["affirmative"] and not negative
+
+    confirming = state.get("confirming")
+    if confirming == "*":                                   # final read-back
+        if negative:
+            return _cancel(form, action)
+        if affirmative:
+            state.update(confirming=None, confirmed=True)
+            return _next(form, action)
+        return _ask(form.confirm, action)
+
+    if confirming:                                          # "Did you mean …?"
+        slot = next(s for s in form.slots if s.name == confirming)
+        if affirmative:
+            action["parameters"][slot.name] = state["candidate"]
+            state.update(confirming=None, candidate=None)
+            return _next(form, action)
+        state.update(confirming=None, candidate=None, pending=slot.name)
+        if negative:
+            return FormStep(slot.retry or slot.prompt.format(**action["parameters"]), action,
+                            cached=slot.retry is not None)
+        # anything else: take it as the corrected value
+
+    slot = next(s for s in form.slots if s.name == (state.get("pending") or form.slots[0].name))
+    step = _fill(action, slot, user_text)
+    return step if step is not None else _next(form, action)
+
+
+def form_report() -> str:
+    m = FORM_METRICS
+    done = m["completed"] + m["cancelled"]
+    return (f"{m['completed']} task(s) completed, {m['cancelled']} cancelled; "
+            f"{m['llm_calls'] / max(done, 1):.2f} LLM call(s) and "
+            f"{m['local_turns'] / max(done, 1):.2f} LLM call(s) avoided per task")
@@ -1,24 +1,34 @@
 import os
-import requests
 from dotenv import load_dotenv
+from s2s_pipeline.dialogue.prompt_engineer import as_messages
+from s2s_pipeline.llm.structured_output import structured_params, DEFAULT_TOKEN_BUDGET
+from s2s_pipeline.llm.llm_client import get_llm_client, LLMUnavailableError  # noqa: F401 (re-export)
 load_dotenv()
-LLM_API_URL = os.getenv("LLM_API_URL")
+LLM_MODEL = os.getenv("LLM_MODEL", "meta-llama/Llama-2-7b-chat-hf")
 
-def call_llm(prompt, model=None, temperature=0.7, max_tokens=30):
+def call_llm(prompt, model=None, temperature=0.7, max_tokens=DEFAULT_TOKEN_BUDGET, timeout=None,
+             structured=True):
+    """
+    `prompt` is a string or a message list from `build_messages`.
+    Hedged / failover request across LLM_API_URLS; raises LLMUnavailableError
+    instead of returning an error string that would be spoken.
+    `structured` asks the server for schema-constrained JSON (LLM_STRUCTURED_OUTPUT).
+    """
+    messages = as_messages(prompt)
+    data = get_llm_client().chat(
+        {
+            "model": model or LLM_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **(structured_params() if structured else {}),
+        },
+        timeout=timeout,
+    )
+    usage = data.get("usage") or {}
+    if usage:
+        print(f"[LLM] Tokens: prompt={usage.get('prompt_tokens')} completion={usage.get('completion_tokens')}")
     try:
-        response = requests.post(
-            LLM_API_URL,
-            headers={"Content-Type": "application/json"},
-            json={
-                "model": "meta-llama/Llama-2-7b-chat-hf",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            },
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    except Exception as e:
-        print(f"LLM call failed: {e}")
-        return "[ERROR: LLM call failed]"
+        return data['choices'][0]['message']['content']
+    except (KeyError, IndexError, TypeError) as e:
+        raise LLMUnavailableError(f"Malformed LLM reply: {data!r:.200}") from e
@@ -0,0 +1,244 @@
+"""
+llm/llm_client.py
+─────────────────────────────────────────────────────────────────────
+Multi-endpoint client for OpenAI-compatible /chat/completions servers
+(vLLM, TGI, llama.cpp …).
+
+• Endpoints + weights from  LLM_API_URLS="http://a/v1/chat/completions|3,http://b/...|1"
+  (falls back to the single  LLM_API_URL)
+• Hedging: if the first request is slower than that endpoint's recent
+  latency percentile (LLM_HEDGE_PERCENTILE, default p95), a second request
+  goes to another healthy endpoint; the first answer wins and the loser is
+  cancelled (aiohttp drops the connection, so vLLM aborts its generation)
+• Failover: errors start the next endpoint immediately; endpoints that fail
+  repeatedly are benched for a cool-down period
+• Servers that reject the structured-output fields (HTTP 400/422) are
+  retried once without them and used with plain decoding from then on;
+  the repair parser takes over instead of the endpoint being benched
+• Raises LLMUnavailableError when no endpoint answered in time
+"""
+
+from __future__ import annotations
+import asyncio, os, random, threading, time
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TIMEOUT_S   = float(os.getenv("LLM_TIMEOUT", 10))
+HEDGE_PERCENTILE    = float(os.getenv("LLM_HEDGE_PERCENTILE", 0.95))
+MIN_HEDGE_DELAY_S   = 0.25
+FAILURE_THRESHOLD   = 3          # consecutive failures before benching
+COOLDOWN_S          = 30.0
+LATENCY_WINDOW      = 200
+STRUCTURED_KEYS     = ("response_format", "guided_json")   # see llm/structured_output
+
+
+class LLMUnavailableError(RuntimeError):
+    """No LLM endpoint produced a reply within the timeout."""
+
+
+def _discard_result(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()
+
+
+class Endpoint:
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url
+        self.weight = weight
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.structured = True                      # False once it rejected STRUCTURED_KEYS
+        self.stats = {"requests": 0, "wins": 0, "failures": 0, "cancelled": 0}
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def hedge_delay(self, percentile: float, cold_start: float) -> float:
+        if len(self.latencies) < 10:                # not enough data yet
+            return max(MIN_HEDGE_DELAY_S, cold_start)
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return max(MIN_HEDGE_DELAY_S, ordered[idx])
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+
+    def record_failure(self, now: float):
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.down_until = now + COOLDOWN_S
+            print(f"[LLM] Endpoint {self.url} benched for {COOLDOWN_S:.0f}s")
+
+    def __repr__(self):
+        return f"Endpoint({self.url!r}, weight={self.weight})"
+
+
+def _plain(payload: dict) -> dict:
+    return {k: v for k, v in payload.items() if k not in STRUCTURED_KEYS}
+
+
+def parse_endpoints(spec: str | None) -> list[Endpoint]:
+    """'url|weight,url|weight' → [Endpoint, …]"""
+    endpoints = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, weight = item.partition("|")
+        endpoints.append(Endpoint(url.strip(), float(weight) if weight else 1.0))
+    return endpoints
+
+
+class LLMClient:
+    def __init__(self, endpoints: list[Endpoint], timeout: float = DEFAULT_TIMEOUT_S,
+                 hedge_percentile: float = HEDGE_PERCENTILE):
+        if not endpoints:
+            raise ValueError("LLMClient needs at least one endpoint (set LLM_API_URLS or LLM_API_URL).")
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.stats = {"requests": 0, "hedged": 0, "failovers": 0, "unavailable": 0}
+        self._loop = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    # ── event loop thread (keeps the HTTP connection pool warm) ────────
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True,
+                                 name="llm-client").start()
+        return self._loop
+
+    async def _get_session(self):
+        import aiohttp
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    # ── endpoint choice ───────────────────────────────────────────────
+    def _pick(self, exclude) -> Endpoint | None:
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e not in exclude]
+        healthy = [e for e in candidates if e.healthy(now)]
+        if healthy:
+            return random.choices(healthy, weights=[e.weight for e in healthy])[0]
+        # everything benched → probe the one that comes back soonest
+        return min(candidates, key=lambda e: e.down_until) if candidates else None
+
+    # ── requests ──────────────────────────────────────────────────────
+    async def _post(self, endpoint: Endpoint, payload: dict, timeout: float) -> dict:
+        import aiohttp
+        session = await self._get_session()
+        endpoint.stats["requests"] += 1
+        start = time.monotonic()
+        body = payload if endpoint.structured else _plain(payload)
+        async with session.post(endpoint.url, json=body,
+                                timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            if resp.status in (400, 422) and len(body) != len(_plain(body)):
+                endpoint.structured = False
+                print(f"[LLM] {endpoint.url} rejected structured output (HTTP {resp.status}) "
+                      f"– using plain decoding")
+                return await self._post(endpoint, payload,
+                                        max(0.05, timeout - (time.monotonic() - start)))
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        endpoint.record_success(time.monotonic() - start)
+        return data
+
+    async def _chat(self, payload: dict, timeout: float) -> dict:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        tried: list[Endpoint] = []
+        running: dict[asyncio.Task, Endpoint] = {}
+        hedged = False
+        last_error = None
+
+        def launch() -> bool:
+            ep = self._pick(tried)
+            if ep is None:
+                return False
+            tried.append(ep)
+            task = loop.create_task(self._post(ep, payload, max(0.05, deadline - loop.time())))
+            task.add_done_callback(_discard_result)    # losers may finish after we return
+            running[task] = ep
+            return True
+
+        launch()
+        try:
+            while running:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                wait_for = remaining
+                if not hedged and len(tried) < len(self.endpoints):
+                    wait_for = min(remaining, tried[0].hedge_delay(self.hedge_percentile, timeout / 4))
+
+                done, _ = await asyncio.wait(running, timeout=wait_for,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if not hedged and launch():
+                        hedged = True
+                        self.stats["hedged"] += 1
+                        print(f"[LLM] Hedging slow request → {tried[-1].url}")
+                    continue
+
+                for task in done:
+                    ep = running.pop(task)
+                    if task.exception() is None:
+                        ep.stats["wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    ep.record_failure(time.monotonic())
+                    print(f"[LLM] {ep.url} failed: {last_error!r}")
+                    if launch():
+                        self.stats["failovers"] += 1
+        finally:
+            for task, ep in running.items():       # cancel the loser(s)
+                if not task.done():
+                    task.cancel()
+                    ep.stats["cancelled"] += 1
+
+        self.stats["unavailable"] += 1
+        raise LLMUnavailableError(f"No LLM endpoint answered within {timeout:.1f}s"
+                                  + (f" (last error: {last_error!r})" if last_error else ""))
+
+    def chat(self, payload: dict, timeout: float | None = None) -> dict:
+        """Blocking call; returns the decoded /chat/completions JSON."""
+        timeout = self.timeout if timeout is None else timeout
+        self.stats["requests"] += 1
+        future = asyncio.run_coroutine_threadsafe(self._chat(payload, timeout), self._ensure_loop())
+        try:
+            return future.result(timeout + 1.0)
+        except LLMUnavailableError:
+            raise
+        except Exception as e:                      # loop-level timeout / unexpected errors
+            future.cancel()
+            raise LLMUnavailableError(str(e)) from e
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop, self._session = None, None
+
+
+_default_client: LLMClient | None = None
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client built from LLM_API_URLS / LLM_API_URL."""
+    global _default_client
+    if _default_client is None:
+        spec = os.getenv("LLM_API_URLS") or os.getenv("LLM_API_URL")
+        _default_client = LLMClient(parse_endpoints(spec))
+    return _default_client
@@ -1,6 +1,7 @@
 # OpenAI LLM placeholder
 from openai import OpenAI
 import os
+from s2s_pipeline.dialogue.prompt_engineer import as_messages
 
 # Create client using the API key from environment
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -12,9 +13,11 @@ def call_llm(prompt, model="gpt-4o-mini", temperature=0.7):
     try:
         response = client.chat.completions.create(
             model=model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=as_messages(prompt),
             temperature=temperature
         )
+        if response.usage:
+            print(f"[LLM] Tokens: prompt={response.usage.prompt_tokens} completion={response.usage.completion_tokens}")
         return response.choices[0].message.content
     except Exception as e:
         print(f"LLM call failed: {e}")
@@ -0,0 +1,152 @@
+"""
+llm/response_cache.py
+─────────────────────────────────────────────────────────────────────
+LLM reply cache for `general_chat` turns.
+
+• Key   = (topic seed, context digest, normalised user text); the digest
+          covers the context turns + running summary the reply was generated
+          with, so one session's history is never served to another
+• Follow-ups that refer back to earlier turns ("tell her that") bypass it
+• Exact lookup first, then fuzzy lookup (RapidFuzz token_sort_ratio)
+• Replies that carry an action / non-chat intent are never stored
+• Per-entry TTL (shorter for time-sensitive questions) and LRU eviction
+• Hit / miss counters in `ResponseCache.stats`
+"""
+
+from __future__ import annotations
+import hashlib, json, re, threading, time
+from collections import OrderedDict
+from rapidfuzz import process, fuzz
+
+DEFAULT_TTL_S      = 600
+VOLATILE_TTL_S     = 30        # "what time is it", "weather today", …
+MAX_ENTRIES        = 512
+FUZZY_THRESHOLD    = 90
+
+FILLER_WORDS = {"please", "hey", "hi", "um", "uh", "so", "ok", "okay", "well", "just"}
+VOLATILE_WORDS = {"time", "today", "now", "tonight", "weather", "date", "tomorrow", "yesterday"}
+CONTEXT_WORDS  = {"he", "she", "him", "her", "they", "them", "that", "those", "this", "these", "again"}
+
+
+def normalise_text(text: str) -> str:
+    """lower-case, strip punctuation & filler words, collapse spaces"""
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+
+def context_digest(context_turns=(), summary: str | None = None) -> str:
+    """Stable digest of the conversation context sent with the prompt ("" when none)."""
+    if not context_turns and not summary:
+        return ""
+    blob = json.dumps([summary or "", [list(t) for t in context_turns]], ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(parsed) -> bool:
+    """Only plain chat replies with something to say may be cached."""
+    return (
+        isinstance(parsed, dict)
+        and parsed.get("intent") == "general_chat"
+        and not parsed.get("action")
+        and bool(parsed.get("response"))
+    )
+
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=DEFAULT_TTL_S,
+                 volatile_ttl=VOLATILE_TTL_S, fuzzy_threshold=FUZZY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.volatile_ttl = volatile_ttl
+        self.fuzzy_threshold = fuzzy_threshold
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, str]] = OrderedDict()  # → (expires_at, raw)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fuzzy_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ── keys ----------------------------------------------------------
+    @staticmethod
+    def make_key(user_text: str, topic: str | None = None,
+                 context: str = "") -> tuple[str, str, str] | None:
+        """
+        (topic, context digest, normalised text), or None when the utterance
+        leans on earlier turns ("send it to her") and a context-free answer
+        would be wrong.
+        """
+        text = normalise_text(user_text)
+        if not text or CONTEXT_WORDS & set(text.split()):
+            return None
+        return normalise_text(topic or ""), context, text
+
+    def _ttl_for(self, text: str) -> float:
+        return self.volatile_ttl if VOLATILE_WORDS & set(text.split()) else self.ttl
+
+    # ── lookup ----------------------------------------------------------
+    def get(self, user_text: str, topic: str | None = None, context: str = "") -> str | None:
+        key = self.make_key(user_text, topic, context)
+        if key is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            hit = self._lookup(key, now)
+            if hit is not None:
+                self.stats["hits"] += 1
+                return hit
+
+            # fuzzy: only among entries of the same topic and context
+            candidates = [text for t, c, text in self._entries if (t, c) == key[:2]]
+            match = process.extractOne(
+                key[2], candidates, scorer=fuzz.token_sort_ratio, score_cutoff=self.fuzzy_threshold
+            ) if candidates else None
+            if match:
+                hit = self._lookup((*key[:2], match[0]), now)
+                if hit is not None:
+                    self.stats["fuzzy_hits"] += 1
+                    return hit
+
+            self.stats["misses"] += 1
+            return None
+
+    def _lookup(self, key: tuple[str, str, str], now: float) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, raw = entry
+        if expires_at < now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return raw
+
+    # ── store -----------------------------------------------------------
+    def put(self, user_text: str, llm_raw, parsed, topic: str | None = None, context: str = "") -> bool:
+        """Store `llm_raw` if `parsed` is a plain chat reply. Returns True when stored."""
+        if not is_cacheable(parsed):
+            return False
+        key = self.make_key(user_text, topic, context)
+        if key is None:
+            return False
+        raw = llm_raw if isinstance(llm_raw, str) else json.dumps(llm_raw)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_for(key[2]), raw)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_rate(self) -> float:
+        hits = self.stats["hits"] + self.stats["fuzzy_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache shared by all sessions
+response_cache = ResponseCache()
@@ -0,0 +1,160 @@
+"""
+llm/structured_output.py
+─────────────────────────────────────────────────────────────────────
+Keeps the LLM reply parseable:
+
+• RESPONSE_SCHEMA + `structured_params()` – request schema-constrained
+  decoding from the server (LLM_STRUCTURED_OUTPUT):
+      json_schema  → OpenAI-style response_format (vLLM ≥ 0.6, llama.cpp, OpenAI)
+      guided_json  → vLLM extra parameter
+      json_object  → plain JSON mode
+      off          → nothing; rely on the repair parser
+  An endpoint that rejects these fields is switched to plain decoding by
+  llm/llm_client, so the default is safe on servers without support
+• `token_budget(intent)` – max_tokens sized to the expected reply
+• `parse_llm_json(raw)`   – tolerant parser that repairs fences, trailing
+  commas and truncated objects; counters in PARSE_STATS
+"""
+
+from __future__ import annotations
+import json, os, re
+from dotenv import load_dotenv
+
+load_dotenv()
+STRUCTURED_MODE = os.getenv("LLM_STRUCTURED_OUTPUT", "json_schema").lower()
+
+INTENTS = ["send_email", "create_event", "send_sms", "general_chat"]
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "response": {"type": "string"},
+        "intent": {"type": "string", "enum": INTENTS},
+        "action": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": INTENTS[:-1]},
+                "parameters": {"type": "object"},
+            },
+            "required": ["type", "parameters"],
+        },
+    },
+    "required": ["response", "intent"],
+}
+
+# JSON wrapper + spoken reply; action turns are short, chat answers longer.
+INTENT_TOKEN_BUDGET = {
+    "send_email": 96,
+    "send_sms": 96,
+    "create_event": 128,
+    "general_chat": 192,
+}
+DEFAULT_TOKEN_BUDGET = 192
+
+PARSE_STATS = {"ok": 0, "repaired": 0, "failed": 0}
+
+
+def structured_params(mode: str = STRUCTURED_MODE) -> dict:
+    """Extra /chat/completions fields that constrain decoding to RESPONSE_SCHEMA."""
+    if mode == "json_schema":
+        return {"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "voice_reply", "schema": RESPONSE_SCHEMA},
+        }}
+    if mode == "guided_json":
+        return {"guided_json": RESPONSE_SCHEMA}
+    if mode == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+def token_budget(intent: str | None) -> int:
+    return INTENT_TOKEN_BUDGET.get(intent, DEFAULT_TOKEN_BUDGET)
+
+
+# ── repair parser ─────────────────────────────────────────────────────
+_FENCE_RE          = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_RESPONSE_RE       = re.compile(r'"response"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open brackets (max_tokens cut-off)."""
+    stack, in_str, escape = [], False, False
+    for ch in text:
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if escape:
+        text = text[:-1]
+    if in_str:
+        text += '"'
+    text = re.sub(r'[,:]\s*$', "", text.rstrip())        # dangling separator
+    text = re.sub(r',\s*"[^"]*"\s*$', "", text)          # dangling key without value
+    return text + "".join(reversed(stack))
+
+
+def _repair(text: str) -> dict | None:
+    text = _FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start < 0:
+        return None
+    body = text[start:]
+    end = body.rfind("}")
+    for candidate in (body[:end + 1] if end >= 0 else None, _close_truncated(body)):
+        if not candidate:
+            continue
+        try:
+            parsed = json.loads(_TRAILING_COMMA_RE.sub(r"\1", candidate))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+
+def parse_llm_json(llm_raw) -> dict:
+    """
+    str | dict → dict with at least "response" and "intent".
+    Never raises; unparseable text becomes {"response": text, "intent": "unknown"}.
+    """
+    if isinstance(llm_raw, dict):
+        PARSE_STATS["ok"] += 1
+        return llm_raw
+    text = str(llm_raw or "")
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            PARSE_STATS["ok"] += 1
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
+    parsed = _repair(text)
+    if parsed is not None:
+        PARSE_STATS["repaired"] += 1
+        print(f"[LLM] Repaired malformed JSON reply (stats: {PARSE_STATS})")
+        if parsed.get("intent") not in INTENTS:               # e.g. cut off mid-word
+            parsed["intent"] = "unknown"
+        return parsed
+
+    PARSE_STATS["failed"] += 1
+    print(f"[LLM] Could not parse JSON reply (stats: {PARSE_STATS})")
+    m = _RESPONSE_RE.search(text)
+    response = text
+    if m:
+        try:
+            response = json.loads(f'"{m.group(1)}"')
+        except json.JSONDecodeError:
+            response = m.group(1)
+    return {"response": response, "intent": "unknown"}
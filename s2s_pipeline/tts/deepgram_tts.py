@@ -1,7 +1,11 @@
 import os
 import requests
 
-def text_to_speech(text, output_audio_path='output_audio.mp3', model="aura-2-thalia-en"):
+def text_to_speech(text, output_audio_path='output_audio.mp3', model="aura-2-thalia-en", timeout=10.0):
+    """
+    `timeout` (seconds) applies to each socket operation – connecting, and
+    every wait for data – not to the request as a whole; None waits forever.
+    """
     api_key = os.getenv("DEEPGRAM_API_KEY")
     if not api_key:
         raise ValueError("DEEPGRAM_API_KEY is not set in environment.")
@@ -15,7 +19,7 @@ def text_to_speech(text, output_audio_path='output_audio.mp3', model="aura-2-tha
 
     try:
         print(f"[TTS] Synthesizing with Deepgram model: {model}")
-        response = requests.post(url, headers=headers, data=text.encode("utf-8"))
+        response = requests.post(url, headers=headers, data=text.encode("utf-8"), timeout=timeout)
         response.raise_for_status()
 
         with open(output_audio_path, "wb") as f:
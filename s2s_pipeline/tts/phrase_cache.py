@@ -0,0 +1,57 @@
+"""
+tts/phrase_cache.py
+─────────────────────────────────────────────────────────────────────
+Disk cache for short, fixed phrases (acknowledgements, prompts) so they can
+be played the instant they are needed instead of waiting on a TTS request.
+
+• one file per (model, text) under TTS_CACHE_DIR, written atomically
+• `warm(phrases)` synthesises a list in the background at start-up
+"""
+
+from __future__ import annotations
+import hashlib, os, threading
+from typing import Iterable
+
+from s2s_pipeline.tts.deepgram_tts import text_to_speech
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+DEFAULT_MODEL = "aura-2-thalia-en"
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def phrase_path(text: str, model: str = DEFAULT_MODEL) -> str:
+    digest = hashlib.sha1(f"{model}\n{text}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(TTS_CACHE_DIR, f"{digest}.mp3")
+
+
+def cached_speech(text: str, model: str = DEFAULT_MODEL, timeout: float | None = 10.0) -> str | None:
+    """Path of the synthesised phrase, calling TTS only on the first use."""
+    path = phrase_path(text, model)
+    if os.path.exists(path):
+        return path
+    with _locks_guard:
+        lock = _locks.setdefault(path, threading.Lock())
+    with lock:                                  # one request per phrase, even when raced
+        if os.path.exists(path):
+            return path
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if text_to_speech(text, tmp, model=model, timeout=timeout) is None:
+            return None
+        os.replace(tmp, path)
+        return path
+
+
+def warm(phrases: Iterable[str], model: str = DEFAULT_MODEL) -> threading.Thread:
+    """Synthesise any missing phrases on a daemon thread."""
+    def run():
+        for text in phrases:
+            try:
+                cached_speech(text, model)
+            except Exception as e:              # missing key / offline: cache stays cold
+                print(f"[TTS] Could not pre-synthesise {text!r}: {e}")
+    thread = threading.Thread(target=run, name="tts-warm", daemon=True)
+    thread.start()
+    return thread
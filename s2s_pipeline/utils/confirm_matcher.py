@@ -3,41 +3,23 @@ confirm_matcher.py
 ─────────────────────────────────────────────────────────
 Utility functions to robustly detect affirmative / negative
 user responses regardless of punctuation or extra words.
+Thin wrappers over the compiled PhraseMatcher: all four checks on the same
+utterance share one scoring pass.
 Requires   rapidfuzz >= 3.6
 """
 
-import re
-from rapidfuzz import fuzz
-
-YES_PHRASES = [
-    "yes", "yeah", "yep", "sure", "correct", "right",
-    "absolutely", "affirmative", "please do", "go ahead"
-]
-NO_PHRASES = [
-    "no", "nope", "negative", "wrong", "cancel",
-    "never mind", "stop", "dont"
-]
-
-def _clean(text: str) -> str:
-    """lower-case, strip punctuation & extra spaces"""
-    return re.sub(r"[^\w\s]", "", text.lower()).strip()
+from s2s_pipeline.utils.phrase_matcher import (  # noqa: F401 (phrase lists re-exported)
+    default_matcher, YES_PHRASES, NO_PHRASES, CANCEL_PHRASES, FILLER_PHRASES,
+)
 
 def is_affirmative(text: str, threshold: int = 85) -> bool:
-    txt = _clean(text)
-    return any(fuzz.partial_ratio(txt, y) >= threshold for y in YES_PHRASES)
+    return default_matcher.scores(text)["affirmative"] >= threshold
 
 def is_negative(text: str, threshold: int = 85) -> bool:
-    txt = _clean(text)
-    return any(fuzz.partial_ratio(txt, n) >= threshold for n in NO_PHRASES)
-
-# add at bottom of s2s_pipeline/utils/confirm_matcher.py
-CANCEL_PHRASES = ["cancel", "stop", "never mind", "abort", "forget it"]
-FILLER_PHRASES  = ["yes", "yeah", "sure", "okay", "ok", "right"]
+    return default_matcher.scores(text)["negative"] >= threshold
 
 def is_cancel(text: str, threshold: int = 85) -> bool:
-    txt = _clean(text)
-    return any(fuzz.partial_ratio(txt, c) >= threshold for c in CANCEL_PHRASES)
+    return default_matcher.scores(text)["cancel"] >= threshold
 
 def looks_like_filler(text: str, threshold: int = 90) -> bool:
-    txt = _clean(text)
-    return any(fuzz.partial_ratio(txt, f) >= threshold for f in FILLER_PHRASES)
+    return default_matcher.scores(text)["filler"] >= threshold
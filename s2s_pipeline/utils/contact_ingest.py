@@ -0,0 +1,146 @@
+"""
+contact_ingest.py
+─────────────────────────────────────────────────────────
+Streaming import of address-book exports into the compiled contact store.
+
+• `iter_csv` / `iter_vcard` yield (name, email) one row / card at a time
+  (Google-style CSV columns; vCard 2.1 / 3.0 / 4.0 with folded lines)
+• names are normalised with contact_store.normalize_name (the key format
+  resolve_email looks up), e-mails lower-cased and validated; rows without
+  a valid address are skipped and the first address seen for a name wins
+• `sync_store()` diffs an export against the existing store and appends only
+  the changed / removed entries to its delta log, compacting when the log
+  grows past COMPACT_RATIO of the base file
+
+    python -m s2s_pipeline.utils.contact_ingest export.csv [more.vcf …]
+           --store personaldata/contacts.s2sc [--full] [--keep-missing]
+"""
+
+from __future__ import annotations
+import csv, os, re
+from typing import Iterable, Iterator
+from s2s_pipeline.utils.contact_store import (  # noqa: F401 (normalize_name re-exported)
+    ContactStore, append_delta, compact, delta_path, needs_compaction, normalize_name, write_store,
+)
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def normalize_email(email: str) -> str | None:
+    email = email.strip().strip("<>").lower()
+    if email.startswith("mailto:"):
+        email = email[7:]
+    return email if _EMAIL_RE.match(email) else None
+
+
+# ── readers ──────────────────────────────────────────────────────────
+def iter_csv(path: str) -> Iterator[tuple[str, str]]:
+    """Google Contacts CSV → (raw name, raw email), one row at a time."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            name = row.get("Name") or " ".join(
+                filter(None, (row.get(k, "").strip() for k in ("First Name", "Middle Name", "Last Name"))))
+            email = row.get("E-mail 1 - Value", "")
+            # "a@x.com ::: b@y.com" → first address
+            yield name, email.split(":::")[0]
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """RFC 6350 line unfolding: continuation lines start with a space / tab."""
+    held = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and held is not None:
+            held += line[1:]
+            continue
+        if held is not None:
+            yield held
+        held = line
+    if held is not None:
+        yield held
+
+
+def iter_vcard(path: str) -> Iterator[tuple[str, str]]:
+    """vCard file → (raw name, raw email) for the first EMAIL of each card."""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        fn = n = email = None
+        for line in _unfold(f):
+            key, _, value = line.partition(":")
+            prop = key.split(";")[0].split(".")[-1].upper()   # strip params and "item1." groups
+            if prop == "BEGIN":
+                fn = n = email = None
+            elif prop == "FN":
+                fn = value
+            elif prop == "N":
+                last, first, middle, *_ = (value.split(";") + ["", "", ""])[:3]
+                n = " ".join(filter(None, (first, middle, last)))
+            elif prop == "EMAIL" and email is None:
+                email = value
+            elif prop == "END":
+                if email:
+                    yield (fn or n or ""), email
+                fn = n = email = None
+
+
+def iter_contacts(paths: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Normalised, de-duplicated (name, email) pairs across several exports."""
+    seen = set()
+    for path in paths:
+        reader = iter_vcard if path.lower().endswith((".vcf", ".vcard")) else iter_csv
+        for raw_name, raw_email in reader(path):
+            name, email = normalize_name(raw_name or ""), normalize_email(raw_email or "")
+            if name and email and name not in seen:
+                seen.add(name)
+                yield name, email
+
+
+# ── store sync ───────────────────────────────────────────────────────
+def sync_store(store_path: str, sources: Iterable[str], full: bool = False,
+               remove_missing: bool = True) -> dict[str, int]:
+    """
+    Bring the compiled store in line with `sources`.
+    Default: append only the differences to the delta log.  `full=True` or a
+    missing store rewrites the base file instead.
+    """
+    if full or not os.path.exists(store_path):
+        count = write_store(store_path, iter_contacts(sources))
+        try:
+            os.remove(delta_path(store_path))
+        except FileNotFoundError:
+            pass
+        return {"contacts": count, "upserts": count, "deletes": 0, "compacted": 0}
+
+    store = ContactStore.open(store_path)
+    try:
+        current = store.as_dict()
+    finally:
+        store.close()
+    upserts = {}
+    for name, email in iter_contacts(sources):
+        if current.pop(name, None) != email:
+            upserts[name] = email
+    deletes = list(current) if remove_missing else []     # whatever the export no longer has
+
+    append_delta(store_path, upserts, deletes)
+    stats = {"upserts": len(upserts), "deletes": len(deletes), "compacted": 0}
+    if needs_compaction(store_path):
+        stats["contacts"] = compact(store_path)
+        stats["compacted"] = 1
+    else:
+        store = ContactStore.open(store_path)
+        stats["contacts"] = len(store)
+        store.close()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Import CSV / vCard exports into the contact store.")
+    parser.add_argument("sources", nargs="+", help="CSV or .vcf files")
+    parser.add_argument("--store", default="contacts.s2sc")
+    parser.add_argument("--full", action="store_true", help="rewrite the base file")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="don't delete contacts absent from the export")
+    args = parser.parse_args()
+    stats = sync_store(args.store, args.sources, full=args.full, remove_missing=not args.keep_missing)
+    print(f"✅ {args.store}: {stats}")
@@ -0,0 +1,241 @@
+"""
+contact_store.py
+─────────────────────────────────────────────────────────
+Compiled, memory-mapped contact store + append-only delta log.
+
+On-disk layout of  contacts.s2sc  (little-endian):
+    header      : b"S2SC" | u32 version | u32 count | 4 × u64 section offsets
+    name table  : (count + 1) × u32 start offsets into the names section
+    email table : (count + 1) × u32 start offsets into the e-mails section
+    names       : UTF-8, newline-terminated, sorted
+    e-mails     : UTF-8, newline-terminated, same order as the names
+
+`ContactStore.open()` only maps the file and reads the header, so it takes
+about the same time for 100 or 100k contacts; exact lookups binary-search the
+mapped names, and the whole name list decodes with a single split.
+
+Changes go to  contacts.s2sc.delta  (JSON lines of upserts / deletes) and are
+overlaid at open; `compact()` folds the log into a new base file with an
+atomic rename.
+
+Names are keyed by `normalize_name` – the same normaliser resolve_email
+applies to spoken names, so "O'Brien" is stored and looked up as "o brien".
+"""
+
+from __future__ import annotations
+import json, mmap, os, re, struct, tempfile
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+import numpy as np
+
+MAGIC = b"S2SC"
+VERSION = 1
+_HEADER = struct.Struct("<4sIIQQQQ")
+DELTA_SUFFIX = ".delta"
+COMPACT_RATIO = 0.10            # compact once the delta log is 10 % of the base
+
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def normalize_name(name: str) -> str:
+    """lower-case words (accents kept), punctuation and apostrophes → single spaces"""
+    return " ".join(w for w in _NON_WORD.split(name.lower()) if w)
+
+
+def delta_path(path: str) -> str:
+    return path + DELTA_SUFFIX
+
+
+def _offsets(items: list[bytes]) -> np.ndarray:
+    out = np.zeros(len(items) + 1, dtype="<u4")
+    np.cumsum([len(b) + 1 for b in items], out=out[1:])
+    return out
+
+
+def write_store(path: str, contacts: Iterable[tuple[str, str]]) -> int:
+    """Write (name, email) pairs as a compiled store (atomic replace). Returns count."""
+    records = sorted(dict(contacts).items())
+    names = [n.encode("utf-8") for n, _ in records]
+    emails = [e.encode("utf-8") for _, e in records]
+    name_table, email_table = _offsets(names), _offsets(emails)
+    names_blob = b"\n".join(names) + b"\n" if names else b""
+    emails_blob = b"\n".join(emails) + b"\n" if emails else b""
+
+    name_table_off = _HEADER.size
+    email_table_off = name_table_off + name_table.nbytes
+    names_off = email_table_off + email_table.nbytes
+    emails_off = names_off + len(names_blob)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(records),
+                             name_table_off, email_table_off, names_off, emails_off))
+        f.write(name_table.tobytes())
+        f.write(email_table.tobytes())
+        f.write(names_blob)
+        f.write(emails_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(records)
+
+
+class ContactStore(Mapping):
+    """Read-only name → e-mail mapping over a compiled store (+ delta overlay)."""
+
+    def __init__(self, buf=b"", upserts: dict[str, str] | None = None,
+                 deletes: set[str] | None = None):
+        self._buf = buf
+        self._upserts = upserts or {}
+        self._deletes = deletes or set()
+        if buf:
+            magic, version, count, nt, et, no, eo = _HEADER.unpack_from(buf, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a compiled contact store (v{VERSION})")
+            # zero-copy views over the mapped offset tables
+            self._name_at = np.frombuffer(buf, dtype="<u4", count=count + 1, offset=nt)
+            self._email_at = np.frombuffer(buf, dtype="<u4", count=count + 1, offset=et)
+            self._names_off, self._emails_off = no, eo
+            self._count = count
+        else:
+            self._count = 0
+        self._base_len = None
+
+    @classmethod
+    def open(cls, path: str) -> "ContactStore":
+        upserts, deletes = read_delta(delta_path(path))
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return cls(b"", upserts, deletes)
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, upserts, deletes)
+
+    # ── base records ──────────────────────────────────────────────────
+    def _name(self, i: int) -> str:
+        a, b = self._names_off + int(self._name_at[i]), self._names_off + int(self._name_at[i + 1]) - 1
+        return self._buf[a:b].decode("utf-8")
+
+    def _email(self, i: int) -> str:
+        a, b = self._emails_off + int(self._email_at[i]), self._emails_off + int(self._email_at[i + 1]) - 1
+        return self._buf[a:b].decode("utf-8")
+
+    def _find(self, name: str) -> int | None:
+        lo, hi = 0, self._count
+        while lo < hi:                                  # bisect on the mapped, sorted names
+            mid = (lo + hi) // 2
+            if self._name(mid) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._name(lo) == name else None
+
+    def base_names(self) -> list[str]:
+        """Every name in the base file, decoded in one pass (sorted)."""
+        if not self._count:
+            return []
+        end = self._names_off + int(self._name_at[-1]) - 1
+        return self._buf[self._names_off:end].decode("utf-8").split("\n")
+
+    def as_dict(self) -> dict[str, str]:
+        """Whole store (delta applied) as a dict, decoded in bulk."""
+        out = {}
+        if self._count:
+            end = self._emails_off + int(self._email_at[-1]) - 1
+            emails = self._buf[self._emails_off:end].decode("utf-8").split("\n")
+            out = dict(zip(self.base_names(), emails))
+        for name in self._deletes:
+            out.pop(name, None)
+        out.update(self._upserts)
+        return out
+
+    # ── Mapping API ───────────────────────────────────────────────────
+    def __getitem__(self, name: str) -> str:
+        if name in self._upserts:
+            return self._upserts[name]
+        if name not in self._deletes:
+            i = self._find(name)
+            if i is not None:
+                return self._email(i)
+        raise KeyError(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._upserts or (name not in self._deletes and self._find(name) is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._deletes and not self._upserts:
+            yield from self.base_names()
+            return
+        for name in self.base_names():
+            if name not in self._deletes and name not in self._upserts:
+                yield name
+        yield from self._upserts
+
+    def __len__(self) -> int:
+        if self._base_len is None:
+            shadowed = sum(1 for n in self._deletes | set(self._upserts) if self._find(n) is not None)
+            self._base_len = self._count - shadowed
+        return self._base_len + len(self._upserts)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            for attr in ("_name_at", "_email_at"):     # release the buffer exports first
+                self.__dict__.pop(attr, None)
+            self._buf.close()
+
+
+# ── delta log ─────────────────────────────────────────────────────────
+def read_delta(path: str) -> tuple[dict[str, str], set[str]]:
+    """Replay the delta log → (upserts, deletes); later lines win."""
+    upserts, deletes = {}, set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                op = json.loads(line)
+                if op["op"] == "upsert":
+                    upserts[op["name"]] = op["email"]
+                    deletes.discard(op["name"])
+                elif op["op"] == "delete":
+                    upserts.pop(op["name"], None)
+                    deletes.add(op["name"])
+    except FileNotFoundError:
+        pass
+    return upserts, deletes
+
+
+def append_delta(path: str, upserts: dict[str, str] = None, deletes: Iterable[str] = ()) -> int:
+    """Append changes to the store's delta log. Returns the number of ops written."""
+    lines = [json.dumps({"op": "upsert", "name": n, "email": e}) for n, e in (upserts or {}).items()]
+    lines += [json.dumps({"op": "delete", "name": n}) for n in deletes]
+    if lines:
+        with open(delta_path(path), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    return len(lines)
+
+
+def compact(path: str) -> int:
+    """Fold the delta log into a fresh base file. Returns the new contact count."""
+    store = ContactStore.open(path)
+    try:
+        count = write_store(path, store.as_dict().items())
+    finally:
+        store.close()
+    try:
+        os.remove(delta_path(path))
+    except FileNotFoundError:
+        pass
+    return count
+
+
+def needs_compaction(path: str) -> bool:
+    try:
+        delta = os.path.getsize(delta_path(path))
+    except FileNotFoundError:
+        return False
+    base = os.path.getsize(path) if os.path.exists(path) else 0
+    return delta > COMPACT_RATIO * max(base, 1)
@@ -1,15 +1,20 @@
-import csv
-import json
-'''
+r'''
 python s2s_pipeline\utils\contact_to_json.py .\personaldata\contacts.csv .\personaldata\contacts.json
+
+Same output as before the compiled store existed: First/Middle/Last Name
+columns, the last row wins for a repeated name, e-mails are not validated.
+Rows are read one at a time; for large directories prefer the compiled
+store:  python -m s2s_pipeline.utils.contact_ingest
 '''
+import csv
+import json
+import sys
+
 
 def convert_csv_to_json(csv_path, json_path="contacts.json"):
+    contacts = {}
     with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        contacts = {}
-
-        for row in reader:
+        for row in csv.DictReader(csvfile):
             first = row.get("First Name", "").strip()
             middle = row.get("Middle Name", "").strip()
             last = row.get("Last Name", "").strip()
@@ -20,16 +25,15 @@ def convert_csv_to_json(csv_path, json_path="contacts.json"):
             if full_name and email:
                 contacts[full_name] = email
 
-        with open(json_path, "w", encoding="utf-8") as jsonfile:
-            json.dump(contacts, jsonfile, indent=2)
+    with open(json_path, "w", encoding="utf-8") as jsonfile:
+        json.dump(contacts, jsonfile, indent=2)
 
     print(f"✅ Converted {csv_path} → {json_path}")
 
 # Optional CLI usage
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) < 2:
-        print("Usage: python csv_to_contacts_json.py path/to/contacts.csv [output.json]")
+        print("Usage: python contact_to_json.py path/to/contacts.csv [output.json]")
     else:
         input_csv = sys.argv[1]
         output_json = sys.argv[2] if len(sys.argv) > 2 else "contacts.json"
@@ -0,0 +1,137 @@
+"""
+latency_budget.py
+─────────────────────────────────────────────────────────
+Per-turn deadline shared by every pipeline stage.
+
+A `TurnBudget` is created when a turn starts (or earlier, by the caller,
+so queueing time counts) and handed to ASR, LLM, actions and TTS:
+
+  • `timeout_for(stage)`   – the stage's cap, cut down to what is left after
+                             keeping the minimum the later stages need
+  • `stage(name)`          – context manager timing a stage; overruns of its
+                             allotment are counted in BUDGET_METRICS
+  • `behind(stage)`        – the stage gets under half its usual cap (time to
+                             say "one moment")
+  • `llm_max_tokens(n)`    – shorter completions once the budget is tight
+  • `skip_optional(stage)` – drop nice-to-have stages when time is short
+  • `degrade(how)`         – record which fallback a stage took (cached
+                             phrase, short reply, skipped stage …)
+
+Budget and caps come from TURN_BUDGET_S and STAGE_CAPS_S; metrics are plain
+counters so they can be printed or scraped as-is.
+"""
+
+from __future__ import annotations
+import os, threading, time
+from contextlib import contextmanager
+
+from s2s_pipeline.utils.profiler import mark_stage
+
+TURN_BUDGET_S = float(os.getenv("TURN_BUDGET_S", 8.0))
+
+# longest any single stage may take, even with budget to spare
+STAGE_CAPS_S = {"asr": 4.0, "llm": 6.0, "action": 4.0, "tts": 4.0}
+# time a stage needs to be worth starting; also what earlier stages leave for it
+STAGE_MIN_S  = {"asr": 0.5, "llm": 1.0, "action": 0.3, "tts": 0.6}
+STAGE_ORDER  = ("asr", "llm", "action", "tts")
+
+OPTIONAL_MIN_S    = 3.0     # below this remaining, optional stages are skipped
+SHORT_REPLY_S     = 2.5     # below this remaining for the LLM, cap completions…
+SHORT_MAX_TOKENS  = 64      # …at this many tokens
+
+BUDGET_METRICS = {
+    "turns": 0,
+    "over_budget": 0,         # turns that finished after their deadline
+    "overruns": {},           # stage → times it exceeded its allotment
+    "degraded": {},           # fallback → times taken
+    "stage_ms": {},           # stage → cumulative wall time (ms)
+}
+_metrics_lock = threading.Lock()
+
+
+def _bump(bucket: str, key: str, by: float = 1):
+    with _metrics_lock:
+        BUDGET_METRICS[bucket][key] = BUDGET_METRICS[bucket].get(key, 0) + by
+
+
+class TurnBudget:
+    def __init__(self, total_s: float = TURN_BUDGET_S, clock=time.monotonic):
+        self.total_s = total_s
+        self.clock = clock
+        self.started = clock()
+        self.deadline = self.started + total_s
+        self.timings: dict[str, float] = {}
+        self.degraded: list[str] = []
+        self._allotted: dict[str, float] = {}
+        self._finished = False
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.clock())
+
+    def timeout_for(self, stage: str, cap: float | None = None) -> float:
+        """Seconds `stage` may take: min(cap, remaining − what later stages need)."""
+        later = STAGE_ORDER[STAGE_ORDER.index(stage) + 1:] if stage in STAGE_ORDER else ()
+        reserve = sum(STAGE_MIN_S[s] for s in later)
+        cap = STAGE_CAPS_S.get(stage, self.total_s) if cap is None else cap
+        allotted = max(STAGE_MIN_S.get(stage, 0.1), min(cap, self.remaining() - reserve))
+        self._allotted[stage] = allotted
+        return allotted
+
+    def behind(self, stage: str) -> bool:
+        """True when `stage` gets less than half its usual cap."""
+        return self.timeout_for(stage) < STAGE_CAPS_S.get(stage, self.total_s) / 2
+
+    @contextmanager
+    def stage(self, name: str):
+        start = self.clock()
+        try:
+            with mark_stage(name):          # sampling profiler attribution
+                yield self
+        finally:
+            self.record(name, self.clock() - start)
+
+    def record(self, name: str, took: float):
+        """Account `took` seconds to stage `name` (what `stage()` does on exit)."""
+        self.timings[name] = self.timings.get(name, 0.0) + took
+        _bump("stage_ms", name, took * 1e3)
+        allotted = self._allotted.get(name)
+        if allotted is not None and took > allotted:
+            _bump("overruns", name)
+            print(f"[Budget] {name} overran its {allotted:.2f}s allotment ({took:.2f}s)")
+
+    def llm_max_tokens(self, requested: int) -> int:
+        if self.remaining() < SHORT_REPLY_S and requested > SHORT_MAX_TOKENS:
+            self.degrade("short_reply")
+            return SHORT_MAX_TOKENS
+        return requested
+
+    def skip_optional(self, stage: str) -> bool:
+        if self.remaining() < OPTIONAL_MIN_S:
+            self.degrade(f"skip_{stage}")
+            return True
+        return False
+
+    def degrade(self, how: str):
+        self.degraded.append(how)
+        _bump("degraded", how)
+        print(f"[Budget] Degraded: {how} ({self.remaining():.2f}s left)")
+
+    def finish(self) -> float:
+        """Close the turn; returns elapsed seconds. Idempotent."""
+        elapsed = self.elapsed()
+        if not self._finished:
+            self._finished = True
+            with _metrics_lock:
+                BUDGET_METRICS["turns"] += 1
+                BUDGET_METRICS["over_budget"] += elapsed > self.total_s
+            stages = ", ".join(f"{k}={v:.2f}" for k, v in self.timings.items())
+            print(f"[Budget] Turn {elapsed:.2f}s of {self.total_s:.1f}s ({stages})")
+        return elapsed
+
+
+def budget_miss_rate() -> float:
+    turns = BUDGET_METRICS["turns"]
+    return BUDGET_METRICS["over_budget"] / turns if turns else 0.0
@@ -0,0 +1,104 @@
+"""
+phrase_matcher.py
+─────────────────────────────────────────────────────────
+All the "does the user sound like X?" checks in one place.
+
+Every phrase set is compiled once at start-up:
+  • fuzzy categories (yes / no / cancel / filler) are concatenated into one
+    phrase array and scored with a single RapidFuzz `cdist` call, then reduced
+    per category with NumPy
+  • substring categories (music keywords, clarification phrases) are compiled
+    into one regex alternation each
+
+`match_phrases(text)` returns every category decision for an utterance at
+once; results for recent utterances are memoised, so the per-category
+helpers in confirm_matcher reuse the same pass.
+Requires   rapidfuzz >= 3.6, numpy
+"""
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+import numpy as np
+from rapidfuzz import fuzz, process
+
+YES_PHRASES = [
+    "yes", "yeah", "yep", "sure", "correct", "right",
+    "absolutely", "affirmative", "please do", "go ahead"
+]
+NO_PHRASES = [
+    "no", "nope", "negative", "wrong", "cancel",
+    "never mind", "stop", "dont"
+]
+CANCEL_PHRASES = ["cancel", "stop", "never mind", "abort", "forget it"]
+FILLER_PHRASES = ["yes", "yeah", "sure", "okay", "ok", "right"]
+
+MUSIC_KEYWORDS = ("music", "song", "playlist", "listen", "podcast",
+                  "spotify", "tune", "radio")
+CLARIFICATION_PHRASES = [
+    "i'm not sure", "can you repeat", "i didn’t understand",
+    "could you clarify", "i don't understand", "what do you mean", "can you rephrase"
+]
+
+# name → (phrases, threshold)   scored with partial_ratio on cleaned text
+FUZZY_CATEGORIES = {
+    "affirmative": (YES_PHRASES, 85),
+    "negative":    (NO_PHRASES, 85),
+    "cancel":      (CANCEL_PHRASES, 85),
+    "filler":      (FILLER_PHRASES, 90),
+}
+# name → phrases                matched as substrings of the lower-cased text
+SUBSTRING_CATEGORIES = {
+    "music":         MUSIC_KEYWORDS,
+    "clarification": CLARIFICATION_PHRASES,
+}
+
+
+def _clean(text: str) -> str:
+    """lower-case, strip punctuation & extra spaces"""
+    return re.sub(r"[^\w\s]", "", text.lower()).strip()
+
+
+class PhraseMatcher:
+    def __init__(self, fuzzy=FUZZY_CATEGORIES, substring=SUBSTRING_CATEGORIES, cache_size=128):
+        self.fuzzy_names = list(fuzzy)
+        phrases, starts = [], []
+        for name in self.fuzzy_names:
+            starts.append(len(phrases))
+            phrases.extend(fuzzy[name][0])
+        self._phrases = phrases
+        self._starts = np.array(starts, dtype=np.intp)
+        self.thresholds = {name: fuzzy[name][1] for name in self.fuzzy_names}
+        self._patterns = {
+            name: re.compile("|".join(re.escape(p.lower()) for p in words))
+            for name, words in substring.items()
+        }
+        self.scores = lru_cache(maxsize=cache_size)(self._scores)
+
+    def _scores(self, text: str) -> dict[str, float]:
+        """
+        Best partial_ratio per fuzzy category, from one vectorised pass.
+        Scores are exact (no cutoff), so callers may apply any threshold.
+        """
+        txt = _clean(text)
+        row = process.cdist([txt], self._phrases, scorer=fuzz.partial_ratio, dtype=np.float32)[0]
+        best = np.maximum.reduceat(row, self._starts)
+        return dict(zip(self.fuzzy_names, best.tolist()))
+
+    def contains(self, text: str, category: str) -> bool:
+        return self._patterns[category].search(text.lower()) is not None
+
+    def match(self, text: str) -> dict[str, bool]:
+        """Decision for every category: {"affirmative": bool, …, "music": bool, …}."""
+        decisions = {name: score >= self.thresholds[name] for name, score in self.scores(text).items()}
+        lowered = text.lower()
+        for name, pattern in self._patterns.items():
+            decisions[name] = pattern.search(lowered) is not None
+        return decisions
+
+
+default_matcher = PhraseMatcher()
+
+
+def match_phrases(text: str) -> dict[str, bool]:
+    return default_matcher.match(text)
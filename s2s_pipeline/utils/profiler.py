@@ -0,0 +1,194 @@
+"""
+profiler.py
+─────────────────────────────────────────────────────────
+Low-overhead sampling profiler for the turn loop.
+
+• a daemon thread snapshots every thread's stack (`sys._current_frames`)
+  each `interval_s`; nothing is instrumented, so the cost is one stack walk
+  per thread per sample – at 20–50 ms intervals it can stay on in production
+• samples are tagged with the pipeline stage running at the time
+  (`mark_stage`, entered by TurnBudget.stage and the CLI), so the flamegraph's
+  first level is  record / asr / llm / action / tts / …; helper threads (LLM
+  event loop, executors) get the most recently entered stage
+• every `every` turns it writes  <out_dir>/profile-<pid>-NNNN-turnT.folded  (collapsed
+  stacks: flamegraph.pl, speedscope, inferno) and prints a top-N summary of
+  self time per function and samples per stage
+• idle threads (blocked in wait / select / queue.get) are dropped unless
+  `include_idle=True`
+
+    S2S_PROFILE=1  S2S_PROFILE_INTERVAL_MS=20  S2S_PROFILE_EVERY=10
+    python scripts/run_pipeline.py --profile [--profile-every N]
+"""
+
+from __future__ import annotations
+import os, sys, threading, time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_DIR = os.getenv("S2S_PROFILE_DIR", "profiles")
+
+# leaf frames that mean "this thread is parked, not burning CPU"
+IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"), ("queue.py", "get"), ("socket.py", "accept"),
+    ("base_events.py", "_run_once"), ("connection.py", "poll"),
+}
+
+_active: "SamplingProfiler | None" = None
+_thread_stages: dict[int, list[str]] = {}     # thread → stage stack
+_last_stage = ["other"]                         # for helper threads (LLM loop, executors)
+_stages_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+@contextmanager
+def mark_stage(name: str):
+    """Attribute samples taken inside the block to `name` (no-op when not profiling)."""
+    if _active is None:
+        yield
+        return
+    ident = threading.get_ident()
+    with _stages_lock:
+        _thread_stages.setdefault(ident, []).append(name)
+        _last_stage[0] = name
+    try:
+        yield
+    finally:
+        with _stages_lock:
+            stack = _thread_stages.get(ident, [])
+            if stack:
+                stack.pop()
+            if not stack:
+                _thread_stages.pop(ident, None)
+
+
+class SamplingProfiler:
+    def __init__(self, interval_s: float = 0.01, every: int = 1, top: int = 15,
+                 out_dir: str = PROFILE_DIR, include_idle: bool = False, max_depth: int = 64):
+        self.interval_s = interval_s
+        self.every = max(1, every)
+        self.top = top
+        self.out_dir = out_dir
+        self.include_idle = include_idle
+        self.max_depth = max_depth
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.turns = 0
+        self.reports = 0
+        self.sample_count = 0
+        self.sampling_s = 0.0              # time spent inside the sampler itself
+        self._window_start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── lifecycle ────────────────────────────────────────────────────
+    def start(self) -> "SamplingProfiler":
+        global _active
+        _active = self
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        print(f"[Profiler] Sampling every {self.interval_s * 1e3:.0f} ms, "
+              f"report every {self.every} turn(s) → {self.out_dir}/")
+        return self
+
+    def stop(self):
+        global _active
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        if _active is self:
+            _active = None
+        if self.samples:
+            self.dump()
+
+    # ── sampling ─────────────────────────────────────────────────────
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            t0 = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            with _stages_lock:
+                stages = {t: st[-1] for t, st in _thread_stages.items()}
+                fallback = _last_stage[0] if stages else "other"
+            batch = []
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if not self.include_idle and \
+                        (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                stage = stages.get(ident, fallback)
+                batch.append((f"stage:{stage}", f"thread:{names.get(ident, ident)}", *stack))
+            with self._lock:
+                self.samples.update(batch)
+                self.sample_count += 1
+                self.sampling_s += time.perf_counter() - t0
+
+    # ── turns & reports ──────────────────────────────────────────────
+    def end_turn(self):
+        """Call once per turn; writes a report every `every` turns."""
+        self.turns += 1
+        if self.turns % self.every == 0:
+            self.dump()
+
+    def dump(self) -> str | None:
+        with self._lock:
+            samples, self.samples = self.samples, Counter()
+            taken, self.sample_count = self.sample_count, 0
+            overhead, self.sampling_s = self.sampling_s, 0.0
+        window = time.perf_counter() - self._window_start
+        self._window_start = time.perf_counter()
+        if not samples:
+            return None
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.reports += 1
+        path = os.path.join(self.out_dir, f"profile-{os.getpid()}-{self.reports:04d}-turn{self.turns}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(";".join(s.replace(";", ",") for s in stack) + f" {count}\n")
+
+        by_stage, self_time = Counter(), Counter()
+        for stack, count in samples.items():
+            by_stage[stack[0][6:]] += count
+            self_time[stack[-1]] += count
+        total = sum(samples.values())
+        print(f"[Profiler] {taken} samples over {window:.1f}s "
+              f"(sampler overhead {overhead / max(window, 1e-9):.2%}) → {path}")
+        print("[Profiler] by stage: " + ", ".join(f"{s}={c / total:.0%}" for s, c in by_stage.most_common()))
+        for label, count in self_time.most_common(self.top):
+            print(f"[Profiler] {count / total:6.1%}  {label}")
+        return path
+
+
+def get_profiler() -> SamplingProfiler | None:
+    return _active
+
+
+@contextmanager
+def profiled_turn():
+    """Wrap one loop iteration; counts the turn for the active profiler."""
+    try:
+        yield
+    finally:
+        if _active is not None:
+            _active.end_turn()
+
+
+def start_from_env() -> SamplingProfiler | None:
+    """Start a profiler if S2S_PROFILE is set (for server entry points)."""
+    if os.getenv("S2S_PROFILE", "").lower() not in ("1", "true", "yes"):
+        return None
+    return SamplingProfiler(
+        interval_s=float(os.getenv("S2S_PROFILE_INTERVAL_MS", 20)) / 1e3,
+        every=int(os.getenv("S2S_PROFILE_EVERY", 10)),
+    ).start()
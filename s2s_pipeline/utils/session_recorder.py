@@ -0,0 +1,144 @@
+"""
+utils/session_recorder.py
+─────────────────────────────────────────────────────────────────────
+One structured JSON line per voice turn, so real sessions can be
+replayed later (scripts/replay_session.py) as a behaviour + latency
+regression suite.
+
+• <SESSION_RECORD_DIR>/<session>/session.jsonl holds, per turn:
+    audio          input clip, relative to the session directory when it
+                   was recorded there (`audio_path()`), else as given
+    transcript     + asr confidence (avg_logprob / no_speech_prob)
+    prompt         LLM messages – the static system prefix is stored once
+                   per session and referenced by hash
+    llm_raw, llm_cache_hit, intent, action, form (turn handled locally)
+    tts_text, timings (per stage + total, seconds), degraded
+  plus {"event": …} lines for free-form log messages (GUI status lines)
+• `record_turn()` / `event()` serialise the record (a snapshot – the
+  dialogue keeps mutating its action dicts) and queue the line; a daemon
+  thread appends, with the file opened once and flushed every FLUSH_S –
+  nothing on the turn path touches the disk
+• opt-in: recordings hold the user's voice and messages, so nothing is
+  kept unless SESSION_RECORD=1; SESSION_RECORD_DIR (default sessions)
+"""
+
+from __future__ import annotations
+import atexit, datetime, hashlib, json, os, queue, threading, time
+
+SESSION_RECORD     = os.getenv("SESSION_RECORD", "0") not in ("0", "false", "off", "")
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR", "sessions")
+FLUSH_S            = 1.0
+FORMAT_VERSION     = 1
+
+_STOP = object()
+
+
+def _jsonable(value):
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+class SessionRecorder:
+    def __init__(self, session_id: str | None = None, directory: str = SESSION_RECORD_DIR,
+                 flush_s: float = FLUSH_S, meta: dict | None = None):
+        self.session_id = session_id or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.dir = os.path.join(directory, self.session_id)
+        self.path = os.path.join(self.dir, "session.jsonl")
+        self.flush_s = flush_s
+        self.turns = 0
+        self.stats = {"records": 0, "bytes": 0, "flushes": 0, "dropped": 0}
+        self._prefixes: set[str] = set()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        os.makedirs(self.dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        self._put({"session": self.session_id, "version": FORMAT_VERSION,
+                   "started": time.time(), **(meta or {})})
+        atexit.register(self.close)
+
+    # ── producer side (turn thread) ──────────────────────────────────
+    def _put(self, record: dict):
+        if self._thread.is_alive():
+            self._queue.put(json.dumps(record, ensure_ascii=False, default=_jsonable) + "\n")
+        else:
+            self.stats["dropped"] += 1
+
+    def audio_path(self, suffix: str = ".wav") -> str:
+        """Where to record the next turn's input, so the clip is kept with the session."""
+        os.makedirs(os.path.join(self.dir, "audio"), exist_ok=True)
+        return os.path.join(self.dir, "audio", f"turn-{self.turns + 1:04d}{suffix}")
+
+    def event(self, status: str, message: str):
+        self._put({"t": time.time(), "event": status, "message": message})
+
+    def record_turn(self, audio_path, trace: dict, budget=None, total_s: float | None = None):
+        self.turns += 1
+        audio = os.path.abspath(str(audio_path)) if audio_path else None
+        if audio and audio.startswith(os.path.abspath(self.dir) + os.sep):
+            audio = os.path.relpath(audio, self.dir)
+        record = {"turn": self.turns, "t": time.time(), "audio": audio, **trace}
+        messages = trace.get("prompt")
+        if messages and messages[0].get("role") == "system":      # static prefix: store once
+            prefix = messages[0]["content"]
+            digest = hashlib.sha1(prefix.encode()).hexdigest()[:12]
+            if digest not in self._prefixes:
+                self._prefixes.add(digest)
+                self._put({"prefix": digest, "content": prefix})
+            record["prompt"] = [{"role": "system", "prefix": digest}, *messages[1:]]
+        if budget is not None:
+            record["timings"] = {k: round(v, 4) for k, v in budget.timings.items()}
+            record["degraded"] = list(budget.degraded)
+        if total_s is not None:
+            record.setdefault("timings", {})["total"] = round(total_s, 4)
+        self._put(record)
+
+    # ── writer thread ────────────────────────────────────────────────
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            last_flush = time.monotonic()
+            while True:
+                timeout = max(0.0, self.flush_s - (time.monotonic() - last_flush))
+                try:
+                    line = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    line = None
+                if line is _STOP:
+                    break
+                if line is not None:
+                    f.write(line)
+                    self.stats["records"] += 1
+                    self.stats["bytes"] += len(line)
+                if time.monotonic() - last_flush >= self.flush_s:
+                    f.flush()
+                    self.stats["flushes"] += 1
+                    last_flush = time.monotonic()
+
+    def close(self, timeout: float = 5.0):
+        """Drain the queue and close the file. Idempotent."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+def load_session(path: str) -> tuple[list[dict], dict]:
+    """Turn records (system prompts re-inlined) and the session header of a session.jsonl."""
+    turns, prefixes, header = [], {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if "session" in record:
+                header = record
+            elif "prefix" in record and "content" in record:
+                prefixes[record["prefix"]] = record["content"]
+            elif "turn" in record:
+                prompt = record.get("prompt")
+                if prompt and "prefix" in prompt[0]:
+                    prompt[0] = {"role": "system", "content": prefixes.get(prompt[0]["prefix"], "")}
+                turns.append(record)
+    return turns, header
+
+
+def get_recorder(session_id: str | None = None, **kwargs) -> SessionRecorder | None:
+    """A recorder for a new session, or None when SESSION_RECORD is off."""
+    return SessionRecorder(session_id, **kwargs) if SESSION_RECORD else None
@@ -0,0 +1,40 @@
+"""
+token_counter.py
+─────────────────────────────────────────────────────────
+Cheap prompt-token estimates for budgeting and per-turn reporting.
+Uses tiktoken when it is installed (and its encoding is available offline);
+otherwise falls back to the usual ~4 characters per token heuristic.
+"""
+
+from __future__ import annotations
+
+_ENCODING = None
+_ENCODING_LOADED = False
+
+# Per-message overhead of chat templates ([INST], role tags, separators …)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def _encoding():
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        _ENCODING_LOADED = True
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _ENCODING = None
+    return _ENCODING
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    return max(1, (len(text) + 3) // 4)
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    return sum(count_tokens(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+scripts/bench_audio_normalize.py
+Upload → 16 kHz mono int16: one ffmpeg subprocess per file (what Whisper's
+load_audio and pydub do) against audio_normalize in-process, one at a time
+and with N concurrent sessions.  Also reports how far the two outputs
+differ (SNR of ours against ffmpeg's).
+
+Test files are generated (44.1 kHz and 48 kHz stereo WAV, plus MP3 when
+ffmpeg is available to encode it); pass your own with --files.
+
+    python scripts/bench_audio_normalize.py [--seconds 8] [--concurrency 8] [--files a.m4a b.mp3]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.audio.audio_normalize import load_pcm16, to_pcm16
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+def ffmpeg_pcm16(path: str) -> np.ndarray:
+    # same command line as whisper.audio.load_audio
+    out = subprocess.run([FFMPEG, "-nostdin", "-threads", "0", "-i", path, "-f", "s16le",
+                          "-ac", "1", "-acodec", "pcm_s16le", "-ar", "16000", "-"],
+                         capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16)
+
+
+def make_files(tmp: str, seconds: float) -> list[str]:
+    rng = np.random.default_rng(0)
+    files = []
+    for sr in (44100, 48000):
+        t = np.arange(int(sr * seconds)) / sr
+        # speech-band chirp plus a little noise, different per channel
+        left = 0.4 * np.sin(2 * np.pi * (200 + 1500 * t / seconds) * t)
+        right = 0.4 * np.sin(2 * np.pi * (300 + 2500 * t / seconds) * t)
+        stereo = np.stack([left, right], 1) + 0.01 * rng.standard_normal((len(t), 2))
+        path = os.path.join(tmp, f"upload_{sr}.wav")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(sr)
+            w.writeframes(to_pcm16(stereo).tobytes())
+        files.append(path)
+        if FFMPEG:
+            mp3 = path[:-4] + ".mp3"
+            subprocess.run([FFMPEG, "-y", "-loglevel", "error", "-i", path, "-b:a", "128k", mp3], check=True)
+            files.append(mp3)
+    return files
+
+
+def timed_ms(fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(path)
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1e3
+
+
+def concurrent_ms(fn, files, concurrency, rounds=4):
+    jobs = files * rounds * concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(fn, jobs))
+    return (time.perf_counter() - start) * 1e3 / len(jobs)
+
+
+def snr_db(ref: np.ndarray, ours: np.ndarray) -> float:
+    n = min(len(ref), len(ours))
+    ref, ours = ref[:n].astype(np.float64), ours[:n].astype(np.float64)
+    return 10 * np.log10((ref ** 2).sum() / max(((ref - ours) ** 2).sum(), 1e-9))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", nargs="*")
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not FFMPEG:
+        print("[Bench] ffmpeg not on PATH – reporting the in-process path only")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or make_files(tmp, args.seconds)
+        for path in files:
+            ours, ours_ms = timed_ms(load_pcm16, path, args.repeat)
+            line = f"{Path(path).name:<22} in-process {ours_ms:7.1f} ms"
+            if FFMPEG:
+                ref, ref_ms = timed_ms(ffmpeg_pcm16, path, args.repeat)
+                line += (f" | ffmpeg {ref_ms:7.1f} ms  ×{ref_ms / ours_ms:4.1f}"
+                         f" | SNR vs ffmpeg {snr_db(ref, ours):5.1f} dB, len {len(ours)}/{len(ref)}")
+            print(line)
+
+        print(f"\nconcurrency={args.concurrency} (ms per file, wall clock)")
+        print(f"  in-process: {concurrent_ms(load_pcm16, files, args.concurrency):7.1f}")
+        if FFMPEG:
+            print(f"  ffmpeg:     {concurrent_ms(ffmpeg_pcm16, files, args.concurrency):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
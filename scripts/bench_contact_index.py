@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+scripts/bench_contact_index.py
+resolve_email lookup latency vs. directory size: the original linear
+process.extractOne scans against the pruned ContactIndex.  Also checks that
+both return the same (email, needs_confirmation) for every query, including
+random 1–2-edit typos (tests/test_contact_index.py runs more of those).
+
+    python scripts/bench_contact_index.py [--sizes 1000 10000 50000 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from rapidfuzz import fuzz, process
+
+from s2s_pipeline.actions.contact_index import ContactIndex
+
+FIRST = ["marta", "john", "priya", "wei", "olga", "ahmed", "lucia", "tom", "fatima", "kenji",
+         "sarah", "diego", "anna", "li", "noah", "emma", "omar", "zoe", "ivan", "grace"]
+LAST = ["jones", "smith", "patel", "chen", "novak", "khan", "garcia", "brown", "ali", "tanaka",
+        "miller", "lopez", "rossi", "wang", "nguyen", "kowalski", "murphy", "silva", "costa", "meyer"]
+
+
+def synthetic_directory(n, seed=7):
+    rng = random.Random(seed)
+    contacts = {}
+    while len(contacts) < n:
+        name = f"{rng.choice(FIRST)}{rng.randint(0, 999) if rng.random() < 0.8 else ''} {rng.choice(LAST)}"
+        contacts.setdefault(name, name.replace(" ", ".") + "@example.com")
+    return contacts
+
+
+def queries_for(contacts, seed=11):
+    rng = random.Random(seed)
+    keys = list(contacts)
+    picks = [rng.choice(keys) for _ in range(20)]
+    typo = [k[:2] + k[3:] for k in picks[:5]]                 # dropped letter
+    partial = [k.split()[0] for k in picks[5:10]]             # first name only
+    swapped = [" ".join(reversed(k.split())) for k in picks[10:15]]
+    unknown = ["bartholomew quince", "zzz", "xavier", "the plumber", "mom"]
+    return picks[15:] + typo + partial + swapped + unknown + random_typos(contacts, 40, seed)
+
+
+def random_typos(contacts, n, seed=13):
+    """`n` names (whole, first or last word) with 1–2 random character edits."""
+    rng = random.Random(seed)
+    keys = list(contacts)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    queries = []
+    while len(queries) < n:
+        name = rng.choice(keys)
+        q = rng.choice([name, name.split()[0], name.split()[-1]])
+        for _ in range(rng.randint(1, 2)):
+            i = rng.randrange(len(q))
+            edit = rng.choice(("delete", "insert", "substitute", "transpose"))
+            if edit == "delete" and len(q) > 1:
+                q = q[:i] + q[i + 1:]
+            elif edit == "insert":
+                q = q[:i] + rng.choice(letters) + q[i:]
+            elif edit == "substitute":
+                q = q[:i] + rng.choice(letters) + q[i + 1:]
+            elif i + 1 < len(q):
+                q = q[:i] + q[i + 1] + q[i] + q[i + 2:]
+        q = " ".join(q.split())
+        if q:
+            queries.append(q)
+    return queries
+
+
+def legacy_lookup(contacts, token):
+    """resolve_email before the index (steps 1–4)."""
+    if token in contacts:
+        return contacts[token], False
+    match, score, _ = process.extractOne(token, contacts.keys(), scorer=fuzz.token_sort_ratio) or (None, 0, None)
+    if score >= 80:
+        return contacts[match], True
+    match, score, _ = process.extractOne(token, contacts.keys(), scorer=fuzz.partial_ratio) or (None, 0, None)
+    if score >= 80:
+        return contacts[match], True
+    for w in token.split():
+        if w in contacts:
+            return contacts[w], True
+        match, score, _ = process.extractOne(w, contacts.keys(), scorer=fuzz.partial_ratio) or (None, 0, None)
+        if score >= 85:
+            return contacts[match], True
+    return None, False
+
+
+def bench(size):
+    contacts = synthetic_directory(size)
+    start = time.perf_counter()
+    index = ContactIndex.from_contacts(contacts)
+    index.wait_ready()
+    build_ms = (time.perf_counter() - start) * 1e3
+    queries = queries_for(contacts)
+
+    mismatches = 0
+    timings = {"legacy": 0.0, "index": 0.0}
+    for q in queries:
+        t = time.perf_counter(); old = legacy_lookup(contacts, q); timings["legacy"] += time.perf_counter() - t
+        t = time.perf_counter(); new = index.lookup(q)[:2]; timings["index"] += time.perf_counter() - t
+        mismatches += old != new
+    n = len(queries)
+    print(f"contacts={size:<7} build={build_ms:7.1f} ms  "
+          f"legacy={timings['legacy'] / n * 1e3:8.2f} ms/lookup  index={timings['index'] / n * 1e3:7.2f} ms/lookup  "
+          f"mismatches={mismatches}/{n}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 100000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+scripts/bench_contact_store.py
+Nightly-sync and worker-start cost vs. directory size: CSV → full JSON
+rewrite + json.load at start-up, against streaming ingest into the compiled
+store, an incremental re-sync (1 % changed, 0.5 % removed) and an mmap open.
+Also checks the store and the JSON hold the same contacts.
+
+    python scripts/bench_contact_store.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.utils.contact_ingest import sync_store
+from s2s_pipeline.utils.contact_store import ContactStore
+from s2s_pipeline.utils.contact_to_json import convert_csv_to_json
+
+FIRST = ["marta", "john", "priya", "wei", "olga", "ahmed", "lucia", "tom", "fatima", "kenji"]
+LAST = ["jones", "smith", "patel", "chen", "novak", "khan", "garcia", "brown", "ali", "tanaka"]
+COLUMNS = ["First Name", "Middle Name", "Last Name", "E-mail 1 - Value"]
+
+
+def write_csv(path, n, changed=0.0, removed=0.0, seed=3):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        for i in range(n):
+            if rng.random() < removed:
+                continue
+            first, last = FIRST[i % len(FIRST)], LAST[(i // len(FIRST)) % len(LAST)]
+            domain = "new.example.com" if rng.random() < changed else "example.com"
+            w.writerow([first, str(i), last, f"{first}.{i}.{last}@{domain}"])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - start) * 1e3
+
+
+def bench(size, tmp):
+    csv_path, json_path = os.path.join(tmp, "c.csv"), os.path.join(tmp, "c.json")
+    store_path = os.path.join(tmp, "c.s2sc")
+    write_csv(csv_path, size)
+
+    _, json_write = timed(convert_csv_to_json, csv_path, json_path)
+    contacts, json_load = timed(lambda: json.load(open(json_path, encoding="utf-8")))
+    _, full_ingest = timed(sync_store, store_path, [csv_path], full=True)
+    store, store_open = timed(ContactStore.open, store_path)
+    assert dict(store.items()) == contacts, "store and JSON disagree"
+    store.close()
+
+    write_csv(csv_path, size, changed=0.01, removed=0.005)
+    stats, delta_sync = timed(sync_store, store_path, [csv_path])
+    store, delta_open = timed(ContactStore.open, store_path)
+    key = next(iter(contacts))
+    _, lookup = timed(store.get, key)
+    store.close()
+
+    print(f"contacts={size:<7} json: write={json_write:8.1f} ms load={json_load:7.1f} ms | "
+          f"store: ingest={full_ingest:8.1f} ms open={store_open:5.2f} ms "
+          f"re-sync={delta_sync:8.1f} ms (+{stats['upserts']} -{stats['deletes']}) "
+          f"open+delta={delta_open:6.2f} ms lookup={lookup:5.3f} ms  "
+          f"size json={os.path.getsize(json_path) // 1024} KB store={os.path.getsize(store_path) // 1024} KB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            bench(size, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+scripts/bench_local_asr.py
+Local ASR backends side by side: openai-whisper (PyTorch FP32 on CPU) against
+faster-whisper (CTranslate2 int8).  Reports model load time, real-time factor
+(decode seconds / audio seconds, lower is better), peak RSS and WER.
+
+Each backend runs in its own subprocess so load time and peak memory are
+not polluted by the other; the first clip is a warm-up and is not timed.
+
+The corpus is a directory of audio files with a same-named .txt reference
+each.  If it holds no audio, the bundled prompts below are synthesised
+into it once with Deepgram TTS (needs DEEPGRAM_API_KEY).
+
+    python scripts/bench_local_asr.py [--corpus bench_corpus] [--model base]
+                                      [--backends openai faster-whisper]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+AUDIO_EXTS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+VOICES = ["aura-2-thalia-en", "aura-2-arcas-en"]
+
+# the kind of thing users say to the agent – short commands, names, dictation
+PROMPTS = [
+    "Send an email to Marta about the quarterly budget review.",
+    "Can you schedule a meeting with John tomorrow afternoon?",
+    "What's on my calendar for Friday?",
+    "Text Priya that I'm running about ten minutes late.",
+    "Cancel that, I changed my mind.",
+    "Yes, go ahead and send it.",
+    "Remind me to call the dentist next week.",
+    "Play some relaxing music while I work.",
+    "Tell Ahmed the report is ready for his review.",
+    "How long will it take to drive to the airport right now?",
+    "Add milk, eggs and coffee to my shopping list.",
+    "Move my one on one with Lucia to Thursday morning.",
+    "Read me the last message from Kenji.",
+    "Is it going to rain this weekend?",
+    "Draft a reply thanking Olga for the quick turnaround.",
+    "No, the subject should be project kickoff, not project update.",
+]
+
+
+# ── corpus ────────────────────────────────────────────────────────────
+def load_corpus(corpus: Path):
+    items = []
+    for audio in sorted(corpus.iterdir()):
+        ref = audio.with_suffix(".txt")
+        if audio.suffix.lower() in AUDIO_EXTS and ref.exists():
+            items.append((str(audio), ref.read_text(encoding="utf-8").strip()))
+    return items
+
+
+def synthesise_corpus(corpus: Path):
+    from dotenv import load_dotenv
+    from s2s_pipeline.tts.deepgram_tts import text_to_speech
+
+    load_dotenv()
+    corpus.mkdir(parents=True, exist_ok=True)
+    for i, text in enumerate(PROMPTS):
+        for voice in VOICES:
+            stem = corpus / f"{i:02d}-{voice}"
+            if text_to_speech(text, output_audio_path=str(stem.with_suffix(".mp3")), model=voice):
+                stem.with_suffix(".txt").write_text(text, encoding="utf-8")
+
+
+# ── scoring ───────────────────────────────────────────────────────────
+def normalise(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower().replace("-", " ")).split()
+
+
+def word_errors(ref: str, hyp: str) -> tuple[int, int]:
+    from rapidfuzz.distance import Levenshtein
+    r, h = normalise(ref), normalise(hyp)
+    return Levenshtein.distance(r, h), len(r)
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    except ImportError:                                   # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except ImportError:
+            return None
+
+
+# ── worker (one backend per process) ──────────────────────────────────
+def worker(backend: str, corpus: str, model: str):
+    os.environ["WHISPER_BACKEND"] = backend
+    os.environ["WHISPER_MODEL"] = model
+    os.environ.pop("WHISPER_SERVER", None)
+    from s2s_pipeline.asr import whisper_asr
+    from s2s_pipeline.audio.audio_normalize import load_float32
+
+    if backend == "openai":
+        start = time.perf_counter()
+        whisper_asr._local_model()
+    else:
+        from s2s_pipeline.asr import faster_whisper_asr
+        start = time.perf_counter()
+        faster_whisper_asr.get_model()
+    load_s = time.perf_counter() - start
+
+    items = load_corpus(Path(corpus))
+    whisper_asr.transcribe_audio(items[0][0])                # warm-up
+    rows = []
+    for path, ref in items:
+        audio_s = len(load_float32(path)) / 16000
+        start = time.perf_counter()
+        hyp = whisper_asr.transcribe_audio(path)["transcript"]
+        rows.append({"path": path, "ref": ref, "hyp": hyp, "audio_s": audio_s,
+                     "decode_s": time.perf_counter() - start})
+    print("@@RESULT " + json.dumps({"load_s": load_s, "rss_mb": peak_rss_mb(), "rows": rows}))
+
+
+def run_backend(backend: str, corpus: Path, model: str) -> dict | None:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker", backend, "--corpus", str(corpus), "--model", model],
+        capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("@@RESULT "):
+            return json.loads(line[9:])
+    print(f"[Bench] {backend} failed:\n{proc.stderr.strip()[-2000:]}")
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=Path("bench_corpus"))
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--backends", nargs="+", default=["openai", "faster-whisper"])
+    parser.add_argument("--show-errors", action="store_true", help="print every mis-recognised clip")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, str(args.corpus), args.model)
+        return
+
+    if not args.corpus.is_dir() or not load_corpus(args.corpus):
+        print(f"[Bench] Synthesising corpus into {args.corpus}/ …")
+        synthesise_corpus(args.corpus)
+    items = load_corpus(args.corpus)
+    if not items:
+        sys.exit(f"No audio + .txt pairs in {args.corpus}")
+    print(f"[Bench] {len(items)} clips, model={args.model}\n")
+
+    print(f"{'backend':<16} {'load s':>7} {'RTF':>7} {'p95 ms':>8} {'peak RSS MB':>12} {'WER':>7}")
+    for backend in args.backends:
+        result = run_backend(backend, args.corpus, args.model)
+        if result is None:
+            continue
+        rows = result["rows"]
+        rtf = sum(r["decode_s"] for r in rows) / sum(r["audio_s"] for r in rows)
+        decode = sorted(r["decode_s"] for r in rows)
+        errors = [word_errors(r["ref"], r["hyp"]) for r in rows]
+        wer = sum(e for e, _ in errors) / max(sum(n for _, n in errors), 1)
+        rss = f"{result['rss_mb']:.0f}" if result["rss_mb"] is not None else "n/a"
+        print(f"{backend:<16} {result['load_s']:7.2f} {rtf:7.3f} "
+              f"{decode[int(0.95 * (len(decode) - 1))] * 1e3:8.0f} {rss:>12} {wer:7.1%}")
+        if args.show_errors:
+            for r, (e, _) in zip(rows, errors):
+                if e:
+                    print(f"    {Path(r['path']).name}: {r['hyp']!r}  (ref {r['ref']!r})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+scripts/bench_long_audio.py
+Wall-clock for one long recording: whisper_asr (sequential, one process)
+against long_audio's VAD-chunked process pool at several worker counts.
+Pool start-up (model load per worker) is reported separately – in the
+pipeline the pool is created once and reused.
+
+    python scripts/bench_long_audio.py voicemail.wav [--workers 1 2 4 8]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.asr import long_audio, whisper_asr
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    duration = len(long_audio.load_pcm(args.audio)) / long_audio.SAMPLE_RATE
+    whisper_asr.transcribe_audio(args.audio)                 # load the model / warm caches
+    start = time.perf_counter()
+    baseline = whisper_asr.transcribe_audio(args.audio)
+    sequential = time.perf_counter() - start
+    print(f"{duration:.0f}s audio | sequential: {sequential:6.1f}s  "
+          f"({len(baseline['transcript'].split())} words)")
+
+    long_audio.LONG_AUDIO_MIN_S = 0
+    for n in args.workers:
+        long_audio.shutdown()
+        long_audio.LONG_AUDIO_WORKERS = n
+        start = time.perf_counter()
+        list(long_audio.get_pool().map(int, range(n)))        # spawn workers and load models
+        spin_up = time.perf_counter() - start
+        start = time.perf_counter()
+        result = long_audio.transcribe_audio(args.audio)
+        took = time.perf_counter() - start
+        print(f"workers={n:<3} pool start {spin_up:5.1f}s | transcribe {took:6.1f}s "
+              f"speed-up ×{sequential / took:4.1f}  ({len(result['segments'])} segments, "
+              f"{len(result['transcript'].split())} words)")
+    long_audio.shutdown()
+
+
+if __name__ == "__main__":
+    main()
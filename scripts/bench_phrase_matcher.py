@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+scripts/bench_phrase_matcher.py
+Per-turn cost of the phrase checks: the old per-function loops
+(re-clean + fuzz.partial_ratio over each list + substring scans) versus one
+compiled PhraseMatcher pass.
+
+    python scripts/bench_phrase_matcher.py [--locales 1 5 20] [--turns 2000]
+
+`--locales N` multiplies every phrase list N times (suffixed copies) to
+simulate per-locale growth.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from rapidfuzz import fuzz
+
+from s2s_pipeline.utils import phrase_matcher as pm
+
+UTTERANCES = [
+    "yes please go ahead", "no that's the wrong address", "cancel it", "ok",
+    "tell her I will be late for dinner tonight", "can you play some music",
+    "send an email to marta jones", "uh yeah sure", "never mind forget it",
+    "what's the weather like in boston tomorrow",
+]
+
+
+def _expand(phrases, n):
+    return list(phrases) + [f"{p} {i}" for i in range(1, n) for p in phrases]
+
+
+def legacy_turn(text, fuzzy, substring):
+    """What pipeline_core / confirm_matcher / classifier did before."""
+    out = {}
+    for name, (phrases, threshold) in fuzzy.items():
+        txt = re.sub(r"[^\w\s]", "", text.lower()).strip()   # re-cleaned every call
+        out[name] = any(fuzz.partial_ratio(txt, p) >= threshold for p in phrases)
+    for name, words in substring.items():
+        out[name] = any(w in text.lower() for w in words)
+    return out
+
+
+def bench(locales, turns):
+    fuzzy = {k: (_expand(v[0], locales), v[1]) for k, v in pm.FUZZY_CATEGORIES.items()}
+    substring = {k: _expand(v, locales) for k, v in pm.SUBSTRING_CATEGORIES.items()}
+    matcher = pm.PhraseMatcher(fuzzy, substring, cache_size=0)  # no memoisation: raw cost
+
+    # sanity: identical decisions
+    for u in UTTERANCES:
+        assert legacy_turn(u, fuzzy, substring) == matcher.match(u), u
+
+    n_phrases = sum(len(v[0]) for v in fuzzy.values()) + sum(len(v) for v in substring.values())
+    results = {}
+    for label, fn in (("legacy", lambda u: legacy_turn(u, fuzzy, substring)),
+                      ("compiled", matcher.match)):
+        start = time.perf_counter()
+        for i in range(turns):
+            fn(UTTERANCES[i % len(UTTERANCES)])
+        results[label] = (time.perf_counter() - start) / turns * 1e6
+    print(f"locales={locales:<3} phrases={n_phrases:<5} "
+          f"legacy={results['legacy']:8.1f} µs/turn  compiled={results['compiled']:8.1f} µs/turn  "
+          f"speed-up×{results['legacy'] / results['compiled']:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locales", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+    for n in args.locales:
+        bench(n, args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+scripts/bench_speaker_verification.py
+Accuracy and cost of the enrolled-speaker gate.
+
+Corpus: <corpus>/<speaker>/<clip>.{wav,mp3,…}.  Half the speakers are
+enrolled (first --enroll clips each), the other half play bystanders.
+Every remaining clip is scored the way the gate scores it – best cosine
+over the enrolled matrix – giving:
+
+  • EER and the threshold where it occurs
+  • false-accept / false-reject rates at the configured threshold
+  • embedding latency per clip and per second of speech
+  • scoring latency against 10 / 1k / 100k enrolled rows (one mat-vec)
+
+Without a corpus, prompts are synthesised in several Deepgram Aura voices
+(one "speaker" per voice; needs DEEPGRAM_API_KEY).  TTS voices are cleaner
+and more distinct than real rooms – use recorded clips for the numbers
+that set SPEAKER_THRESHOLD.
+
+    python scripts/bench_speaker_verification.py [--corpus spk_corpus] [--embedder mfcc]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.audio.audio_normalize import load_pcm16
+from s2s_pipeline.audio.speaker_verification import (
+    SAMPLE_RATE, SpeakerStore, embed, embedder_name, speech_only, threshold_for)
+
+AUDIO_EXTS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+VOICES = ["aura-2-thalia-en", "aura-2-andromeda-en", "aura-2-helena-en", "aura-2-apollo-en",
+          "aura-2-arcas-en", "aura-2-aries-en", "aura-2-luna-en", "aura-2-orion-en"]
+PROMPTS = [
+    "Send an email to Marta about the budget review.",
+    "What's on my calendar for Friday afternoon?",
+    "Remind me to call the dentist next week.",
+    "Play some relaxing music while I work.",
+    "Tell Ahmed the report is ready for review.",
+    "Is it going to rain this weekend?",
+    "Move my meeting with Lucia to Thursday.",
+    "Read me the last message from Kenji.",
+]
+
+
+def synthesise(corpus: Path):
+    from dotenv import load_dotenv
+    from s2s_pipeline.tts.deepgram_tts import text_to_speech
+    load_dotenv()
+    for voice in VOICES:
+        (corpus / voice).mkdir(parents=True, exist_ok=True)
+        for i, text in enumerate(PROMPTS):
+            text_to_speech(text, output_audio_path=str(corpus / voice / f"{i:02d}.mp3"), model=voice)
+
+
+def load_corpus(corpus: Path) -> dict[str, list[np.ndarray]]:
+    speakers = {}
+    for d in sorted(p for p in corpus.iterdir() if p.is_dir()):
+        clips = [speech_only(load_pcm16(f)) for f in sorted(d.iterdir()) if f.suffix.lower() in AUDIO_EXTS]
+        clips = [c for c in clips if len(c)]
+        if len(clips) >= 2:
+            speakers[d.name] = clips
+    return speakers
+
+
+def eer(genuine: np.ndarray, impostor: np.ndarray) -> tuple[float, float]:
+    thresholds = np.unique(np.concatenate([genuine, impostor]))
+    far = np.array([(impostor >= t).mean() for t in thresholds])
+    frr = np.array([(genuine < t).mean() for t in thresholds])
+    i = int(np.argmin(np.abs(far - frr)))
+    return (far[i] + frr[i]) / 2, float(thresholds[i])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=Path("spk_corpus"))
+    parser.add_argument("--embedder", default=None, help="resemblyzer | mfcc (default: auto)")
+    parser.add_argument("--enroll", type=int, default=3, help="clips per enrolled speaker")
+    args = parser.parse_args()
+    name = embedder_name(args.embedder or "auto")
+
+    if not args.corpus.is_dir() or not any(args.corpus.iterdir()):
+        print(f"[Bench] Synthesising corpus into {args.corpus}/ …")
+        synthesise(args.corpus)
+    speakers = load_corpus(args.corpus)
+    if len(speakers) < 2:
+        sys.exit(f"Need at least two speaker directories with 2+ clips in {args.corpus}")
+
+    # embeddings (timed)
+    embeddings, embed_s, speech_s = {}, 0.0, 0.0
+    embed(next(iter(speakers.values()))[0], name)           # load the model
+    for spk, clips in speakers.items():
+        start = time.perf_counter()
+        embeddings[spk] = [embed(c, name) for c in clips]
+        embed_s += time.perf_counter() - start
+        speech_s += sum(len(c) for c in clips) / SAMPLE_RATE
+    n_clips = sum(len(v) for v in embeddings.values())
+
+    names = list(speakers)
+    enrolled, bystanders = names[: (len(names) + 1) // 2], names[(len(names) + 1) // 2:]
+    store = SpeakerStore(name)
+    for spk in enrolled:
+        store.enroll(spk, embeddings[spk][: args.enroll])
+
+    genuine, impostor, misattributed = [], [], 0
+    for spk in enrolled:
+        for e in embeddings[spk][args.enroll:]:
+            scores = store.matrix @ e
+            genuine.append(scores[store.names.index(spk)])
+            misattributed += store.names[int(np.argmax(scores))] != spk
+    for spk in bystanders:
+        impostor += [float((store.matrix @ e).max()) for e in embeddings[spk]]
+    genuine, impostor = np.array(genuine), np.array(impostor)
+    if not len(genuine) or not len(impostor):
+        sys.exit("Not enough held-out clips – add clips or lower --enroll")
+
+    threshold = threshold_for(name)
+    rate, at = eer(genuine, impostor)
+    print(f"embedder={name}  enrolled={len(enrolled)}  bystanders={len(bystanders)}  "
+          f"trials: genuine={len(genuine)} impostor={len(impostor)}")
+    print(f"EER {rate:.1%} at threshold {at:.3f}")
+    print(f"at SPEAKER_THRESHOLD={threshold:.2f}: false accept {np.mean(impostor >= threshold):.1%}, "
+          f"false reject {np.mean(genuine < threshold):.1%}, wrong enrolled user {misattributed}")
+    print(f"embedding: {embed_s / n_clips * 1e3:.1f} ms/clip, "
+          f"{embed_s / speech_s * 1e3:.1f} ms per second of speech")
+
+    dim = store.matrix.shape[1]
+    probe = embeddings[enrolled[0]][0]
+    for n in (10, 1000, 100000):
+        matrix = np.random.default_rng(0).standard_normal((n, dim)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        start = time.perf_counter()
+        for _ in range(100):
+            int(np.argmax(matrix @ probe))
+        print(f"scoring vs {n:>6} enrolled: {(time.perf_counter() - start) * 10:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
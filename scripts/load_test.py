@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+"""
+scripts/load_test.py
+Many concurrent voice callers against one node's turn API
+(`run_s2s_session_turn`), to find where the node saturates.
+
+The node is modelled as --workers turn workers behind one admission queue.
+Each simulated caller plays a scripted dialogue turn by turn: think pause,
+utterance → turn API → listen to the reply (its length estimated from the
+reply text) – or barge in part-way through it – → next turn.
+
+  closed loop   --concurrency 1 2 4 8 16   N callers, each starting a new
+                                           dialogue as soon as one ends
+  open loop     --arrival-rate 0.5 1 2 4   calls per second (Poisson); each
+                                           call plays one dialogue and hangs up
+
+Per level: throughput (turns/s), error and degraded-turn rates, admission
+queue delay, end-to-end turn latency p50 / p95 / p99, and per-stage p50 with
+its growth over the first level – the time that stage spent queueing for a
+shared resource (executor, connection, GIL) rather than working.  The first
+level where throughput stops growing, or p95 passes the turn budget, is
+reported as the saturation point.
+
+Dialogues come from --script (JSON: [[{"audio", "text", "llm_raw",
+"pause_s", "barge_in_s"}, …], …]), from recorded sessions (--sessions, see
+utils/session_recorder), or a small built-in set.  With --backends stand-in
+(default) ASR / LLM / TTS / actions are replaced by sleeps of --asr-ms etc.
+(log-normal jitter) that replay the script's text; everything between them
+– dialogue state, session store, task forms, budgets – is real.  With
+--backends real the node calls its real services (audio clips required, and
+remember send_email really sends).
+
+    python scripts/load_test.py --concurrency 1 2 4 8 16 32 --workers 8 [--stage-s 30]
+    python scripts/load_test.py --arrival-rate 1 2 4 8 --sessions sessions/* --backends real
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import types
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.utils.latency_budget import TURN_BUDGET_S, TurnBudget
+
+CHARS_PER_S = 15.0          # speaking rate used to estimate reply playback time
+JITTER      = 0.3           # log-normal sigma of stand-in service times
+STAGES      = ("asr", "llm", "action", "tts")
+
+CHAT = lambda text: json.dumps({"intent": "general_chat", "response": text})
+BUILTIN_DIALOGUES = [
+    [{"text": "What's the weather like tomorrow?",
+      "llm_raw": CHAT("I can't check the forecast, but I can set you a reminder to look."), "pause_s": 1.0},
+     {"text": "Okay, thanks.", "llm_raw": CHAT("You're welcome!"), "pause_s": 2.0}],
+    [{"text": "Send an email to Marta.", "pause_s": 1.0,
+      "llm_raw": json.dumps({"intent": "send_email", "response": "",
+                             "action": {"type": "send_email", "parameters": {"to": "Marta"}}})},
+     {"text": "Yes.", "pause_s": 0.5},
+     {"text": "Tell her the budget review moved to Friday.", "pause_s": 2.0}],
+    [{"text": "Tell me a short story about a lighthouse.", "barge_in_s": 2.0, "pause_s": 1.0,
+      "llm_raw": CHAT("Once upon a time a lighthouse keeper counted ships every night, "
+                      "until one foggy evening a ship answered back with a song.")},
+     {"text": "Actually, make it about a robot.", "pause_s": 0.2,
+      "llm_raw": CHAT("A small robot swept the same beach every morning and collected lost keys.")}],
+]
+
+_local = threading.local()          # the scripted turn a worker thread is serving
+
+
+# ── stand-in backends ─────────────────────────────────────────────────
+def _stand_in(module: str, **attrs):
+    try:
+        mod = importlib.import_module(module)
+    except ImportError:
+        mod = sys.modules[module] = types.ModuleType(module)
+    for name, fn in attrs.items():
+        setattr(mod, name, fn)
+
+
+def install_stand_ins(args):
+    def service(ms: float):
+        time.sleep(ms / 1e3 * random.lognormvariate(0, JITTER))
+
+    def transcribe_audio(audio_path, timeout=None, vocabulary=None):
+        service(args.asr_ms)
+        return {"transcript": _local.turn.get("text", ""), "segments": [],
+                "avg_logprob": -0.2, "no_speech_prob": 0.01}
+
+    def call_llm(messages, *_, **__):
+        service(args.llm_ms)
+        return _local.turn.get("llm_raw") or CHAT("Okay.")
+
+    def text_to_speech(text, *_, **__):
+        service(args.tts_ms)
+        return None
+
+    def action(**_):
+        service(args.action_ms)
+        return "Done."
+
+    _stand_in("s2s_pipeline.audio.vad_speaker_id", vad_speaker_identification=lambda p, *_, **__: p)
+    _stand_in("s2s_pipeline.asr.asr_orchestrator", transcribe_audio=transcribe_audio)
+    _stand_in("s2s_pipeline.llm.mistral_llm", call_llm=call_llm)
+    _stand_in("s2s_pipeline.tts.deepgram_tts", text_to_speech=text_to_speech)
+    _stand_in("s2s_pipeline.tts.phrase_cache", cached_speech=lambda *_, **__: None)
+    from s2s_pipeline.actions import action_router
+    for a_type in list(action_router.ACTION_HANDLERS):
+        action_router.ACTION_HANDLERS[a_type] = action
+
+
+# ── dialogues ─────────────────────────────────────────────────────────
+def load_dialogues(args) -> list[list[dict]]:
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            return json.load(f)
+    if args.sessions:
+        from s2s_pipeline.utils.session_recorder import load_session
+        dialogues = []
+        for d in args.sessions:
+            path = Path(d) / "session.jsonl" if Path(d).is_dir() else Path(d)
+            turns, _ = load_session(str(path))
+            dialogue = [{"audio": str(path.parent / t["audio"]) if t.get("audio") else None,
+                         "text": t.get("transcript", ""), "llm_raw": t.get("llm_raw")}
+                        for t in turns if not t.get("gated")]
+            if dialogue:
+                dialogues.append(dialogue)
+        return dialogues
+    return BUILTIN_DIALOGUES
+
+
+# ── node + callers ────────────────────────────────────────────────────
+class _Capture:
+    """Duck-typed recorder: keeps the turn's trace (reply text) for the caller."""
+
+    def __init__(self):
+        self.trace: dict = {}
+
+    def record_turn(self, audio_path, trace, budget=None, total_s=None):
+        self.trace = trace
+
+
+class Node:
+    def __init__(self, workers: int):
+        from api.pipeline_core import run_s2s_session_turn
+        from s2s_pipeline.dialogue.session_store import get_session_store
+        self.run_turn = run_s2s_session_turn
+        self.store = get_session_store()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="node")
+
+    def _serve(self, turn: dict, session_id: str, submitted: float, budget: TurnBudget) -> dict:
+        started = time.perf_counter()
+        _local.turn = turn
+        capture, error = _Capture(), None
+        try:
+            self.run_turn(turn.get("audio") or "", session_id, self.store, budget=budget, recorder=capture)
+        except Exception as e:
+            error = repr(e)
+        done = time.perf_counter()
+        return {"done": done, "queue": started - submitted, "latency": done - submitted,
+                "stages": dict(budget.timings), "degraded": bool(budget.degraded),
+                "error": error, "reply": capture.trace.get("tts_text") or ""}
+
+    def turn(self, turn: dict, session_id: str) -> dict:
+        budget = TurnBudget()                   # started on arrival: queueing eats into it
+        return self.pool.submit(self._serve, turn, session_id, time.perf_counter(), budget).result()
+
+
+def play_dialogue(node: Node, dialogue: list[dict], samples: list, think_s: float, stop_at: float):
+    session_id = uuid.uuid4().hex
+    for turn in dialogue:
+        time.sleep(turn.get("pause_s", random.expovariate(1 / think_s) if think_s > 0 else 0))
+        if time.perf_counter() >= stop_at:
+            return
+        sample = node.turn(turn, session_id)
+        samples.append(sample)
+        playback = len(sample["reply"]) / CHARS_PER_S
+        barge_in = turn.get("barge_in_s")
+        time.sleep(min(barge_in, playback) if barge_in is not None else playback)
+
+
+def run_level(node: Node, dialogues, args, concurrency=None, rate=None) -> list[dict]:
+    samples: list[dict] = []
+    start = time.perf_counter()
+    stop_at = start + args.warmup_s + args.stage_s
+    callers = []
+
+    def caller_loop():
+        while time.perf_counter() < stop_at:
+            play_dialogue(node, random.choice(dialogues), samples, args.think_s, stop_at)
+
+    if concurrency is not None:
+        callers = [threading.Thread(target=caller_loop, daemon=True) for _ in range(concurrency)]
+        for t in callers:
+            t.start()
+    else:
+        while time.perf_counter() < stop_at:
+            time.sleep(random.expovariate(rate))
+            t = threading.Thread(target=play_dialogue, daemon=True,
+                                 args=(node, random.choice(dialogues), samples, args.think_s, stop_at))
+            t.start()
+            callers.append(t)
+    for t in callers:
+        t.join()
+    return [s for s in samples if start + args.warmup_s <= s["done"] <= stop_at]
+
+
+def summarise(label, samples: list[dict], window_s: float, baseline: dict | None) -> dict:
+    ok = [s for s in samples if s["error"] is None]
+    lat = np.array([s["latency"] for s in ok]) if ok else np.zeros(1)
+    queue = np.array([s["queue"] for s in samples]) if samples else np.zeros(1)
+    stage_p50 = {st: float(np.median([s["stages"][st] for s in ok if st in s["stages"]]))
+                 for st in STAGES if any(st in s["stages"] for s in ok)}
+    return {
+        "level": label, "turns": len(samples), "throughput": len(ok) / window_s,
+        "error_rate": (len(samples) - len(ok)) / max(len(samples), 1),
+        "degraded_rate": sum(s["degraded"] for s in ok) / max(len(ok), 1),
+        "queue_p50": float(np.percentile(queue, 50)), "queue_p95": float(np.percentile(queue, 95)),
+        "p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95)),
+        "p99": float(np.percentile(lat, 99)),
+        "stage_p50": stage_p50,
+        "stage_queue": {st: max(0.0, v - baseline["stage_p50"].get(st, v)) for st, v in stage_p50.items()}
+                       if baseline else {st: 0.0 for st in stage_p50},
+    }
+
+
+def print_row(r: dict):
+    stages = "  ".join(f"{st} {r['stage_p50'][st] * 1e3:5.0f}+{r['stage_queue'][st] * 1e3:<4.0f}"
+                       for st in STAGES if st in r["stage_p50"])
+    print(f"{r['level']:>8} {r['throughput']:7.2f} {r['error_rate']:6.1%} {r['degraded_rate']:6.1%} "
+          f"{r['queue_p50'] * 1e3:7.0f} {r['queue_p95'] * 1e3:7.0f} "
+          f"{r['p50'] * 1e3:7.0f} {r['p95'] * 1e3:7.0f} {r['p99'] * 1e3:7.0f}   {stages}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, nargs="+", help="closed loop: callers per level")
+    load.add_argument("--arrival-rate", type=float, nargs="+", help="open loop: calls/s per level")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="turn workers on the node")
+    parser.add_argument("--stage-s", type=float, default=20.0, help="measured seconds per level")
+    parser.add_argument("--warmup-s", type=float, default=3.0)
+    parser.add_argument("--think-s", type=float, default=1.5, help="mean pause when the script sets none")
+    parser.add_argument("--script", default=None)
+    parser.add_argument("--sessions", nargs="+", default=None)
+    parser.add_argument("--backends", choices=("stand-in", "real"), default="stand-in")
+    parser.add_argument("--asr-ms", type=float, default=300)
+    parser.add_argument("--llm-ms", type=float, default=900)
+    parser.add_argument("--tts-ms", type=float, default=250)
+    parser.add_argument("--action-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write the results here")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    dialogues = load_dialogues(args)
+    if args.backends == "real" and not all(t.get("audio") for d in dialogues for t in d):
+        sys.exit("--backends real needs an audio clip for every scripted turn")
+    if args.backends == "stand-in":
+        install_stand_ins(args)
+    node = Node(args.workers)
+    levels = ([("callers", n) for n in args.concurrency or ()] or
+              [("rate", r) for r in args.arrival_rate or ()] or [("callers", n) for n in (1, 2, 4, 8, 16)])
+
+    print(f"[Load] {len(dialogues)} dialogues, {args.workers} workers, backends={args.backends}, "
+          f"{args.stage_s:.0f}s per level")
+    print(f"{'level':>8} {'turns/s':>7} {'err':>6} {'degr':>6} {'q p50':>7} {'q p95':>7} "
+          f"{'p50':>7} {'p95':>7} {'p99':>7}   stage p50+queueing (ms)")
+    results, baseline, saturation = [], None, None
+    for kind, value in levels:
+        samples = run_level(node, dialogues, args, **({"concurrency": value} if kind == "callers" else {"rate": value}))
+        label = f"{value:g}{'c' if kind == 'callers' else '/s'}"
+        r = summarise(label, samples, args.stage_s, baseline)
+        baseline = baseline or r
+        print_row(r)
+        if saturation is None and results and (
+                r["throughput"] < results[-1]["throughput"] * 1.1 or r["p95"] > TURN_BUDGET_S):
+            saturation = results[-1]["level"]
+        results.append(r)
+
+    if saturation:
+        print(f"[Load] saturation ≈ {saturation}: beyond it throughput stops growing "
+              f"or p95 passes the {TURN_BUDGET_S:.1f}s turn budget")
+    else:
+        print("[Load] not saturated at the highest level – extend the ramp")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "levels": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
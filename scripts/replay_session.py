@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""
+scripts/replay_session.py
+Re-run a recorded session (utils/session_recorder) through api/pipeline_core
+and diff behaviour and latency against the recording.
+
+Each stage runs either for real or as a stand-in that plays back what was
+recorded for that turn:
+
+  --asr  recorded | real     recorded transcript / the input clip through ASR
+  --llm  recorded | real     recorded raw LLM output / a live call
+  --tts  off | real          no synthesis / Deepgram TTS
+  --actions recorded | real  recorded reply / real handlers (sends e-mail!)
+
+Stand-ins take no time unless --latency-scale is set (1.0 = sleep as long as
+the recorded stage took), so with everything recorded the replay measures
+the pipeline's own overhead – total minus the stage timings – which is
+comparable across machines and backends.  A turn whose LLM call was skipped
+in the recording (e.g. a task-form turn) but is made now, or vice versa,
+shows up as a diff.
+
+Reports per-turn diffs of intent / action / reply (and transcript with real
+ASR) and per-stage latency, recorded vs replay.  With --fail-on-diff or
+--max-slowdown the exit status is non-zero on a regression, so recorded
+sessions can serve as a regression suite:
+
+    python scripts/replay_session.py sessions/20260101_120000 [--llm real] [--max-slowdown 1.2]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.utils.session_recorder import SessionRecorder, load_session
+
+COMPARED = ("intent", "action", "tts_text", "llm_called")
+NO_LLM_RECORDED = {"response": "", "intent": "unknown"}
+
+_turn: dict = {}                # the recorded turn being replayed
+_flags: dict = {}
+
+
+def _stand_in(module: str, **attrs):
+    """Replace functions on a pipeline module (or provide the module if it can't be imported)."""
+    try:
+        mod = importlib.import_module(module)
+    except ImportError:
+        mod = sys.modules[module] = types.ModuleType(module)
+    for name, fn in attrs.items():
+        setattr(mod, name, fn)
+
+
+def _wait(stage: str, scale: float):
+    if scale > 0:
+        time.sleep(_turn.get("timings", {}).get(stage, 0.0) * scale)
+
+
+def install_stand_ins(args):
+    scale = args.latency_scale
+    if args.asr == "recorded":
+        def vad_speaker_identification(audio_path, *_, **__):
+            return None if _turn.get("gated") else audio_path
+
+        def transcribe_audio(audio_path, timeout=None, vocabulary=None):
+            _wait("asr", scale)
+            return {"transcript": _turn.get("transcript", ""), "segments": [],
+                    "avg_logprob": _turn.get("avg_logprob"), "no_speech_prob": _turn.get("no_speech_prob")}
+
+        _stand_in("s2s_pipeline.audio.vad_speaker_id", vad_speaker_identification=vad_speaker_identification)
+        _stand_in("s2s_pipeline.asr.asr_orchestrator", transcribe_audio=transcribe_audio)
+
+    if args.llm == "recorded":
+        def call_llm(messages, *_, **__):
+            _wait("llm", scale)
+            if "llm_raw" not in _turn:
+                _flags["llm_unrecorded"] = True
+                return dict(NO_LLM_RECORDED)
+            return _turn["llm_raw"]
+
+        _stand_in("s2s_pipeline.llm.mistral_llm", call_llm=call_llm)
+
+    if args.tts == "off":
+        _stand_in("s2s_pipeline.tts.deepgram_tts", text_to_speech=lambda *_, **__: None)
+        _stand_in("s2s_pipeline.tts.phrase_cache", cached_speech=lambda *_, **__: None)
+
+    if args.actions == "recorded":
+        from s2s_pipeline.actions import action_router
+
+        def recorded_action(**_):
+            _wait("action", scale)
+            return _turn.get("tts_text") or ""
+
+        for a_type in list(action_router.ACTION_HANDLERS):
+            action_router.ACTION_HANDLERS[a_type] = recorded_action
+
+
+class _Capture:
+    """Stands in for a SessionRecorder: keeps the last turn's record (and forwards it)."""
+
+    def __init__(self, forward: SessionRecorder | None = None):
+        self.forward = forward
+        self.last: dict = {}
+
+    def record_turn(self, audio_path, trace, budget=None, total_s=None):
+        self.last = {**trace, "timings": {**(budget.timings if budget else {}), "total": total_s}}
+        if self.forward is not None:
+            self.forward.record_turn(audio_path, trace, budget, total_s)
+
+
+def _behaviour(record: dict) -> dict:
+    action = record.get("action") or None
+    if isinstance(action, dict):            # form bookkeeping ("form" key) is not behaviour
+        action = {"type": action.get("type"), "parameters": action.get("parameters") or {}}
+    return {"intent": record.get("intent"), "action": action, "tts_text": record.get("tts_text"),
+            "llm_called": "llm_raw" in record, "transcript": record.get("transcript")}
+
+
+def overhead(timings: dict) -> float | None:
+    total = timings.get("total")
+    if total is None:
+        return None
+    return max(0.0, total - sum(v for k, v in timings.items() if k != "total"))
+
+
+def _row(name: str, before: list, after: list) -> str:
+    b = np.array([x for x in before if x is not None], dtype=float)
+    a = np.array([x for x in after if x is not None], dtype=float)
+    fmt = lambda x: f"{np.percentile(x, 50) * 1e3:8.1f} {np.percentile(x, 95) * 1e3:8.1f}" if len(x) else f"{'-':>8} {'-':>8}"
+    ratio = f"{np.median(a) / np.median(b):6.2f}x" if len(a) and len(b) and np.median(b) > 0 else ""
+    return f"{name:<10} {fmt(b)}   {fmt(a)}   {ratio}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session", type=Path, help="session directory or its session.jsonl")
+    parser.add_argument("--asr", choices=("recorded", "real"), default="recorded")
+    parser.add_argument("--llm", choices=("recorded", "real"), default="recorded")
+    parser.add_argument("--tts", choices=("off", "real"), default="off")
+    parser.add_argument("--actions", choices=("recorded", "real"), default="recorded")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="stand-ins sleep recorded stage time × this")
+    parser.add_argument("--record-to", default=None, help="also record the replay as a session here")
+    parser.add_argument("--fail-on-diff", action="store_true")
+    parser.add_argument("--max-slowdown", type=float, default=None,
+                        help="fail if the median pipeline overhead grows by more than this factor")
+    args = parser.parse_args()
+
+    path = args.session / "session.jsonl" if args.session.is_dir() else args.session
+    turns, header = load_session(str(path))
+    if not turns:
+        sys.exit(f"No turns recorded in {path}")
+    if header.get("source") == "gui":
+        print("[Replay] note: GUI sessions ran their own loop, not pipeline_core – expect diffs")
+
+    install_stand_ins(args)
+    from api.pipeline_core import run_s2s_once
+
+    capture = _Capture(SessionRecorder(directory=args.record_to, meta={"source": "replay", "of": str(path)})
+                       if args.record_to else None)
+    dialogue_manager, diffs, skipped = None, 0, 0
+    recorded_t, replay_t = [], []
+    for rec in turns:
+        audio = rec.get("audio")
+        if audio and not os.path.isabs(audio):
+            audio = str(path.parent / audio)
+        if args.asr == "real" and not (audio and os.path.exists(audio)):
+            print(f"[Replay] turn {rec['turn']}: input clip missing – skipped")
+            skipped += 1
+            continue
+        _turn.clear()
+        _turn.update(rec)
+        _flags.clear()
+        _, _, _, dialogue_manager = run_s2s_once(audio or "", dialogue_manager, recorder=capture)
+
+        before, after = _behaviour(rec), _behaviour(capture.last)
+        fields = COMPARED + (("transcript",) if args.asr == "real" else ())
+        changed = {k: (before[k], after[k]) for k in fields if before[k] != after[k]}
+        if _flags.get("llm_unrecorded"):
+            changed.setdefault("llm_called", (False, True))
+        if changed:
+            diffs += 1
+            print(f"[Replay] turn {rec['turn']} ({rec.get('transcript', '')!r}) differs:")
+            for k, (old, new) in changed.items():
+                print(f"    {k:<11} recorded {json.dumps(old, ensure_ascii=False)}\n"
+                      f"    {'':<11} replay   {json.dumps(new, ensure_ascii=False)}")
+        recorded_t.append(rec.get("timings", {}))
+        replay_t.append(capture.last["timings"])
+
+    if capture.forward is not None:
+        capture.forward.close()
+
+    replayed = len(turns) - skipped
+    print(f"\n{replayed} turns replayed ({skipped} skipped), {diffs} with behaviour changes")
+    print(f"{'ms':<10} {'rec p50':>8} {'rec p95':>8}   {'new p50':>8} {'new p95':>8}")
+    for stage in ("asr", "llm", "action", "tts", "total"):
+        print(_row(stage, [t.get(stage) for t in recorded_t], [t.get(stage) for t in replay_t]))
+    print(_row("overhead", [overhead(t) for t in recorded_t], [overhead(t) for t in replay_t]))
+
+    failed = args.fail_on_diff and diffs > 0
+    if args.max_slowdown is not None:
+        before = [x for x in map(overhead, recorded_t) if x is not None]
+        after = [x for x in map(overhead, replay_t) if x is not None]
+        if before and after and np.median(after) > np.median(before) * args.max_slowdown:
+            print(f"[Replay] pipeline overhead slowed down {np.median(after) / np.median(before):.2f}x "
+                  f"(limit {args.max_slowdown:.2f}x)")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
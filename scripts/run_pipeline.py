@@ -2,8 +2,19 @@
 """
 scripts/run_pipeline.py
 CLI loop for the multi-turn voice agent.
+
+    python scripts/run_pipeline.py [--profile] [--profile-every N] [--profile-interval-ms MS]
+                                   [--session NAME]
+
+--profile samples the whole loop (recording, pipeline stages, playback) and
+writes a collapsed-stack flamegraph + hot-function summary every N turns.
+
+With SESSION_RECORD=1 each turn (input clip + structured record) is kept
+under SESSION_RECORD_DIR/<session>/ for scripts/replay_session.py; recording
+is off by default.
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -11,13 +22,29 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from s2s_pipeline.audio.audio_input      import record_audio
-from s2s_pipeline.audio.output_audio     import play_audio_interruptible_by_voice
+from s2s_pipeline.audio.playback_queue   import PlaybackQueue
+from s2s_pipeline.audio.backchannel      import warm_backchannel
 from s2s_pipeline.audio.microphone_finder import get_microphone_index, list_microphones
-from api.pipeline_core      import run_s2s_once
+from api.pipeline_core      import run_s2s_once, FALLBACK_PHRASES
 from s2s_pipeline.tts.deepgram_tts       import text_to_speech
+from s2s_pipeline.tts.phrase_cache       import warm
+from s2s_pipeline.actions.action_router  import ACK_PHRASES, DEFAULT_ACK
+from s2s_pipeline.utils.profiler         import SamplingProfiler, mark_stage, profiled_turn
+from s2s_pipeline.asr.asr_orchestrator   import get_asr
+from s2s_pipeline.utils.session_recorder import get_recorder
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="store_true", help="sampling profiler (see utils/profiler.py)")
+    parser.add_argument("--profile-every", type=int, default=1, help="turns per profile report")
+    parser.add_argument("--profile-interval-ms", type=float, default=10.0)
+    parser.add_argument("--session", default=None, help="recording name (default: timestamp)")
+    args = parser.parse_args()
+    if args.profile:
+        SamplingProfiler(interval_s=args.profile_interval_ms / 1e3, every=args.profile_every).start()
+    recorder = get_recorder(args.session, meta={"source": "cli"})
+
     # ── Choose microphone once ────────────────────────────────────────
     print("Available mics:\n", list_microphones())
     device_index = get_microphone_index()   # ask user the first time / reuse later
@@ -26,33 +53,44 @@ def main() -> None:
     # ── Dialogue manager will be passed back & forth each turn ────────
     dialogue_manager = None
 
+    # ── Playback queue + pre-synthesised acknowledgements ─────────────
+    playback = PlaybackQueue(device_index)
+    warm({*ACK_PHRASES.values(), DEFAULT_ACK, *FALLBACK_PHRASES})
+    warm_backchannel()
+    get_asr().warm()                        # local ASR fallback loads while we greet
+
     # ── 👋 Initial greeting (TTS only) ────────────────────────────────
     greeting_text  = "Hi! How can I help you today?"
     greeting_audio = text_to_speech(greeting_text)
-    play_audio_interruptible_by_voice(greeting_audio, device_index=device_index)
+    playback.put(greeting_audio)
+    playback.join()
 
     # ── Main loop ─────────────────────────────────────────────────────
     while True:
-        # 1. Record utterance
-        audio_path = record_audio(device_index=device_index)
-
-        # 2. One S2S turn
-        transcript, llm_response, audio_out_path, dialogue_manager = run_s2s_once(
-            audio_path,
-            dialogue_manager
-        )
-
-        # 3. Log to console
-        print(f"[User]      {transcript}")
-        print(f"[Assistant] {llm_response}")
-
-        # 4. Play assistant reply (interruptible by user voice)
-        interrupted = play_audio_interruptible_by_voice(
-            audio_out_path,
-            device_index=device_index
-        )
-        if interrupted:
-            print("[System] User interrupted - listening again…" )
+        with profiled_turn():
+            # 1. Record utterance
+            with mark_stage("record"):
+                input_path = recorder.audio_path() if recorder else "input_audio.wav"
+                audio_path = record_audio(input_path, device_index=device_index)
+
+            # 2. One S2S turn (fillers / acknowledgements start playing while it runs)
+            playback.new_turn()
+            transcript, llm_response, audio_out_path, dialogue_manager = run_s2s_once(
+                audio_path,
+                dialogue_manager,
+                on_audio=playback.put,
+                recorder=recorder,
+            )
+
+            # 3. Log to console
+            print(f"[User]      {transcript}")
+            print(f"[Assistant] {llm_response}")
+
+            # 4. Queue assistant reply after any filler (interruptible by user voice);
+            #    if the user already talked over the filler, go straight back to listening
+            with mark_stage("playback"):
+                playback.put(audio_out_path)
+                playback.join()
 
 
 if __name__ == "__main__":
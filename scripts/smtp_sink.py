@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+scripts/smtp_sink.py
+Minimal local SMTP server for exercising the e-mail outbox without a real
+provider.  Accepts any AUTH, stores every message as a .eml file and can
+inject latency and transient (451) or permanent (550) failures.
+
+    python scripts/smtp_sink.py [--port 1025] [--out sent_mail] [--latency 0.5]
+                                [--fail-rate 0.2] [--reject bad@example.com]
+
+then run the pipeline with
+    EMAIL_SMTP_SERVER=localhost EMAIL_SMTP_PORT=1025 EMAIL_SMTP_SECURITY=plain
+"""
+
+import argparse
+import os
+import random
+import socketserver
+import threading
+import time
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        cfg = self.server.cfg
+        self.reply("220 s2s-sink ESMTP ready")
+        sender, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-s2s-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "RSET":
+                sender, rcpts = None, []
+                self.reply("250 OK")
+            elif verb == "MAIL":
+                sender, rcpts = line.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                addr = line.split(":", 1)[1].strip().strip("<>")
+                if addr in cfg.reject:
+                    self.reply("550 5.1.1 No such user")
+                else:
+                    rcpts.append(addr)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                time.sleep(cfg.latency)
+                if random.random() < cfg.fail_rate:
+                    self.reply("451 4.3.0 Temporary failure, try again")
+                    continue
+                self.server.store(sender, rcpts, b"".join(lines))
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, addr, cfg):
+        super().__init__(addr, SMTPHandler)
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self.count = 0
+        os.makedirs(cfg.out, exist_ok=True)
+
+    def store(self, sender, rcpts, body: bytes):
+        with self._lock:
+            self.count += 1
+            n = self.count
+        with open(os.path.join(self.cfg.out, f"{n:06d}.eml"), "wb") as f:
+            f.write(body)
+        print(f"[SMTP sink] #{n} {sender} → {', '.join(rcpts)} ({len(body)} bytes)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--out", default="sent_mail")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per DATA command")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of 451 replies to DATA")
+    parser.add_argument("--reject", nargs="*", default=[], help="recipients answered with 550")
+    cfg = parser.parse_args()
+    with SinkServer((cfg.host, cfg.port), cfg) as server:
+        print(f"[SMTP sink] listening on {cfg.host}:{cfg.port}, writing to {cfg.out}/")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
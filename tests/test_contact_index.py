@@ -0,0 +1,43 @@
+"""ContactIndex must return exactly what the original linear scans return."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.actions.contact_index import PRUNE_MIN_CONTACTS, ContactIndex
+from scripts.bench_contact_index import legacy_lookup, queries_for, random_typos, synthetic_directory
+
+
+@pytest.fixture(scope="module")
+def directory():
+    contacts = synthetic_directory(3000)
+    index = ContactIndex.from_contacts(contacts)
+    assert len(index) >= PRUNE_MIN_CONTACTS         # pruning is actually exercised
+    assert index.wait_ready(30)
+    return contacts, index
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_typos_match_linear_scan(directory, seed):
+    contacts, index = directory
+    mismatches = [(q, legacy_lookup(contacts, q), index.lookup(q)[:2])
+                  for q in random_typos(contacts, 300, seed)
+                  if legacy_lookup(contacts, q) != index.lookup(q)[:2]]
+    assert mismatches == []
+
+
+def test_benchmark_queries_match_linear_scan(directory):
+    contacts, index = directory
+    for q in queries_for(contacts):
+        assert index.lookup(q)[:2] == legacy_lookup(contacts, q), q
+
+
+def test_small_directory_is_scored_in_full():
+    contacts = {"marta jones": "marta@example.com", "john smith": "john@example.com"}
+    index = ContactIndex.from_contacts(contacts)
+    assert index.lookup("marta jones") == ("marta@example.com", False, "marta jones")
+    assert index.lookup("jon smith") == ("john@example.com", True, "john smith")
+    assert index.lookup("bartholomew quince") == (None, False, None)
@@ -0,0 +1,50 @@
+"""Late action results reach the session even though its snapshot was saved first."""
+
+import marshal
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.dialogue.dialogue_manager import _SNAPSHOT_MAGIC_V1, DialogueManager
+from s2s_pipeline.dialogue.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    return InMemorySessionStore()
+
+
+def test_late_result_survives_the_turns_save(store):
+    dm = store.load_or_create("s1")
+    dm.state["last_action"] = None
+    store.queue_late("s1", {"type": "send_email", "fingerprint": "send_email::a@b.c", "action": None,
+                            "response": "Your message to a@b.c is on its way.", "spoken": False})
+    store.save("s1", dm)                            # the turn's snapshot, taken before the result
+
+    dm = store.load_or_create("s1")
+    assert "send_email::a@b.c" in dm.state["completed_actions"]
+    assert dm.state["late_replies"] == ["Your message to a@b.c is on its way."]
+    assert store.take_late("s1") == []              # applied once
+
+    store.save("s1", dm)                            # not spoken yet: kept in the snapshot
+    assert store.load("s1").state["late_replies"] == ["Your message to a@b.c is on its way."]
+
+
+def test_spoken_follow_up_only_sets_the_task(store):
+    follow_up = {"type": "send_email", "parameters": {}}
+    store.queue_late("s2", {"type": "send_email", "fingerprint": None, "action": follow_up,
+                            "response": "Who should I e-mail?", "spoken": True})
+    dm = store.load_or_create("s2")
+    assert dm.state["last_action"] == follow_up
+    assert "late_replies" not in dm.state
+
+
+def test_version_1_snapshots_still_load():
+    payload = (8, "topic", "", [], None, ["send_sms::1"], 64)
+    dm = DialogueManager.from_bytes(_SNAPSHOT_MAGIC_V1 + marshal.dumps(payload, 4))
+    assert dm.topic_seed == "topic" and "send_sms::1" in dm.state["completed_actions"]
@@ -0,0 +1,165 @@
+"""Slot-filling engine (begin / advance / read-back / cancel) and the event-time parser."""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from s2s_pipeline.dialogue import task_forms
+from s2s_pipeline.dialogue.task_forms import FORM_METRICS, active, advance, begin, event_time
+
+NOW = datetime(2026, 10, 19, 14, 30)         # a Monday afternoon
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("tomorrow at 3 pm", "Tuesday 20 October 2026 at 15:00"),
+    ("3 p.m. tomorrow", "Tuesday 20 October 2026 at 15:00"),
+    ("March 14th at 10:30", "Sunday 14 March 2027 at 10:30"),
+    ("14 of march, 2027", "Sunday 14 March 2027"),
+    ("next monday at nine am", "Monday 26 October 2026 at 09:00"),
+    ("friday at 3", "Friday 23 October 2026 at 15:00"),
+    ("tonight at 8", "Monday 19 October 2026 at 20:00"),
+    ("in two hours", "Monday 19 October 2026 at 16:30"),
+    ("10 am", "Tuesday 20 October 2026 at 10:00"),
+    ("2026-11-02T09:00:00", "Monday 2 November 2026 at 09:00"),
+    ("Monday 2 November 2026 at 09:00", "Monday 2 November 2026 at 09:00"),   # read-back re-parses
+])
+def test_event_time_parses(text, expected):
+    assert event_time(text, NOW) == (expected, None, None)
+
+
+@pytest.mark.parametrize("text", ["no", "yes", "soon", "may I suggest", "the 5th",
+                                  "2026-02-30", "at 25:00", "13 pm", "yesterday", "today at 9 am"])
+def test_event_time_rejects(text):
+    result = event_time(text, NOW)
+    assert result.value is None and result.error
+
+
+def _event(**parameters):
+    return begin({"type": "create_event", "parameters": parameters})
+
+
+def test_begin_asks_for_first_empty_slot():
+    step = _event()
+    assert step.say == "What should I call the event?" and step.cached
+    assert active(step.action) and step.action["form"]["pending"] == "title"
+    assert step.run is None
+
+
+def test_begin_validates_llm_parameters_and_maps_aliases():
+    step = _event(summary="Dentist", date="no")
+    assert step.action["parameters"] == {"title": "Dentist"}
+    assert step.action["form"]["pending"] == "when"
+    assert step.say.startswith("Please tell me the date and time")
+
+
+def test_advance_fills_slots_then_reads_back_and_runs():
+    started, completed = FORM_METRICS["started"], FORM_METRICS["completed"]
+    step = _event()
+    step = advance(step.action, "Dentist")
+    assert step.say == "When is Dentist?" and not step.cached
+    step = advance(step.action, "no")                       # not a date – re-asked, nothing stored
+    assert "when" not in step.action["parameters"]
+    assert step.action["form"]["pending"] == "when"
+    step = advance(step.action, "tomorrow at 3 pm")
+    when = step.action["parameters"]["when"]
+    assert when.endswith("at 15:00")
+    assert step.say == f"Shall I add “Dentist” on {when}?"
+    step = advance(step.action, "yes please")
+    assert step.action is None and step.say is None
+    assert step.run == {"type": "create_event", "parameters": {"title": "Dentist", "when": when}}
+    assert FORM_METRICS["started"] == started + 1
+    assert FORM_METRICS["completed"] == completed + 1
+
+
+def test_negative_read_back_cancels():
+    step = _event(title="Dentist", when="tomorrow at 3 pm")
+    assert step.action["form"]["confirming"] == "*"
+    cancelled = FORM_METRICS["cancelled"]
+    step = advance(step.action, "no")
+    assert step == (task_forms.FORMS["create_event"].cancelled, None, None, True)
+    assert FORM_METRICS["cancelled"] == cancelled + 1
+
+
+def test_unclear_read_back_asks_again():
+    step = _event(title="Dentist", when="tomorrow at 3 pm")
+    again = advance(step.action, "hmm")
+    assert again.say == step.say and again.action is step.action
+
+
+def test_cancel_at_any_slot():
+    step = begin({"type": "send_sms", "parameters": {"to": "555 123 4567"}})
+    assert step.action["form"]["pending"] == "body"
+    step = advance(step.action, "never mind")
+    assert step.action is None and step.say == "Okay, I won’t send the message."
+
+
+def test_did_you_mean_yes_no_and_correction(monkeypatch):
+    guesses = {"jon": ("john@example.com", True), "mary": ("mary@example.com", False)}
+    monkeypatch.setattr("s2s_pipeline.actions.action_router.resolve_email",
+                        lambda text: guesses.get(text.strip().lower(), (None, False)))
+    step = begin({"type": "send_email", "parameters": {"to": "jon"}})
+    assert step.say == "Did you mean john@example.com?"
+    assert step.action["form"]["confirming"] == "to"
+
+    rejected = advance(step.action, "no")
+    assert rejected.say == "Okay, please tell me the correct e-mail address."
+    assert "to" not in rejected.action["parameters"]
+
+    corrected = advance(rejected.action, "mary")
+    assert corrected.action["parameters"]["to"] == "mary@example.com"
+    assert corrected.say == "What message should I send to mary@example.com?"
+
+    step = begin({"type": "send_email", "parameters": {"to": "jon"}})
+    step = advance(step.action, "yes")
+    assert step.action["parameters"]["to"] == "john@example.com"
+    step = advance(step.action, "running late, start without me")
+    assert step.run == {"type": "send_email",
+                        "parameters": {"to": "john@example.com", "body": "running late, start without me"}}
+
+
+def test_values_after_a_question_are_kept(monkeypatch):
+    monkeypatch.setattr("s2s_pipeline.actions.action_router.resolve_email",
+                        lambda text: ("john@example.com", True) if text == "jon" else (None, False))
+    step = begin({"type": "send_email", "parameters": {"to": "jon", "body": "I'm running late"}})
+    assert step.say == "Did you mean john@example.com?"
+    step = advance(step.action, "yes")
+    assert step.run == {"type": "send_email",
+                        "parameters": {"to": "john@example.com", "body": "I'm running late"}}
+
+    step = begin({"type": "send_email", "parameters": {"to": "nobody", "body": "I'm running late"}})
+    assert step.say.startswith("I couldn’t find that contact")
+    assert step.action["form"]["given"] == {"body": "I'm running late"}
+
+
+@pytest.mark.parametrize("reply", ["no that's not right", "no, right?", "nope, wrong one"])
+def test_no_wins_over_yes_at_did_you_mean(monkeypatch, reply):
+    monkeypatch.setattr("s2s_pipeline.actions.action_router.resolve_email",
+                        lambda text: ("john@example.com", True))
+    step = begin({"type": "send_email", "parameters": {"to": "jon", "body": "hi"}})
+    step = advance(step.action, reply)
+    assert "to" not in step.action["parameters"] and step.run is None
+    assert step.say == "Okay, please tell me the correct e-mail address."
+
+
+@pytest.mark.parametrize("reply", ["no that's not right", "no, right?"])
+def test_no_wins_over_yes_at_read_back(reply):
+    step = begin({"type": "send_sms", "parameters": {"to": "555 123 4567", "body": "hi"}})
+    assert step.action["form"]["confirming"] == "*"
+    step = advance(step.action, reply)
+    assert step.run is None and step.say == "Okay, I won’t send the message."
+
+
+def test_direct_send_email_to_unconfirmed_name_asks(monkeypatch):
+    from s2s_pipeline.actions import action_router
+    monkeypatch.setattr(action_router, "resolve_email",
+                        lambda text: ("john@example.com", True) if text == "jon" else (None, False))
+    reply = action_router.send_email(to="jon", body="I'm running late")
+    assert reply["response"] == "Did you mean john@example.com?"
+    step = advance(reply["action"], "yes")
+    assert step.run["parameters"]["to"] == "john@example.com"
+    assert step.run["parameters"]["body"] == "I'm running late"
+    assert action_router.send_email(to="nobody", body="hi")["action"]["form"]["pending"] == "to"